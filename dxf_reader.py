@@ -0,0 +1,204 @@
+"""Streaming reader for the craft room R12 (AC1009) DXF drawings.
+
+Group-code pairs are parsed lazily line by line, so memory stays bounded by
+what the caller keeps (e.g. only the layers it indexes), not by file size.
+Supports the entities these drawings use: LINE, TEXT, and POLYLINE/VERTEX
+(plus LWPOLYLINE for newer exports). Everything else is skipped.
+"""
+
+from collections import defaultdict, namedtuple
+
+Line = namedtuple('Line', 'layer x0 y0 x1 y1')
+Text = namedtuple('Text', 'layer x y height text rotation')
+Polyline = namedtuple('Polyline', 'layer points closed')
+
+# Rectangle (x0, y0, x1, y1) with x0 < x1, y0 < y1
+Rect = namedtuple('Rect', 'x0 y0 x1 y1')
+
+
+def iter_pairs(lines):
+    """Yield (group_code, value) pairs from an iterable of DXF lines."""
+    it = iter(lines)
+    for code in it:
+        value = next(it, None)
+        if value is None:
+            return
+        yield int(code), value.rstrip('\r\n')
+
+
+def _entity(kind, pairs):
+    """Build a Line/Text tuple from an entity's group codes (None if unsupported)."""
+    codes = {}
+    for code, value in pairs:
+        codes.setdefault(code, value)
+    layer = codes.get(8, '0')
+    if kind == 'LINE':
+        return Line(layer, float(codes.get(10, 0)), float(codes.get(20, 0)),
+                    float(codes.get(11, 0)), float(codes.get(21, 0)))
+    if kind == 'TEXT':
+        return Text(layer, float(codes.get(10, 0)), float(codes.get(20, 0)),
+                    float(codes.get(40, 0)), codes.get(1, ''), float(codes.get(50, 0)))
+    return None
+
+
+def _lwpolyline(pairs):
+    layer, closed, points, x = '0', False, [], None
+    for code, value in pairs:
+        if code == 8:
+            layer = value
+        elif code == 70:
+            closed = bool(int(value) & 1)
+        elif code == 10:
+            x = float(value)
+        elif code == 20 and x is not None:
+            points.append((x, float(value)))
+    return Polyline(layer, tuple(points), closed)
+
+
+def iter_entities(path, layers=None):
+    """Stream entities from the ENTITIES section, optionally only for some layers."""
+    layers = set(layers) if layers else None
+    section = None
+    kind, pairs = None, []
+    poly = None          # open POLYLINE: [layer, closed, points]
+
+    def emit():
+        if kind == 'LWPOLYLINE':
+            ent = _lwpolyline(pairs)
+        else:
+            ent = _entity(kind, pairs)
+        if ent is not None and (layers is None or ent.layer in layers):
+            return ent
+        return None
+
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for code, value in iter_pairs(f):
+            if code != 0:
+                if section is None and code == 2 and kind == 'SECTION':
+                    section = value.strip()
+                elif section == 'ENTITIES' and kind is not None:
+                    pairs.append((code, value))
+                continue
+
+            # code 0: the previous record is complete
+            if section == 'ENTITIES' and kind is not None:
+                if kind == 'POLYLINE':
+                    codes = dict(pairs)
+                    poly = [codes.get(8, '0'), bool(int(codes.get(70, 0)) & 1), []]
+                elif kind == 'VERTEX' and poly is not None:
+                    codes = dict(pairs)
+                    poly[2].append((float(codes.get(10, 0)), float(codes.get(20, 0))))
+                elif kind == 'SEQEND' and poly is not None:
+                    if layers is None or poly[0] in layers:
+                        yield Polyline(poly[0], tuple(poly[2]), poly[1])
+                    poly = None
+                else:
+                    ent = emit()
+                    if ent is not None:
+                        yield ent
+
+            kind, pairs = value.strip(), []
+            if kind == 'ENDSEC':
+                if section == 'ENTITIES':
+                    return  # nothing of interest after ENTITIES
+                section, kind = None, None
+            elif kind == 'SECTION':
+                section = None
+
+
+def _snap(v, tol):
+    return round(v / tol) * tol
+
+
+def find_rectangles(lines, polylines=(), tol=0.01):
+    """Reconstruct axis-aligned rectangles from LINE segments and closed polylines.
+
+    Endpoints are snapped to tol. A rectangle is reported when two horizontal
+    segments with the same x-span are joined by vertical segments at both ends.
+    """
+    horizontal = defaultdict(set)   # (x0, x1) -> {y}
+    vertical = set()                # (x, y0, y1)
+    for ln in lines:
+        x0, y0, x1, y1 = (_snap(v, tol) for v in (ln.x0, ln.y0, ln.x1, ln.y1))
+        if y0 == y1 and x0 != x1:
+            horizontal[(min(x0, x1), max(x0, x1))].add(y0)
+        elif x0 == x1 and y0 != y1:
+            vertical.add((x0, min(y0, y1), max(y0, y1)))
+
+    rects = []
+    for (x0, x1), ys in horizontal.items():
+        ys = sorted(ys)
+        for i, ya in enumerate(ys):
+            for yb in ys[i + 1:]:
+                if (x0, ya, yb) in vertical and (x1, ya, yb) in vertical:
+                    rects.append(Rect(x0, ya, x1, yb))
+
+    for pl in polylines:
+        pts = [(_snap(x, tol), _snap(y, tol)) for x, y in pl.points]
+        if len(pts) == 5 and pts[0] == pts[-1]:
+            pts = pts[:4]
+        if len(pts) != 4 or not (pl.closed or len(pl.points) == 5):
+            continue
+        xs = sorted({x for x, _ in pts})
+        ys = sorted({y for _, y in pts})
+        if len(xs) == 2 and len(ys) == 2:
+            rects.append(Rect(xs[0], ys[0], xs[1], ys[1]))
+
+    rects.sort(key=lambda r: (r.y0, r.x0, r.y1, r.x1))
+    return rects
+
+
+class LayerIndex:
+    """Entities of a DXF file grouped by layer, built in one streaming pass."""
+
+    def __init__(self, path, layers=None):
+        self.path = path
+        self.lines = defaultdict(list)
+        self.texts = defaultdict(list)
+        self.polylines = defaultdict(list)
+        buckets = {Line: self.lines, Text: self.texts, Polyline: self.polylines}
+        for ent in iter_entities(path, layers):
+            buckets[type(ent)][ent.layer].append(ent)
+        self._rects = {}
+
+    @property
+    def layers(self):
+        return sorted(set(self.lines) | set(self.texts) | set(self.polylines))
+
+    def rectangles(self, layer):
+        """Closed rectangles on a layer (cached)."""
+        if layer not in self._rects:
+            self._rects[layer] = find_rectangles(self.lines.get(layer, ()),
+                                                 self.polylines.get(layer, ()))
+        return self._rects[layer]
+
+    def open_lines(self, layer, tol=0.01):
+        """LINE entities on a layer that are not an edge of any rectangle."""
+        edges = set()
+        for r in self.rectangles(layer):
+            edges |= {(r.x0, r.y0, r.x1, r.y0), (r.x0, r.y1, r.x1, r.y1),
+                      (r.x0, r.y0, r.x0, r.y1), (r.x1, r.y0, r.x1, r.y1)}
+        loose = []
+        for ln in self.lines.get(layer, ()):
+            x0, y0, x1, y1 = (_snap(v, tol) for v in (ln.x0, ln.y0, ln.x1, ln.y1))
+            if (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)) not in edges:
+                loose.append(ln)
+        return loose
+
+    def bounds(self, layer):
+        """(x0, y0, x1, y1) extent of all LINE/polyline geometry on a layer."""
+        xs, ys = [], []
+        for ln in self.lines.get(layer, ()):
+            xs += [ln.x0, ln.x1]
+            ys += [ln.y0, ln.y1]
+        for pl in self.polylines.get(layer, ()):
+            xs += [x for x, _ in pl.points]
+            ys += [y for _, y in pl.points]
+        if not xs:
+            return None
+        return Rect(min(xs), min(ys), max(xs), max(ys))
+
+    def text_in(self, layer, rect):
+        """TEXT entities on a layer whose insertion point lies inside rect."""
+        return [t for t in self.texts.get(layer, ())
+                if rect.x0 <= t.x <= rect.x1 and rect.y0 <= t.y <= rect.y1]
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Steady 2D airflow and dust/fume concentration for Craft Room.
+Plan-view, depth-averaged model on a finite-volume grid over the room and
+bump-out (default 1" cells):
+
+  flow   potential flow driven by the extraction points. The dust collector
+         (hvac.dust_collection_cfm) draws through ports at the placed dusty
+         stations and returns HEPA-filtered air at infrastructure.dust_collector;
+         the fume exhaust (hvac.fume_exhaust_cfm) leaves through the bump-out
+         north wall. Make-up air enters through the open south wall. The
+         soft_dust_barrier curtain is a closed wall segment.
+  mass   steady advection-diffusion (upwind advection, eddy diffusivity) of
+         dust emitted by dusty stations and fumes from dirty_fume stations;
+         extraction removes air at its local concentration, the open wall is
+         clean outside air.
+
+Concentrations are reported relative to a well-mixed room (total emission /
+total extraction), so 1.0 means "no better than mixing" and the clean zone
+should stay far below it. Both systems are sparse and solved directly with
+SciPy when available, otherwise with Jacobi-preconditioned CG/BiCGSTAB in
+NumPy.
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from constraints import PARAMS_FILE, load_parameters
+from model import as_layout
+
+try:
+    from scipy import sparse
+    from scipy.sparse.linalg import spsolve
+except ImportError:  # optional dependency
+    sparse = None
+
+DEFAULT_RESOLUTION = 1.0     # inches per cell
+EDDY_DIFFUSIVITY = 45.0      # in^2/s (~0.03 m^2/s, typical indoor mixing)
+CFM_TO_IN3S = 1728 / 60
+TOLERANCE = 1e-8             # relative residual for the iterative fallback
+CLEAN_LIMIT = 0.5            # clean zones should average under half of well mixed dust
+
+# hvac entries are {'min', 'max'} ranges; the minimum is the conservative case
+DEFAULT_LEVEL = 'min'
+
+
+def _cfm(value, level):
+    if isinstance(value, dict):
+        return float(value.get(level, value.get('min', 0)))
+    return float(value or 0)
+
+
+class AirGrid:
+    """Room + bump-out cells with open faces between fluid neighbours.
+
+    Cell (i, j) covers y in [i*res, (i+1)*res) and the same for x. Faces on
+    the south edge (y = 0) open to outside air; every other boundary face
+    and the dust barrier are closed.
+    """
+
+    def __init__(self, params, resolution=DEFAULT_RESOLUTION):
+        layout = as_layout(params)
+        self.layout = layout
+        self.res = h = float(resolution)
+        room, bump = layout.room, layout.bump
+        x_max = max(room.width, bump.x1 if bump else 0)
+        y_max = max(room.depth, bump.y1 if bump else 0)
+        self.nx = int(np.ceil(x_max / h))
+        self.ny = int(np.ceil(y_max / h))
+        self.xs = (np.arange(self.nx) + 0.5) * h
+        self.ys = (np.arange(self.ny) + 0.5) * h
+        X, Y = np.meshgrid(self.xs, self.ys)
+        fluid = (X < room.width) & (Y < room.depth)
+        if bump:
+            fluid |= (X > bump.x0) & (X < bump.x1) & (Y > bump.y0) & (Y < bump.y1)
+        self.fluid = fluid
+
+        # Open faces: east faces (ny, nx-1) and north faces (ny-1, nx)
+        self.open_x = fluid[:, :-1] & fluid[:, 1:]
+        self.open_y = fluid[:-1, :] & fluid[1:, :]
+        barrier = layout.params.get('infrastructure', {}).get('soft_dust_barrier')
+        if barrier:
+            bx = barrier.get('x', 84)
+            j = int(round(bx / h)) - 1        # face between column j and j+1 sits at bx
+            if 0 <= j < self.nx - 1:
+                rows = (self.ys > barrier.get('y_start', 72)) & (self.ys < barrier.get('y_end', 300))
+                self.open_x[rows, j] = False
+        self.inlet = np.zeros_like(fluid)
+        self.inlet[0] = fluid[0]              # south faces to outside air
+
+    def box_mask(self, x0, y0, x1, y1):
+        """Fluid cells whose centers fall inside a box (at least the nearest cell)."""
+        cols = (self.xs >= x0) & (self.xs <= x1)
+        rows = (self.ys >= y0) & (self.ys <= y1)
+        mask = np.outer(rows, cols) & self.fluid
+        if not mask.any():
+            i = min(int(((y0 + y1) / 2) // self.res), self.ny - 1)
+            j = min(int(((x0 + x1) / 2) // self.res), self.nx - 1)
+            mask[i, j] = self.fluid[i, j]
+        return mask
+
+    def spread(self, mask, total):
+        """Distribute total evenly over mask's cells."""
+        out = np.zeros((self.ny, self.nx))
+        n = mask.sum()
+        if n:
+            out[mask] = total / n
+        return out
+
+
+class _Operator:
+    """Five-point finite-volume operator A v = diag*v - sum(coupling * neighbour).
+
+    Coefficients per face: fx_lr moves cell (i, j) into (i, j+1), fx_rl the
+    reverse; fy_du / fy_ud the same for (i, j) -> (i+1, j) and back.
+    """
+
+    def __init__(self, grid, fx_lr, fx_rl, fy_du, fy_ud, diag):
+        self.grid = grid
+        self.fx_lr, self.fx_rl, self.fy_du, self.fy_ud = fx_lr, fx_rl, fy_du, fy_ud
+        self.diag = np.where(grid.fluid, diag, 1.0)   # identity rows outside the room
+
+    def __call__(self, v):
+        out = self.diag * v
+        out[:, :-1] -= self.fx_rl * v[:, 1:]
+        out[:, 1:] -= self.fx_lr * v[:, :-1]
+        out[:-1, :] -= self.fy_ud * v[1:, :]
+        out[1:, :] -= self.fy_du * v[:-1, :]
+        return out
+
+    def matrix(self):
+        """The operator as a SciPy CSR matrix over all cells (row-major)."""
+        ny, nx = self.diag.shape
+        idx = np.arange(ny * nx).reshape(ny, nx)
+        rows = [idx.ravel(), idx[:, :-1].ravel(), idx[:, 1:].ravel(),
+                idx[:-1, :].ravel(), idx[1:, :].ravel()]
+        cols = [idx.ravel(), idx[:, 1:].ravel(), idx[:, :-1].ravel(),
+                idx[1:, :].ravel(), idx[:-1, :].ravel()]
+        vals = [self.diag.ravel(), -self.fx_rl.ravel(), -self.fx_lr.ravel(),
+                -self.fy_ud.ravel(), -self.fy_du.ravel()]
+        return sparse.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                                 shape=(ny * nx, ny * nx))
+
+
+def _cg(op, b, tol=TOLERANCE, maxiter=20000):
+    """Jacobi-preconditioned conjugate gradients (op symmetric positive definite)."""
+    x = np.zeros_like(b)
+    r = b.copy()
+    z = r / op.diag
+    p = z.copy()
+    rz = np.vdot(r, z)
+    stop = tol * np.linalg.norm(b)
+    for _ in range(maxiter):
+        Ap = op(p)
+        alpha = rz / np.vdot(p, Ap)
+        x += alpha * p
+        r -= alpha * Ap
+        if np.linalg.norm(r) <= stop:
+            break
+        z = r / op.diag
+        rz, rz_old = np.vdot(r, z), rz
+        p = z + (rz / rz_old) * p
+    return x
+
+
+def _bicgstab(op, b, tol=TOLERANCE, maxiter=20000):
+    """Jacobi-preconditioned BiCGSTAB for the non-symmetric transport operator."""
+    x = np.zeros_like(b)
+    r = b.copy()
+    r0 = r.copy()
+    rho = alpha = omega = 1.0
+    v = p = np.zeros_like(b)
+    stop = tol * np.linalg.norm(b)
+    for _ in range(maxiter):
+        rho, rho_old = np.vdot(r0, r), rho
+        p = r + (rho / rho_old) * (alpha / omega) * (p - omega * v)
+        phat = p / op.diag
+        v = op(phat)
+        alpha = rho / np.vdot(r0, v)
+        s = r - alpha * v
+        if np.linalg.norm(s) <= stop:
+            x += alpha * phat
+            break
+        shat = s / op.diag
+        t = op(shat)
+        omega = np.vdot(t, s) / np.vdot(t, t)
+        x += alpha * phat + omega * shat
+        r = s - omega * t
+        if np.linalg.norm(r) <= stop:
+            break
+    return x
+
+
+def _solve(op, b, symmetric=False):
+    if sparse is not None:
+        return spsolve(op.matrix().tocsc(), b.ravel()).reshape(b.shape)
+    return (_cg if symmetric else _bicgstab)(op, b)
+
+
+def source_stations(layout, category):
+    """Indices of placed stations of a category that sit in a zone of that category.
+
+    Storage tagged dusty (lumber and sheet racks in receiving) neither makes
+    dust nor has a collector drop; stations without a zone count.
+    """
+    st, zones = layout.stations, layout.zones
+    stations = layout.params['stations']
+    keep = []
+    for k in np.flatnonzero(st.placed & (st.categories == category)):
+        zid = stations[st.ids[k]].get('zone')
+        if zid in zones and zones.categories[zones.index(zid)] != category:
+            continue
+        keep.append(int(k))
+    return keep
+
+
+def emitters(grid, category):
+    """Cells under the source stations of a category."""
+    st = grid.layout.stations
+    mask = np.zeros_like(grid.fluid)
+    for k in source_stations(grid.layout, category):
+        x, y = st.xy[k]
+        w, d = st.extent[k]
+        mask |= grid.box_mask(x, y, x + w, y + d)
+    return mask
+
+
+def extraction(grid, level=DEFAULT_LEVEL):
+    """Net extraction per cell (in^2/s, 2D: cfm over ceiling height; negative = supply).
+
+    Returns (extract, dust_ports, fume_ports, return_mask).
+    """
+    layout = grid.layout
+    params = layout.params
+    hvac = params.get('hvac', {})
+    ceiling = params['room'].get('ceiling_height', 96)
+    q_dust = _cfm(hvac.get('dust_collection_cfm'), level) * CFM_TO_IN3S / ceiling
+    q_fume = _cfm(hvac.get('fume_exhaust_cfm'), level) * CFM_TO_IN3S / ceiling
+
+    dc = params.get('infrastructure', {}).get('dust_collector')
+    dc_mask = np.zeros_like(grid.fluid)
+    if dc:
+        dc_mask = grid.box_mask(dc['x'], dc['y'], dc['x'] + dc['width'], dc['y'] + dc['depth'])
+    dust_ports = emitters(grid, 'dusty')
+    if not dust_ports.any():
+        dust_ports = dc_mask          # no ducted tools: collector draws at its own inlet
+
+    # Fume exhaust: north wall of the bump-out (or of the fume zone without one)
+    fume_ports = np.zeros_like(grid.fluid)
+    if layout.bump:
+        b = layout.bump
+        top = min(int(b.y1 // grid.res), grid.ny) - 1
+        cols = (grid.xs > b.x0) & (grid.xs < b.x1)
+        fume_ports[top, cols] = grid.fluid[top, cols]
+    elif 'zone_fume' in layout.zones:
+        x0, y0, x1, y1 = layout.zones.boxes[layout.zones.index('zone_fume')]
+        fume_ports = grid.box_mask(x0, y1 - grid.res, x1, y1)
+
+    extract = grid.spread(dust_ports, q_dust) + grid.spread(fume_ports, q_fume)
+    if dc and not (dust_ports == dc_mask).all():
+        extract -= grid.spread(dc_mask, q_dust)   # filtered air returned at the collector
+    return extract, dust_ports, fume_ports, dc_mask
+
+
+def solve_flow(grid, extract):
+    """Face volume fluxes (in^2/s) from potential flow: (flux_x, flux_y, inlet_flux).
+
+    flux_x[i, j] > 0 flows from cell (i, j) east into (i, j+1); flux_y north;
+    inlet_flux > 0 enters through the open south wall.
+    """
+    ox, oy = grid.open_x.astype(float), grid.open_y.astype(float)
+    diag = np.zeros((grid.ny, grid.nx))
+    diag[:, :-1] += ox
+    diag[:, 1:] += ox
+    diag[:-1, :] += oy
+    diag[1:, :] += oy
+    diag += 2 * grid.inlet            # Dirichlet p = 0 half a cell outside
+    op = _Operator(grid, ox, ox, oy, oy, diag)
+    # sum over faces of (p_i - p_nb) = net outflow = -extraction
+    p = _solve(op, np.where(grid.fluid, -extract, 0.0), symmetric=True)
+    flux_x = (p[:, :-1] - p[:, 1:]) * ox
+    flux_y = (p[:-1, :] - p[1:, :]) * oy
+    inlet_flux = np.where(grid.inlet, -2 * p, 0.0)
+    return flux_x, flux_y, inlet_flux
+
+
+def solve_transport(grid, flow, extract, source, diffusivity=EDDY_DIFFUSIVITY):
+    """Steady concentration (mass/in^2) for a source field (mass/s per cell)."""
+    flux_x, flux_y, inlet_flux = flow
+    dx, dy = diffusivity * grid.open_x, diffusivity * grid.open_y
+    fx_lr, fx_rl = dx + np.maximum(flux_x, 0), dx + np.maximum(-flux_x, 0)
+    fy_du, fy_ud = dy + np.maximum(flux_y, 0), dy + np.maximum(-flux_y, 0)
+    diag = np.zeros((grid.ny, grid.nx))
+    diag[:, :-1] += fx_lr
+    diag[:, 1:] += fx_rl
+    diag[:-1, :] += fy_du
+    diag[1:, :] += fy_ud
+    # Open wall: diffusion to clean outside air, advection out where air leaves
+    diag += grid.inlet * (2 * diffusivity + np.maximum(-inlet_flux, 0))
+    diag += np.maximum(extract, 0)    # extracted air carries its concentration away
+    op = _Operator(grid, fx_lr, fx_rl, fy_du, fy_ud, diag)
+    return _solve(op, np.where(grid.fluid, source, 0.0))
+
+
+def simulate(params, resolution=DEFAULT_RESOLUTION, level=DEFAULT_LEVEL,
+             diffusivity=EDDY_DIFFUSIVITY):
+    """Flow and relative dust/fume fields; returns a dict of grid arrays and totals."""
+    grid = AirGrid(params, resolution)
+    extract, dust_ports, fume_ports, dc_mask = extraction(grid, level)
+    flow = solve_flow(grid, extract)
+    result = {'grid': grid, 'flow': flow, 'extract': extract}
+    for species, category, ports in (('dust', 'dusty', dust_ports),
+                                     ('fume', 'dirty_fume', fume_ports)):
+        emit = emitters(grid, category)
+        if not emit.any():
+            result[species] = None
+            continue
+        source = grid.spread(emit, 1.0)           # one unit of emission per second
+        c = solve_transport(grid, flow, extract, source, diffusivity)
+        sink = np.maximum(extract, 0)
+        well_mixed = 1.0 / sink.sum()             # emission / total extraction
+        captured = float((sink * c)[ports].sum())
+        result[species] = {'c': np.where(grid.fluid, c / well_mixed, np.nan),
+                           'captured': captured, 'escaped': 1.0 - float((sink * c).sum())}
+    return result
+
+
+def velocity(grid, flow):
+    """Cell-centered (u, v) in in/s, NaN outside the room (for plotting)."""
+    flux_x, flux_y, inlet_flux = flow
+    h = grid.res
+    fx = np.zeros((grid.ny, grid.nx + 1))
+    fy = np.zeros((grid.ny + 1, grid.nx))
+    fx[:, 1:-1] = flux_x
+    fy[1:-1, :] = flux_y
+    fy[0, :] = inlet_flux[0]
+    u = (fx[:, :-1] + fx[:, 1:]) / (2 * h)
+    v = (fy[:-1, :] + fy[1:, :]) / (2 * h)
+    return np.where(grid.fluid, u, np.nan), np.where(grid.fluid, v, np.nan)
+
+
+def zone_exposure(result):
+    """{zone_id: {'dust': (mean, max), 'fume': (mean, max)}} relative to well mixed."""
+    grid = result['grid']
+    zones = grid.layout.zones
+    report = {}
+    for zid, box in zip(zones.ids, zones.boxes):
+        mask = grid.box_mask(*box)
+        report[zid] = {}
+        for species in ('dust', 'fume'):
+            field = result[species]
+            if field is None:
+                report[zid][species] = None
+                continue
+            values = field['c'][mask]
+            report[zid][species] = (float(np.nanmean(values)), float(np.nanmax(values)))
+    return report
+
+
+def main(argv=None):
+    """Print per-zone exposure; exit 1 if a clean zone averages over CLEAN_LIMIT dust."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('params', nargs='?', default=PARAMS_FILE, help='parameters file')
+    args = parser.parse_args(argv)
+    params = load_parameters(args.params)
+    result = simulate(params)
+    grid = result['grid']
+    print(f"Grid {grid.nx} x {grid.ny} at {grid.res:g}\"; concentrations relative to well mixed")
+    for species in ('dust', 'fume'):
+        field = result[species]
+        if field is not None:
+            print(f"  {species}: {100 * field['captured']:.1f}% captured at ports, "
+                  f"{100 * max(field['escaped'], 0):.1f}% out the open wall")
+    print(f"{'zone':<20} {'dust mean':>10} {'dust max':>9} {'fume mean':>10} {'fume max':>9}")
+    failing = 0
+    for zid, row in zone_exposure(result).items():
+        cells = []
+        for species in ('dust', 'fume'):
+            cells += [f'{v:>9.3f}' for v in row[species]] if row[species] else ['        -'] * 2
+        print(f"{zid:<20} {cells[0]:>10} {cells[1]:>9} {cells[2]:>10} {cells[3]:>9}")
+        category = grid.layout.zones.categories[grid.layout.zones.index(zid)]
+        if category == 'clean' and row['dust'] and row['dust'][0] > CLEAN_LIMIT:
+            failing += 1
+    return 1 if failing else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
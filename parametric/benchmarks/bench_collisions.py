@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Collision benchmark: all-pairs overlap test vs sort-and-sweep.
+Adds n synthetic stations (a jittered grid, a third with service clearances)
+to data/parameters.json and times
+  build       CollisionSet: footprints, oriented envelopes, fixed obstacles
+  all pairs   the n^2 overlap matrix, in row blocks
+  sweep       collisions.sweep_pairs over the same boxes
+  conflicts   find_conflicts (sweep + conflict rules + intersections)
+The all-pairs column is only run up to --brute-max boxes.
+
+Example:
+    python benchmarks/bench_collisions.py --stations 1000 10000 50000
+"""
+
+import argparse
+import copy
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from collisions import CollisionSet, find_conflicts, sweep_pairs  # noqa: E402
+from model import PARAMS_FILE  # noqa: E402
+
+
+def with_stations(base, n, seed=0):
+    """base plus n stations on a jittered grid sized so neighbours occasionally collide."""
+    rng = np.random.default_rng(seed)
+    params = copy.deepcopy(base)
+    side = int(np.ceil(np.sqrt(n)))
+    for k in range(n):
+        sid = f'synthetic_{k}'
+        s = {'zone': 'zone_dusty', 'category': 'dusty',
+             'width': int(rng.integers(18, 60)), 'depth': int(rng.integers(18, 48))}
+        if k % 3 == 0:
+            s.update(service_clearance_front=36, service_clearance_sides=12,
+                     service_clearance_rear=6)
+        params['stations'][sid] = s
+        params['station_positions'][sid] = {
+            'x': int((k % side) * 90 + rng.integers(0, 30)),
+            'y': int((k // side) * 90 + rng.integers(0, 30))}
+    return params
+
+
+def all_pairs(boxes, block=512):
+    found = 0
+    for start in range(0, len(boxes), block):
+        a = boxes[start:start + block, None]
+        w = np.minimum(a[..., 2], boxes[:, 2]) - np.maximum(a[..., 0], boxes[:, 0])
+        h = np.minimum(a[..., 3], boxes[:, 3]) - np.maximum(a[..., 1], boxes[:, 1])
+        hit = (w > 0) & (h > 0)
+        found += int(np.triu(hit, start + 1).sum())
+    return found
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--stations', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--brute-max', type=int, default=20000,
+                        help='skip the all-pairs test above this many boxes')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with open(PARAMS_FILE) as f:
+        base = json.load(f)
+    print(f"{'stations':>8} {'boxes':>7} {'pairs':>6} {'build':>9} {'all pairs':>10} "
+          f"{'sweep':>9} {'conflicts':>10}   (ms)")
+    for n in args.stations:
+        params = with_stations(base, n)
+        cset = CollisionSet(params)
+        boxes = cset.boxes
+        pairs = len(sweep_pairs(boxes)[0])
+        brute = float('nan')
+        if len(boxes) <= args.brute_max:
+            brute = best_of(lambda: all_pairs(boxes), 1)
+            assert all_pairs(boxes) == pairs
+        row = [best_of(lambda: CollisionSet(params), 1), brute,
+               best_of(lambda: sweep_pairs(boxes), args.repeat),
+               best_of(lambda: find_conflicts(cset), args.repeat)]
+        print(f'{n:>8} {len(boxes):>7} {pairs:>6} ' + f'{row[0]:>9.1f} {row[1]:>10.1f} '
+              f'{row[2]:>9.2f} {row[3]:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Layout diff benchmark over synthetic floor plans.
+For every station count it builds a base layout and a revision with
+--changed of its stations moved, resized, removed or added (a quarter each),
+then reports, best of --repeat:
+  diff        layout_diff.diff_layouts on the two compiled layouts
+  overlay     the diff PNG over the already-cached room background
+  cold        the same with the background cache cleared (first pair on a room)
+  two full    rendering the stations view of both versions, the by-eye way
+
+Example:
+    python benchmarks/bench_diff.py --stations 100 1000 10000 --changed 0.05
+"""
+
+import argparse
+import copy
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import matplotlib  # noqa: E402
+matplotlib.use('Agg')
+
+import render_layout  # noqa: E402
+from layout_diff import diff_layouts, render_png, summary  # noqa: E402
+from model import PARAMS_FILE, as_layout  # noqa: E402
+from synthetic import synthetic_layout  # noqa: E402
+
+
+def revise(params, fraction):
+    """Copy of params with a fraction of its stations moved, resized, removed or added."""
+    params = copy.deepcopy(params)
+    stations, positions = params['stations'], params['station_positions']
+    ids = list(positions)
+    step = max(1, round(1 / fraction)) if fraction else len(ids) + 1
+    for n, sid in enumerate(ids[::step]):
+        op = n % 4
+        if op == 0:
+            positions[sid]['x'] += 3
+        elif op == 1:
+            stations[sid]['width'] *= 0.8
+        elif op == 2:
+            del positions[sid]
+        else:
+            stations[f'{sid}_b'] = dict(stations[sid])
+            positions[f'{sid}_b'] = {'x': positions[sid]['x'] + 1, 'y': positions[sid]['y'] + 1}
+    return params
+
+
+def _best(fn, repeat, before=None):
+    best = float('inf')
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--stations', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--changed', type=float, default=0.05,
+                        help='fraction of stations edited in the revision')
+    parser.add_argument('--room', type=float, default=100, help='room width in feet')
+    parser.add_argument('--dpi', type=int, default=150)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with open(PARAMS_FILE) as f:
+        base = json.load(f)
+    print(f"{'stations':>8} {'diff':>9} {'overlay':>9} {'cold':>9} {'two full':>9}  changes")
+    for n in args.stations:
+        old_params = synthetic_layout(base, n, room_ft=args.room)
+        old, new = as_layout(old_params), as_layout(revise(old_params, args.changed))
+        changes = diff_layouts(old, new)
+        diff = _best(lambda: diff_layouts(old, new), args.repeat)
+        overlay = _best(lambda: render_png(old, new, 'diff', args.dpi, changes), args.repeat)
+        cold = _best(lambda: render_png(old, new, 'diff', args.dpi, changes), args.repeat,
+                     before=render_layout._backgrounds.clear)
+        full = _best(lambda: [render_layout.render_bytes('stations', p, args.dpi)
+                              for p in (old, new)], 1)
+        print(f"{n:>8} {diff:>7.1f}ms {overlay:>7.0f}ms {cold:>7.0f}ms {full:>7.0f}ms  "
+              f"{summary(changes)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
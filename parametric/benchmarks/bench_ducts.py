@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Duct network benchmark: batched vs one-at-a-time blast-gate solves.
+Adds n synthetic dusty tools to data/parameters.json and times
+  build       DuctNetwork construction (memoized segment losses)
+  batched     all 2^n gate configurations in one Newton solve
+  looped      the same configurations solved one row at a time
+The looped column is only run up to --loop-max gates.
+
+Example:
+    python benchmarks/bench_ducts.py --gates 3 6 9 12
+"""
+
+import argparse
+import copy
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ducts import DuctNetwork  # noqa: E402
+from model import PARAMS_FILE  # noqa: E402
+
+
+def with_tools(base, n):
+    """base with its dusty tools replaced by n 24" tools spread across the dusty zone."""
+    params = copy.deepcopy(base)
+    params['duct_network']['drops'] = {}
+    for sid, s in params['stations'].items():
+        if s.get('category') == 'dusty':
+            s['category'] = 'shared'
+    for k in range(n):
+        sid = f'tool_{k}'
+        params['stations'][sid] = {'zone': 'zone_dusty', 'category': 'dusty', 'width': 24, 'depth': 24}
+        params['station_positions'][sid] = {'x': 160 + (k * 37) % 120, 'y': 6 + (k * 23) % 120}
+    return params
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--gates', type=int, nargs='+', default=[3, 6, 9, 12])
+    parser.add_argument('--loop-max', type=int, default=10, help='skip the loop above this many gates')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with open(PARAMS_FILE) as f:
+        base = json.load(f)
+    print(f"{'gates':>5} {'configs':>8} {'build':>9} {'batched':>9} {'looped':>9}   (ms)")
+    for n in args.gates:
+        params = with_tools(base, n)
+        network = DuctNetwork(params)
+        gates = network.configurations()
+        batched = best_of(network.solve, args.repeat)
+        looped = float('nan')
+        if n <= args.loop_max:
+            looped = best_of(lambda: [network.solve(g) for g in gates], args.repeat)
+            assert np.allclose(np.vstack([network.solve(g) for g in gates]), network.solve())
+        build = best_of(lambda: DuctNetwork(params), args.repeat)
+        print(f'{n:>5} {len(gates):>8} {build:>9.2f} {batched:>9.2f} {looped:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
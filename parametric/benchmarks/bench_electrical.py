@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Electrical plan benchmark: circuit packing and the full plan at scale.
+First checks pack against the item loop on random load mixes (oversize
+loads included), then replicates data/station_inventory.csv to each row
+count and times
+  loop ffd    item-by-item first-fit decreasing (the textbook loop)
+  pack        electrical.pack, vectorized per load size (same bins)
+  plan        ElectricalPlan: loads, packing per zone group, receptacles
+
+Example:
+    python benchmarks/bench_electrical.py --rows 1000 10000 100000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_inventory import synthetic_inventory  # noqa: E402
+from constraints import load_parameters  # noqa: E402
+from electrical import ElectricalPlan, pack  # noqa: E402
+from inventory import load_inventory  # noqa: E402
+from model import PARAMS_FILE  # noqa: E402
+
+
+def loop_ffd(sizes, capacity):
+    order = np.argsort(-np.asarray(sizes), kind='stable')
+    remaining, out = [], np.empty(len(sizes), dtype=int)
+    for i in order:
+        for b, room in enumerate(remaining):
+            if sizes[i] <= room + 1e-9:
+                remaining[b] -= sizes[i]
+                out[i] = b
+                break
+        else:
+            out[i] = len(remaining)
+            remaining.append(capacity - sizes[i])
+    return out
+
+
+def check(rng, trials, capacity=16):
+    """Random mixes, some loads above capacity: pack must give the loop's exact bins."""
+    for _ in range(trials):
+        n = int(rng.integers(1, 60))
+        sizes = rng.choice([0.5, 1, 2, 3, 6, 8, 12, 15, 16, 18, 20, 30], size=n)
+        expected, got = loop_ffd(sizes, capacity), pack(sizes, capacity)
+        if not np.array_equal(expected, got):
+            raise AssertionError(f'pack({sizes.tolist()}, {capacity}) = {got.tolist()}, '
+                                 f'first fit gives {expected.tolist()}')
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--loop-max', type=int, default=2000,
+                        help='skip the item loop above this many loads')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--check', type=int, default=500,
+                        help='random load mixes compared against the item loop first')
+    args = parser.parse_args(argv)
+
+    params = load_parameters(PARAMS_FILE)
+    rng = np.random.default_rng(0)
+    check(rng, args.check)
+    print(f"pack matches the item loop on {args.check} random load mixes")
+    print(f"{'rows':>8} {'loads':>8} {'loop ffd':>10} {'pack':>10} {'plan':>10}   (ms)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.rows:
+            path = Path(tmp) / f'inventory_{n}.csv'
+            synthetic_inventory(path, n)
+            table = load_inventory(path)
+            plan = ElectricalPlan(params, table)
+            sizes = rng.choice([2, 3, 6, 8, 12], size=len(plan.rows)).astype(float)
+            loop = float('nan')
+            if len(sizes) <= args.loop_max:
+                loop = best_of(lambda: loop_ffd(sizes, 16), args.repeat)
+                assert (loop_ffd(sizes, 16).max() == pack(sizes, 16).max())
+            row = [loop, best_of(lambda: pack(sizes, 16), args.repeat),
+                   best_of(lambda: ElectricalPlan(params, table), args.repeat)]
+            print(f'{n:>8} {len(sizes):>8} ' + ' '.join(f'{ms:>10.2f}' for ms in row))
+
+
+if __name__ == '__main__':
+    main()
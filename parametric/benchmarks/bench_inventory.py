@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Inventory ingest benchmark: csv.DictReader rows vs the columnar loader.
+Replicates data/station_inventory.csv to each row count (ids suffixed per
+copy, as a multi-site list would) and times
+  dict rows   csv.DictReader into dicts, then footprints and circuits per
+              zone in a row loop (the obvious loader)
+  columnar    load_inventory: csv.reader rows transposed into column arrays,
+              each distinct station type converted once
+  join        linking rows to parameters stations by inventory_id
+  derived     total footprints, circuits per zone and voltage mix
+The columnar load must beat dict rows and stay under LOAD_BUDGET_MS;
+exit status 1 when it does not.
+
+Example:
+    python benchmarks/bench_inventory.py --rows 1000 10000 100000
+"""
+
+import argparse
+import csv
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from constraints import load_parameters  # noqa: E402
+from inventory import INVENTORY_FILE, load_inventory  # noqa: E402
+from model import PARAMS_FILE  # noqa: E402
+
+LOAD_BUDGET_MS = 1000
+
+
+def synthetic_inventory(path, rows):
+    """Write rows inventory lines cycling the real file; copies after the first get -siteN ids."""
+    with open(INVENTORY_FILE, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        base = list(reader)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for k in range(rows):
+            row = list(base[k % len(base)])
+            site = k // len(base)
+            if site:
+                row[0] = f'{row[0]}-site{site}'
+            writer.writerow(row)
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def dict_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    circuits = {}
+    for r in rows:
+        w = float(r['width_in'] or 0) + 2 * float(r['clearance_sides_in'] or 0)
+        d = (float(r['depth_in'] or 0) + float(r['clearance_front_in'] or 0)
+             + float(r['clearance_rear_in'] or 0))
+        r['total_footprint_sqft'] = w * d / 144
+        circuits[r['zone']] = circuits.get(r['zone'], 0) + int(r['power_circuits'] or 0)
+    return rows, circuits
+
+
+def derived(table):
+    return (table.total_footprint_sqft, table.circuits_per_zone(), table.voltage_mix())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    params = load_parameters(PARAMS_FILE)
+    columns = ['dict rows', 'columnar', 'join', 'derived']
+    print(f"{'rows':>8} " + ' '.join(f'{c:>10}' for c in columns) + '   (ms)  speedup')
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.rows:
+            path = Path(tmp) / f'inventory_{n}.csv'
+            synthetic_inventory(path, n)
+            table = load_inventory(path)
+            row = [
+                best_of(lambda: dict_rows(path), args.repeat),
+                best_of(lambda: load_inventory(path), args.repeat),
+                best_of(lambda: table.join(params), args.repeat),
+                best_of(lambda: derived(table), args.repeat),
+            ]
+            ok = row[1] < row[0] and row[1] <= LOAD_BUDGET_MS
+            failed |= not ok
+            print(f'{n:>8} ' + ' '.join(f'{ms:>10.2f}' for ms in row)
+                  + f'        {row[0] / row[1]:>5.2f}x {"OK" if ok else "SLOW"}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
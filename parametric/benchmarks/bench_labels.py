@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Label placement benchmark over synthetic floor plans.
+For every (room size, station count) case it places the station labels
+with labels.LabelPlacer at the plan's own text scale and reports
+  place       placement time with the grid-hash index
+  linear      the same placement with every label in one index cell, i.e.
+              each test scans all earlier labels (skipped above --linear-max)
+  modes       how many labels went inside / rotated / leader / callout, and
+              how many were dropped (no free spot even for a callout number)
+  overlaps    overlapping label pairs (collisions.sweep_pairs): the placer's
+              labels vs the old fixed 5pt labels centred on each footprint
+
+Example:
+    python benchmarks/bench_labels.py --rooms 30 100 --stations 100 1000 10000
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import matplotlib  # noqa: E402
+matplotlib.use('Agg')
+
+from collisions import sweep_pairs  # noqa: E402
+from labels import (MODES, STATION_SIZES, LabelPlacer, plan_bounds, station_texts,  # noqa: E402
+                    text_extent)
+from model import PARAMS_FILE, as_layout  # noqa: E402
+from render_layout import room_scene  # noqa: E402
+from synthetic import synthetic_layout  # noqa: E402
+
+
+def _case(layout, repeat, cell=None):
+    """(best ms, placed labels) for the station labels of a layout."""
+    scene = room_scene(layout, '')
+    xywh = layout.stations.placed_xywh
+    boxes = np.c_[xywh[:, :2], xywh[:, :2] + xywh[:, 2:]]
+    texts = station_texts(layout.stations.placed_ids)
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        placer = LabelPlacer(scene.text_points_per_inch, plan_bounds(layout),
+                             **({'cell': cell} if cell else {}))
+        placer.reserve_scene(scene)
+        placed = placer.place(boxes, texts, sizes=STATION_SIZES)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000, placed
+
+
+def _centred(layout):
+    """Rectangles of the old labels: 5pt stacked ids centred on each footprint."""
+    k = room_scene(layout, '').text_points_per_inch
+    xywh = layout.stations.placed_xywh
+    out = []
+    for (x, y, w, d), (text, _) in zip(xywh.tolist(),
+                                       station_texts(layout.stations.placed_ids)):
+        tw, th = text_extent(text, 5)
+        cx, cy = x + w / 2, y + d / 2
+        out.append((cx - tw / k / 2, cy - th / k / 2, cx + tw / k / 2, cy + th / k / 2))
+    return np.array(out).reshape(-1, 4)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rooms', type=float, nargs='+', default=[30, 100])
+    parser.add_argument('--stations', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--linear-max', type=int, default=2000,
+                        help='skip the single-cell (linear scan) run above this many stations')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with open(PARAMS_FILE) as f:
+        base = json.load(f)
+    print(f"{'room':>5} {'stations':>8} {'place':>9} {'linear':>9}  "
+          + ' '.join(f'{m:>8}' for m in MODES + ['dropped'])
+          + f" {'overlaps':>9} {'old':>6}")
+    for room_ft in args.rooms:
+        for n in args.stations:
+            layout = as_layout(synthetic_layout(base, n, room_ft=room_ft, bump=False))
+            _case(layout, 1)  # warm the text extent cache
+            ms, placed = _case(layout, args.repeat)
+            linear = '-'
+            if n <= args.linear_max:
+                linear = f'{_case(layout, args.repeat, cell=1e12)[0]:7.1f}ms'
+            modes = [sum(p is not None and p['mode'] == m for p in placed) for m in MODES]
+            modes.append(sum(p is None for p in placed))
+            rects = np.array([p['rect'] for p in placed if p is not None]).reshape(-1, 4)
+            overlaps = len(sweep_pairs(rects)[0])
+            old = len(sweep_pairs(_centred(layout))[0])
+            print(f"{room_ft:>4g}' {n:>8} {ms:>7.1f}ms {linear:>9}  "
+                  + ' '.join(f'{c:>8}' for c in modes) + f" {overlaps:>9} {old:>6}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Parameter loading benchmark: raw JSON vs the compiled layout model.
+For synthetic layouts of growing size, times
+  json        json.load of the file (the old load_parameters)
+  compile     json.load + validate/compile to a Layout (cold cache)
+  cached      load_layout with a warm compiled cache
+  dict boxes  zone/station boxes pulled from the dicts (old render loops)
+  table boxes the same boxes from the compiled tables
+
+Example:
+    python benchmarks/bench_params.py --counts 100 1000 10000 100000
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from constraints import placed_footprint  # noqa: E402
+from model import PARAMS_FILE, compile_layout, load_layout  # noqa: E402
+from synthetic import synthetic_layout  # noqa: E402
+
+
+def best_of(fn, repeat):
+    """Fastest of repeat calls, in milliseconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def dict_boxes(params):
+    zones = [(z['x_start'], z['y_start'], z['width'], z['depth'])
+             for z in params['zones'].values()]
+    stations = params['stations']
+    placed = []
+    for sid, pos in params.get('station_positions', {}).items():
+        if sid.startswith('_') or sid not in stations:
+            continue
+        w, d = placed_footprint(stations[sid], pos)
+        placed.append((pos['x'], pos['y'], w, d))
+    return zones, placed
+
+
+def table_boxes(layout):
+    return layout.zones.xywh, layout.stations.placed_xywh
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--counts', type=int, nargs='+', default=[100, 1000, 10000, 100000],
+                        help='station counts to synthesize')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with open(PARAMS_FILE) as f:
+        base = json.load(f)
+    columns = ['json', 'compile', 'cached', 'dict boxes', 'table boxes']
+    print(f"{'stations':>8} " + ' '.join(f'{c:>12}' for c in columns) + '   (ms)')
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.counts:
+            path = Path(tmp) / f'params_{n}.json'
+            path.write_text(json.dumps(synthetic_layout(base, n)))
+            cache_dir = Path(tmp) / 'cache'
+
+            def raw():
+                with open(path) as f:
+                    return json.load(f)
+
+            params = raw()
+            layout = compile_layout(params)
+            load_layout(path, cache_dir)  # warm the compiled cache
+            row = [
+                best_of(raw, args.repeat),
+                best_of(lambda: compile_layout(raw()), args.repeat),
+                best_of(lambda: load_layout(path, cache_dir), args.repeat),
+                best_of(lambda: dict_boxes(params), args.repeat),
+                best_of(lambda: table_boxes(layout), args.repeat),
+            ]
+            print(f'{n:>8} ' + ' '.join(f'{ms:>12.2f}' for ms in row))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Render benchmark suite over synthetic floor plans.
+For every (room size, station count, bump-out) case it times each stage
+separately - setup_figure, the figure build of each view (room frame excluded),
+savefig per output format and DPI, the PNG composited over the cached room
+background and the matplotlib-free scene SVG writer, best of N runs after a
+warm-up - records the peak Python heap of each stage (tracemalloc, in a
+separate untimed pass) and writes JSON results so runs on different commits
+can be compared.
+
+Examples:
+    python benchmarks/bench_render.py --quick -o before.json
+    python benchmarks/bench_render.py -o after.json
+    python benchmarks/bench_render.py --compare before.json after.json
+"""
+
+import argparse
+import io
+import itertools
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import matplotlib  # noqa: E402
+matplotlib.use('Agg')
+import numpy as np  # noqa: E402
+
+import render_layout  # noqa: E402
+from render_layout import load_parameters, setup_figure  # noqa: E402
+from render_layout import SCENES, render_flow, render_stations, render_zones  # noqa: E402
+from render_layout import background  # noqa: E402
+from scene import svg_string  # noqa: E402
+from synthetic import synthetic_layout  # noqa: E402
+
+STAGES = {
+    'zones': render_zones,
+    'stations': render_stations,
+    'flow': render_flow,
+}
+
+FULL = {
+    'rooms': [15, 30, 100, 300],
+    'counts': [10, 100, 1000, 10000],
+    'bump': [True, False],
+    'dpis': [72, 150, 300],
+    'formats': ['png', 'svg', 'pdf'],
+}
+QUICK = {
+    'rooms': [30],
+    'counts': [10, 1000],
+    'bump': [True],
+    'dpis': [72],
+    'formats': ['png'],
+}
+
+
+def _best(fn, repeat):
+    """Fastest of repeat runs of fn() in ms (after one warm-up run)."""
+    fn()
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - t0) * 1000)
+    return best
+
+
+def _peak_kb(fn):
+    """Peak traced Python allocation (KiB) while running fn()."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def _timed_render(render, params):
+    """Run a view render; returns (fig, total ms, ms spent inside room_scene).
+
+    The view scenes call room_scene through the module global, so wrapping it
+    there splits the view build from the shared room/grid frame exactly.
+    """
+    spent = []
+    original = render_layout.room_scene
+
+    def timed(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            spent.append(time.perf_counter() - t0)
+
+    render_layout.room_scene = timed
+    try:
+        t0 = time.perf_counter()
+        fig, ax = render(params)
+        total = time.perf_counter() - t0
+    finally:
+        render_layout.room_scene = original
+    return fig, total * 1000, sum(spent) * 1000
+
+
+def _save(fig, fmt, dpi):
+    fig.savefig(io.BytesIO(), format=fmt, dpi=dpi, facecolor='white')
+
+
+def bench_case(params, dpis, formats, repeat, memory):
+    """Stage results for one synthetic layout: [{stage, view, format, dpi, ms, peak_kb}]."""
+    results = []
+    setup = []
+    for view, render in STAGES.items():
+        runs = [_timed_render(render, params) for _ in range(repeat + 1)][1:]
+        fig = runs[-1][0]
+        setup += [s for _, _, s in runs]
+        row = {'stage': f'render_{view}', 'view': view,
+               'ms': round(min(t - s for _, t, s in runs), 2)}
+        if memory:
+            row['peak_kb'] = round(_peak_kb(lambda: render(params)), 1)
+        results.append(row)
+
+        for fmt, dpi in itertools.product(formats, dpis):
+            if fmt != 'png' and dpi != dpis[0]:
+                continue  # vector output ignores DPI (aside from embedded images)
+            row = {'stage': 'savefig', 'view': view, 'format': fmt, 'dpi': dpi,
+                   'ms': round(_best(lambda: _save(fig, fmt, dpi), repeat), 2)}
+            if memory:
+                row['peak_kb'] = round(_peak_kb(lambda: _save(fig, fmt, dpi)), 1)
+            results.append(row)
+
+        if 'png' in formats and view in SCENES:
+            scene = SCENES[view](params)
+            for dpi in dpis:
+                # Background built once (the warm-up run); each timed run only composites
+                row = {'stage': 'composite', 'view': view, 'format': 'png', 'dpi': dpi,
+                       'ms': round(_best(lambda: background(params, scene, dpi).png(scene),
+                                         repeat), 2)}
+                if memory:
+                    row['peak_kb'] = round(_peak_kb(
+                        lambda: background(params, scene, dpi).png(scene)), 1)
+                results.append(row)
+
+        if 'svg' in formats and view in SCENES:
+            scene = SCENES[view](params)
+            row = {'stage': 'write_svg', 'view': view, 'format': 'svg',
+                   'ms': round(_best(lambda: svg_string(scene), repeat), 2)}
+            if memory:
+                row['peak_kb'] = round(_peak_kb(lambda: svg_string(scene)), 1)
+            results.append(row)
+
+    row = {'stage': 'setup_figure', 'ms': round(min(setup), 2)}
+    if memory:
+        row['peak_kb'] = round(_peak_kb(lambda: setup_figure(params, 'benchmark')), 1)
+    results.insert(0, row)
+    return results
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                             text=True, cwd=Path(__file__).parent)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_suite(matrix, repeat=3, memory=True, progress=print):
+    base = load_parameters()
+    cases = []
+    for room_ft, n, bump in itertools.product(matrix['rooms'], matrix['counts'], matrix['bump']):
+        params = synthetic_layout(base, n, room_ft=room_ft, bump=bump)
+        t0 = time.perf_counter()
+        stages = bench_case(params, matrix['dpis'], matrix['formats'], repeat, memory)
+        progress(f"room {room_ft:>3g}' stations {n:>5} bump {'on ' if bump else 'off'} "
+                 f"{time.perf_counter() - t0:6.1f} s")
+        cases.append({'room_ft': room_ft, 'stations': n, 'zones': max(1, n // 4),
+                      'bump_out': bump, 'stages': stages})
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'matplotlib': matplotlib.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'repeat': repeat,
+            'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        },
+        'matrix': matrix,
+        'cases': cases,
+    }
+
+
+def _rows(results):
+    """{case/stage key: ms} for comparison."""
+    rows = {}
+    for case in results['cases']:
+        prefix = (f"{case['room_ft']}ft/{case['stations']}st/"
+                  f"{'bump' if case['bump_out'] else 'nobump'}")
+        for s in case['stages']:
+            parts = [prefix, s['stage'], s.get('view'), s.get('format'), s.get('dpi')]
+            rows['/'.join(str(p) for p in parts if p is not None)] = s['ms']
+    return rows
+
+
+def compare(old, new, threshold=0.20, min_ms=10.0):
+    """Print per-stage ratios; returns the number of regressions beyond threshold."""
+    a, b = _rows(old), _rows(new)
+    regressions = 0
+    print(f"{'case/stage':<58} {'old ms':>9} {'new ms':>9} {'ratio':>7}")
+    for key in sorted(a.keys() & b.keys()):
+        ratio = b[key] / a[key] if a[key] else float('inf')
+        slow = ratio > 1 + threshold and b[key] - a[key] > min_ms
+        regressions += slow
+        print(f"{key:<58} {a[key]:>9.1f} {b[key]:>9.1f} {ratio:>6.2f}x{'  REGRESSION' if slow else ''}")
+    missing = sorted(a.keys() ^ b.keys())
+    if missing:
+        print(f"{len(missing)} stages only in one file (matrix differs)")
+    print(f"{regressions} regressions over {threshold:.0%} "
+          f"({old['meta'].get('commit')} -> {new['meta'].get('commit')})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='small matrix for a fast check')
+    parser.add_argument('--rooms', type=float, nargs='+', help='room widths in feet')
+    parser.add_argument('--counts', type=int, nargs='+', help='station counts')
+    parser.add_argument('--bump', choices=['on', 'off', 'both'], default=None)
+    parser.add_argument('--dpis', type=int, nargs='+')
+    parser.add_argument('--formats', nargs='+', choices=['png', 'svg', 'pdf'])
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per stage (best kept)')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('-o', '--out', type=Path, default=None, help='write results JSON here')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), type=Path,
+                        help='compare two results files instead of running')
+    parser.add_argument('--threshold', type=float, default=0.20,
+                        help='regression threshold for --compare (default 0.20)')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        old, new = (json.loads(p.read_text()) for p in args.compare)
+        return 1 if compare(old, new, args.threshold) else 0
+
+    matrix = dict(QUICK if args.quick else FULL)
+    for key in ('rooms', 'counts', 'dpis', 'formats'):
+        if getattr(args, key):
+            matrix[key] = getattr(args, key)
+    if args.bump:
+        matrix['bump'] = {'on': [True], 'off': [False], 'both': [True, False]}[args.bump]
+
+    results = run_suite(matrix, args.repeat, not args.no_memory,
+                        progress=lambda line: print(line, file=sys.stderr))
+    text = json.dumps(results, indent=1)
+    if args.out:
+        args.out.write_text(text)
+        print(f"Saved: {args.out}", file=sys.stderr)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
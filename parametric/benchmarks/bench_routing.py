@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Flow routing benchmark: full re-route vs incremental move().
+Nudges random stations of data/parameters.json (an interactive drag) and
+times, per move,
+  full        a fresh FlowRouter routing every leg
+  move        FlowRouter.move on a warm router (re-plans affected legs only)
+and checks both give the same legs. Also reports how many legs move()
+re-planned on average.
+
+Example:
+    python benchmarks/bench_routing.py --moves 50
+"""
+
+import argparse
+import copy
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from constraints import load_parameters  # noqa: E402
+from model import PARAMS_FILE  # noqa: E402
+from routing import FlowRouter  # noqa: E402
+
+
+def same_legs(a, b):
+    return all(x['status'] == y['status'] and x['points'].shape == y['points'].shape
+               and np.allclose(x['points'], y['points']) for x, y in zip(a, b))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--moves', type=int, default=50)
+    parser.add_argument('--step', type=int, default=24, help='max nudge per move (inches)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    params = load_parameters(PARAMS_FILE)
+    room = params['room']
+    rng = np.random.default_rng(args.seed)
+    ids = [sid for sid in params['station_positions'] if not sid.startswith('_')]
+    router = FlowRouter(params)
+    router.route()
+
+    full, moved, replanned = [], [], []
+    for _ in range(args.moves):
+        sid = ids[rng.integers(len(ids))]
+        pos = params['station_positions'][sid]
+        x = int(np.clip(pos['x'] + rng.integers(-args.step, args.step + 1), 0, room['room_width']))
+        y = int(np.clip(pos['y'] + rng.integers(-args.step, args.step + 1), 0, room['room_depth']))
+        params = copy.deepcopy(params)
+        params['station_positions'][sid] = dict(pos, x=x, y=y)
+
+        t0 = time.perf_counter()
+        replanned.append(len(router.move(sid, x, y)))
+        moved.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        fresh = FlowRouter(params).route()
+        full.append(time.perf_counter() - t0)
+        assert same_legs(router.route(), fresh), f'move({sid}) diverged from a full route'
+
+    legs = len(router.route())
+    print(f"{args.moves} moves, {legs} legs")
+    print(f"  full   {np.median(full) * 1000:8.1f} ms median")
+    print(f"  move   {np.median(moved) * 1000:8.1f} ms median, "
+          f"{np.mean(replanned):.1f}/{legs} legs re-planned on average")
+
+
+if __name__ == '__main__':
+    main()
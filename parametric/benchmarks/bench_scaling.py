@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Figure-build scaling benchmark for the parametric layout renderer.
+Synthesizes layouts with 12 to 10,000 stations (and a quarter as many zones)
+on a regular grid inside the room, then times building each view and
+encoding it to PNG.
+
+Example:
+    python benchmarks/bench_scaling.py --counts 12 100 1000 10000
+"""
+
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from render_layout import VIEWS, load_parameters  # noqa: E402
+from synthetic import synthetic_layout  # noqa: E402
+
+
+def time_view(view, params, dpi):
+    """(build seconds, encode seconds) for one view."""
+    render, _ = VIEWS[view]
+    t0 = time.perf_counter()
+    fig, ax = render(params)
+    t1 = time.perf_counter()
+    fig.savefig(io.BytesIO(), format='png', dpi=dpi, facecolor='white')
+    return t1 - t0, time.perf_counter() - t1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--counts', type=int, nargs='+', default=[12, 100, 1000, 10000],
+                        help='station counts to synthesize')
+    parser.add_argument('--views', nargs='+', choices=list(VIEWS),
+                        default=['zones', 'stations', 'flow'])
+    parser.add_argument('--dpi', type=int, default=72)
+    args = parser.parse_args(argv)
+
+    base = load_parameters()
+    print(f"{'stations':>8} {'view':<10} {'build ms':>10} {'encode ms':>10}")
+    for n in args.counts:
+        params = synthetic_layout(base, n)
+        for view in args.views:
+            build, encode = time_view(view, params, args.dpi)
+            print(f'{n:>8} {view:<10} {build * 1000:>10.1f} {encode * 1000:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Render service benchmark: requests per second through serve.RenderService.
+Starts the service in-process on a free port and drives it over keep-alive
+HTTP connections:
+  shell       one fresh interpreter per render (what the dashboard did before)
+  unique      distinct patches (one station nudged per request), all rendered
+  repeat      the same patches again, served from the in-memory LRU
+  identical   --clients concurrent copies of one new patch, coalesced onto
+              a single render
+
+Example:
+    python benchmarks/bench_serve.py -j 8 --requests 200 --clients 16
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from serve import RenderService  # noqa: E402
+
+HERE = Path(__file__).resolve().parent.parent
+SHELL_RENDER = ("import matplotlib; matplotlib.use('Agg'); "
+                "from render_layout import load_parameters, render_bytes; "
+                "render_bytes({view!r}, load_parameters())")
+
+
+async def _fetch(reader, writer, path, body):
+    """POST body on an open connection; returns (status, headers, payload)."""
+    writer.write((f"POST {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(body)}\r\n\r\n")
+                 .encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode().partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return status, headers, await reader.readexactly(int(headers['content-length']))
+
+
+async def _drive(port, path, bodies, clients):
+    """Send bodies over `clients` connections; returns (seconds, X-Render counts)."""
+    queue = asyncio.Queue()
+    for body in bodies:
+        queue.put_nowait(body)
+    how = {}
+
+    async def client():
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        while not queue.empty():
+            status, headers, _ = await _fetch(reader, writer, path, queue.get_nowait())
+            key = headers.get('x-render', str(status))
+            how[key] = how.get(key, 0) + 1
+        writer.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return time.perf_counter() - t0, how
+
+
+def _patches(base, n, offset=0):
+    """n patch bodies, each nudging the first placed station to a new x."""
+    positions = base['station_positions']
+    sid = next(k for k, v in positions.items() if isinstance(v, dict))
+    x = positions[sid]['x']
+    return [json.dumps({'patch': {'station_positions': {sid: {'x': x + (offset + i) / 8}}}})
+            .encode() for i in range(n)]
+
+
+def _row(name, n, seconds, how):
+    counts = ' '.join(f'{k}={v}' for k, v in sorted(how.items()))
+    print(f"{name:>10} {n:>6} {seconds:>8.2f}s {n / seconds:>9.1f}/s  {counts}")
+
+
+async def _run(args):
+    service = RenderService(jobs=args.jobs, dpi=args.dpi)
+    t0 = time.perf_counter()
+    service.start()
+    ports = []
+    server = asyncio.create_task(service.serve(port=0, ready=ports.append))
+    while not ports:
+        await asyncio.sleep(0.01)
+    port, path = ports[0], f'/render/{args.view}?dpi={args.dpi}'
+    base = service.base()
+
+    # The first round waits for the pool to spawn and warm up
+    await _drive(port, path, _patches(base, service.jobs, offset=-service.jobs), service.jobs)
+    print(f"{service.jobs} worker(s) warm in {time.perf_counter() - t0:.2f} s; "
+          f"view {args.view} at {args.dpi} dpi, {args.clients} clients")
+    print(f"{'case':>10} {'reqs':>6} {'time':>9} {'rate':>11}  results")
+
+    bodies = _patches(base, args.requests)
+    _row('unique', len(bodies), *await _drive(port, path, bodies, args.clients))
+    _row('repeat', len(bodies), *await _drive(port, path, bodies, args.clients))
+    same = _patches(base, 1, offset=args.requests) * args.clients
+    _row('identical', len(same), *await _drive(port, path, same, args.clients))
+
+    server.cancel()
+    service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='service worker processes (default: CPU count)')
+    parser.add_argument('--view', default='stations')
+    parser.add_argument('--dpi', type=int, default=150)
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--clients', type=int, default=16, help='concurrent connections')
+    parser.add_argument('--shell', type=int, default=3,
+                        help='fresh-interpreter renders for the baseline (0 to skip)')
+    args = parser.parse_args(argv)
+
+    if args.shell:
+        t0 = time.perf_counter()
+        for _ in range(args.shell):
+            subprocess.run([sys.executable, '-c', SHELL_RENDER.format(view=args.view)],
+                           cwd=HERE, check=True, env=dict(os.environ, MPLBACKEND='Agg'))
+        seconds = time.perf_counter() - t0
+        _row('shell', args.shell, seconds, {})
+    asyncio.run(_run(args))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
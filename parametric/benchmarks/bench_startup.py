@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Startup budget check for the non-rendering CLI subcommands.
+Runs each command in a fresh interpreter several times, reports the median
+wall time against its budget and verifies matplotlib is never imported.
+Exit status 1 when any command is over budget or pulls in matplotlib.
+
+Example:
+    python benchmarks/bench_startup.py --runs 7
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CLI = Path(__file__).resolve().parent.parent / "cli.py"
+
+# Median wall-clock budget per command, milliseconds (interpreter start included)
+BUDGET_MS = {
+    'validate': 250,
+    'stats': 250,
+    'export-dxf': 250,
+}
+
+
+def command_args(name, tmp):
+    if name == 'export-dxf':
+        return ['export-dxf', '-o', str(Path(tmp) / 'layout.dxf')]
+    return [name]
+
+
+def time_command(args, runs):
+    """Median wall time (ms) of running cli.py with args."""
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, str(CLI)] + args,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def imports_matplotlib(args):
+    """True if running the command imports any matplotlib module."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', str(CLI)] + args,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    # importtime lines end in "| <indented module name>"
+    modules = (line.rsplit('|', 1)[-1].strip() for line in result.stderr.splitlines())
+    return any(m.split('.')[0] == 'matplotlib' for m in modules)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    baseline = time_command(['--help'], args.runs)
+    print(f"{'command':<12} {'median ms':>10} {'budget':>8}  matplotlib")
+    print(f"{'(--help)':<12} {baseline:>10.0f} {'':>8}")
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, budget in BUDGET_MS.items():
+            cmd = command_args(name, tmp)
+            ms = time_command(cmd, args.runs)
+            mpl = imports_matplotlib(cmd)
+            ok = ms <= budget and not mpl
+            failed |= not ok
+            print(f"{name:<12} {ms:>10.0f} {budget:>8}  {'YES' if mpl else 'no':<10} "
+                  f"{'OK' if ok else 'OVER'}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Synthetic parameter files for renderer benchmarks.
+Starts from data/parameters.json and replaces the room size, bump-out flag,
+zones and stations with generated ones: zones tile the main room, stations
+sit on a regular grid inside it. Derived fields are refreshed like a sweep.
+
+Example:
+    python benchmarks/synthetic.py --room-ft 100 --stations 1000 -o /tmp/big.json
+"""
+
+import argparse
+import copy
+import json
+import math
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sweep import refresh_derived  # noqa: E402
+
+CATEGORIES = ['clean', 'dusty', 'dirty_fume', 'shared']
+
+
+def _tiles(n, width, depth):
+    """n (x, y, w, h) cells tiling a width x depth rectangle row by row."""
+    cols = max(1, math.ceil(math.sqrt(n * width / depth)))
+    rows = max(1, math.ceil(n / cols))
+    cw, ch = width / cols, depth / rows
+    return [((i % cols) * cw, (i // cols) * ch, cw, ch) for i in range(n)]
+
+
+def synthetic_layout(base, stations, zones=None, room_ft=None, bump=None):
+    """Copy of base with generated stations (and zones) filling the main room.
+
+    room_ft sets the room width in feet (depth is half of it); bump toggles
+    the bump-out, which is kept on the east end of the back wall.
+    zones defaults to a quarter of the station count.
+    """
+    params = copy.deepcopy(base)
+    room = params['room']
+    if room_ft is not None:
+        room['room_width'] = round(room_ft * 12)
+        room['room_depth'] = round(room_ft * 6)
+    room_w, room_d = room['room_width'], room['room_depth']
+
+    bump_out = params['bump_out']
+    if bump is not None:
+        bump_out['enabled'] = bump
+    bump_out['width'] = min(bump_out['width'], room_w)
+    bump_out['x_start'] = room_w - bump_out['width']
+
+    zones = max(1, stations // 4) if zones is None else zones
+    params['zones'] = {}
+    for i, (x, y, w, h) in enumerate(_tiles(zones, room_w, room_d)):
+        params['zones'][f'zone_{i}'] = {
+            'name': f'Zone {i}', 'category': CATEGORIES[i % len(CATEGORIES)],
+            'x_start': x, 'y_start': y, 'width': w, 'depth': h,
+            'area_sqft': round(w * h / 144),
+        }
+
+    params['stations'] = {}
+    params['station_positions'] = {}
+    for i, (x, y, w, h) in enumerate(_tiles(stations, room_w, room_d)):
+        sid = f'station_{i}'
+        params['stations'][sid] = {'name': f'Station {i}', 'width': w * 0.7, 'depth': h * 0.7}
+        params['station_positions'][sid] = {'x': x + w * 0.15, 'y': y + h * 0.15}
+    return refresh_derived(params)
+
+
+def main(argv=None):
+    from render_layout import PARAMS_FILE, load_parameters
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--base', default=PARAMS_FILE, help='base parameters file')
+    parser.add_argument('--room-ft', type=float, default=None, help='room width in feet')
+    parser.add_argument('--stations', type=int, default=100)
+    parser.add_argument('--zones', type=int, default=None)
+    parser.add_argument('--bump', choices=['on', 'off'], default=None)
+    parser.add_argument('-o', '--out', required=True, help='output parameters file')
+    args = parser.parse_args(argv)
+
+    bump = None if args.bump is None else args.bump == 'on'
+    params = synthetic_layout(load_parameters(args.base), args.stations, args.zones,
+                              args.room_ft, bump)
+    with open(args.out, 'w') as f:
+        json.dump(params, f, indent=2)
+    print(f"Saved: {args.out} ({len(params['zones'])} zones, {len(params['stations'])} stations)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Command-line entry point for the parametric layout tools.
+
+    python cli.py validate [params.json]       constraint report, exit 1 on violations
+    python cli.py stats [--params FILE] [--json]
+    python cli.py export-dxf [--params FILE] [-o OUT]
+    python cli.py render [-j N] [--views ...] [--no-cache]
+    python cli.py watch [--views ...] [-j N]     re-render views as inputs change
+    python cli.py serve [--port N] [-j N]        HTTP render service with warm workers
+    python cli.py airflow [params.json]        dust/fume exposure per zone
+    python cli.py ducts [params.json]          blast-gate configurations that starve a tool
+    python cli.py inventory [inventory.csv]    inventory join, circuits and voltage per zone
+    python cli.py electrical [params.json]     outlets and circuits packed from the inventory
+    python cli.py collisions [params.json]     footprint / service-clearance conflicts
+    python cli.py route [params.json]          routed material-flow legs and total distance
+    python cli.py labels [params.json]         where each station label lands (inside/leader/callout)
+    python cli.py diff OLD [NEW] [-o PNG]      changed zones/stations/cabinetry and an overlay plan
+
+Only `render`, `watch`, `serve`, `labels` and `diff` import matplotlib (forced to
+the headless Agg backend); each subcommand imports its module lazily, so
+validate/stats/export-dxf start fast enough for a pre-commit hook. See
+benchmarks/bench_startup.py for the budget.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+PARAMS_FILE = SCRIPT_DIR / "data" / "parameters.json"
+
+
+def cmd_validate(argv):
+    import constraints
+    return constraints.main(argv)
+
+
+def cmd_export_dxf(argv):
+    import dxf_export
+    return dxf_export.main(argv)
+
+
+def cmd_render(argv):
+    import matplotlib
+    matplotlib.use('Agg')
+    import render_layout
+    return render_layout.main(argv)
+
+
+def cmd_airflow(argv):
+    import airflow
+    return airflow.main(argv)
+
+
+def cmd_ducts(argv):
+    import ducts
+    return ducts.main(argv)
+
+
+def cmd_inventory(argv):
+    import inventory
+    return inventory.main(argv)
+
+
+def cmd_electrical(argv):
+    import electrical
+    return electrical.main(argv)
+
+
+def cmd_collisions(argv):
+    import collisions
+    return collisions.main(argv)
+
+
+def cmd_route(argv):
+    import routing
+    return routing.main(argv)
+
+
+def cmd_labels(argv):
+    import matplotlib
+    matplotlib.use('Agg')
+    import labels
+    return labels.main(argv)
+
+
+def cmd_diff(argv):
+    import matplotlib
+    matplotlib.use('Agg')
+    import layout_diff
+    return layout_diff.main(argv)
+
+
+def cmd_watch(argv):
+    import matplotlib
+    matplotlib.use('Agg')
+    import watch
+    return watch.main(argv)
+
+
+def cmd_serve(argv):
+    import matplotlib
+    matplotlib.use('Agg')
+    import serve
+    return serve.main(argv)
+
+
+def layout_stats(params):
+    """Areas, counts and floor coverage for a parameters dict."""
+    from constraints import placed_footprint
+
+    room = params['room']
+    bump = params.get('bump_out', {})
+    main_sqft = room['room_width'] * room['room_depth'] / 144
+    bump_sqft = bump['width'] * bump['depth'] / 144 if bump.get('enabled') else 0
+
+    zone_sqft = {}
+    for zone in params['zones'].values():
+        cat = zone.get('category', 'shared')
+        zone_sqft[cat] = zone_sqft.get(cat, 0) + zone['width'] * zone['depth'] / 144
+
+    stations = params['stations']
+    placed = {sid: pos for sid, pos in params.get('station_positions', {}).items()
+              if not sid.startswith('_') and sid in stations}
+    footprint = sum(w * d for w, d in (placed_footprint(stations[sid], pos)
+                                       for sid, pos in placed.items())) / 144
+    total = main_sqft + bump_sqft
+    return {
+        'room_sqft': round(main_sqft, 1),
+        'bump_out_sqft': round(bump_sqft, 1),
+        'total_sqft': round(total, 1),
+        'zones': len(params['zones']),
+        'zone_sqft_by_category': {k: round(v, 1) for k, v in sorted(zone_sqft.items())},
+        'stations': len(stations),
+        'stations_placed': len(placed),
+        'station_footprint_sqft': round(footprint, 1),
+        'floor_coverage_pct': round(100 * footprint / total, 1) if total else 0,
+    }
+
+
+def cmd_stats(argv):
+    import json
+    from constraints import load_parameters
+
+    parser = argparse.ArgumentParser(prog='cli.py stats', description='Print layout statistics.')
+    parser.add_argument('--params', default=PARAMS_FILE, help='parameters file')
+    parser.add_argument('--json', action='store_true', help='print JSON instead of text')
+    args = parser.parse_args(argv)
+
+    stats = layout_stats(load_parameters(args.params))
+    if args.json:
+        print(json.dumps(stats, indent=2))
+        return 0
+    print(f"Floor: {stats['total_sqft']} sq ft "
+          f"({stats['room_sqft']} main + {stats['bump_out_sqft']} bump-out)")
+    print(f"Zones: {stats['zones']}")
+    for cat, sqft in stats['zone_sqft_by_category'].items():
+        print(f"  {cat:16s} {sqft:7.1f} sq ft")
+    print(f"Stations: {stats['stations_placed']}/{stats['stations']} placed, "
+          f"{stats['station_footprint_sqft']} sq ft ({stats['floor_coverage_pct']}% of floor)")
+    return 0
+
+
+COMMANDS = {
+    'validate': (cmd_validate, 'check layout constraints (exit 1 on violations)'),
+    'stats': (cmd_stats, 'print areas, counts and floor coverage'),
+    'export-dxf': (cmd_export_dxf, 'write the layout as R12 DXF'),
+    'render': (cmd_render, 'render PNG views (imports matplotlib)'),
+    'watch': (cmd_watch, 're-render changed views when parameters change'),
+    'serve': (cmd_serve, 'serve rendered views over HTTP (imports matplotlib)'),
+    'airflow': (cmd_airflow, 'simulate airflow and report dust/fume exposure per zone'),
+    'ducts': (cmd_ducts, 'solve the duct network for every blast-gate configuration'),
+    'inventory': (cmd_inventory, 'join station_inventory.csv to parameters and sum power'),
+    'electrical': (cmd_electrical, 'place outlets and pack loads onto circuits per zone'),
+    'collisions': (cmd_collisions, 'find overlapping footprints and service clearances'),
+    'route': (cmd_route, 'route the one-way material flow and report its distance'),
+    'labels': (cmd_labels, 'place station labels clear of each other (imports matplotlib)'),
+    'diff': (cmd_diff, 'compare two parameter files and draw what changed (imports matplotlib)'),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Craft Room parametric layout tools.',
+        epilog='Run "cli.py <command> --help" for command options.')
+    sub = parser.add_subparsers(dest='command', required=True, metavar='command')
+    for name, (_, help_text) in COMMANDS.items():
+        # Options are parsed by the command itself
+        sub.add_parser(name, help=help_text, add_help=False)
+    args, rest = parser.parse_known_args(argv)
+    return COMMANDS[args.command][0](rest) or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Clearance-envelope collision detection for Craft Room.
+Every placed station contributes its machine footprint and, when it has
+service_clearance_front/sides/rear, an oriented service envelope around it
+(front toward the main aisle unless station_positions gives "facing");
+cabinet runs, the dust collector and the kayak lane are fixed obstacles.
+
+Overlaps are found by sort-and-sweep: boxes are sorted on their low edge
+along the axis with the larger spread, and each box is only tested against
+the boxes that start before it ends on that axis. The candidate pairs are
+expanded and tested in NumPy chunks, so cost follows the number of nearby
+pairs rather than n^2 and layouts of tens of thousands of objects check in
+milliseconds.
+
+Conflicts:
+  footprint   two footprints overlap, or a footprint sits on a fixed obstacle
+  clearance   a service envelope covers another station or a fixed obstacle
+Service envelopes may overlap each other (two machines sharing an aisle).
+
+Example:
+    python collisions.py [params.json]
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from constraints import PARAMS_FILE, load_parameters
+from model import as_layout
+from placement import service_clearance
+
+# Box kinds in a CollisionSet
+FOOTPRINT, ENVELOPE, FIXED = 0, 1, 2
+
+# Conflict kinds, most severe first
+CONFLICT_KINDS = ['footprint', 'clearance']
+
+# Front directions, counterclockwise: each 90 degrees of rotation turns one step
+FACINGS = ['south', 'east', 'north', 'west']
+
+# Candidate pairs expanded per sweep batch (bounds peak memory)
+SWEEP_CHUNK = 1 << 20
+# Sweep strip height, in median box heights across the sweep axis
+STRIP_BOXES = 4
+
+
+def _pad(front, sides, rear, facing):
+    """(dx0, dy0, dx1, dy1) added to a footprint box for a station facing that way."""
+    return {
+        'south': (-sides, -front, sides, rear),
+        'north': (-sides, -rear, sides, front),
+        'east': (-rear, -sides, front, sides),
+        'west': (-front, -sides, rear, sides),
+    }[facing]
+
+
+def facings(params):
+    """Front direction per placed station (StationTable.placed order).
+
+    An explicit station_positions "facing" wins; otherwise the front points
+    at circulation.main_aisle_y (south when level with or north of it),
+    turned by the station's rotation.
+    """
+    layout = as_layout(params)
+    st = layout.stations
+    positions = layout.params.get('station_positions', {})
+    aisle_y = layout.circulation.get('main_aisle_y')
+    out = []
+    for k in np.flatnonzero(st.placed):
+        pos = positions[st.ids[k]]
+        if 'facing' in pos:
+            if pos['facing'] not in FACINGS:
+                raise ValueError(f"station_positions.{st.ids[k]}.facing: "
+                                 f"expected one of {', '.join(FACINGS)}")
+            out.append(pos['facing'])
+            continue
+        center_y = st.xy[k, 1] + st.extent[k, 1] / 2
+        base = 2 if aisle_y is not None and center_y < aisle_y else 0
+        out.append(FACINGS[(base + int(st.rotation[k] // 90)) % 4])
+    return out
+
+
+def fixed_obstacles(params):
+    """{id: (x0, y0, x1, y1)} for cabinet runs, the dust collector and the kayak lane."""
+    layout = as_layout(params)
+    params = layout.params
+    boxes = {}
+    for key, run in params.get('cabinetry', {}).items():
+        if key.startswith('cabinet_run_'):
+            boxes[key] = (run['x_start'], run['y_start'], run['x_end'], run['y_end'])
+    dc = params.get('infrastructure', {}).get('dust_collector')
+    if dc:
+        boxes['dust_collector'] = (dc['x'], dc['y'], dc['x'] + dc['width'], dc['y'] + dc['depth'])
+    if 'zone_kayak' in layout.zones:
+        boxes['zone_kayak'] = tuple(layout.zones.boxes[layout.zones.index('zone_kayak')])
+    return boxes
+
+
+class CollisionSet:
+    """Boxes (x0, y0, x1, y1) with a kind and an owner, as parallel arrays.
+
+    owner[k] indexes names: placed station ids first, then fixed obstacles.
+    Stations without service clearances have no ENVELOPE box.
+    """
+
+    __slots__ = ('boxes', 'kinds', 'owner', 'names', 'facing')
+
+    def __init__(self, params):
+        layout = as_layout(params)
+        st = layout.stations
+        stations = layout.params['stations']
+        placed = np.flatnonzero(st.placed)
+        self.names = [st.ids[k] for k in placed]
+        self.facing = facings(layout)
+        footprints = np.c_[st.xy[placed], st.xy[placed] + st.extent[placed]]
+        pads = np.array([_pad(*service_clearance(stations[sid]), facing)
+                         for sid, facing in zip(self.names, self.facing)],
+                        dtype=float).reshape(-1, 4)
+        has_envelope = np.flatnonzero(np.abs(pads).sum(axis=1) > 0)
+
+        fixed = fixed_obstacles(layout)
+        m = len(placed)
+        self.names += list(fixed)
+        self.boxes = np.concatenate([footprints, footprints[has_envelope] + pads[has_envelope],
+                                     np.array(list(fixed.values()), dtype=float).reshape(-1, 4)])
+        self.kinds = np.repeat([FOOTPRINT, ENVELOPE, FIXED], [m, len(has_envelope), len(fixed)])
+        self.owner = np.concatenate([np.arange(m), has_envelope, m + np.arange(len(fixed))])
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def envelopes(self):
+        """(owner indices, (k, 4) envelope boxes) for stations with clearances."""
+        env = self.kinds == ENVELOPE
+        return self.owner[env], self.boxes[env]
+
+
+def sweep_pairs(boxes, chunk=SWEEP_CHUNK):
+    """(i, j) index arrays, i < j, of boxes whose interiors overlap (sort-and-sweep).
+
+    Touching edges do not count. Boxes are (x0, y0, x1, y1). The cross axis
+    is cut into strips a few boxes tall and each strip is swept on its own,
+    so a dense column of boxes does not all become candidates of each other;
+    a pair is kept only in the strip holding the low edge of its overlap.
+    """
+    boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+    # Zero-area boxes have no interior to overlap
+    solid = np.flatnonzero((boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1]))
+    boxes = boxes[solid]
+    n = len(boxes)
+    if n < 2:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+
+    # Sweep along the axis where boxes are most spread out (fewest candidates)
+    centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+    ax = 0 if np.ptp(centers[:, 0]) >= np.ptp(centers[:, 1]) else 1
+    other = 1 - ax
+
+    # Strips across the sweep: each box is copied into every strip it touches
+    low = boxes[:, other].min()
+    height = STRIP_BOXES * np.median(boxes[:, other + 2] - boxes[:, other])
+    first = ((boxes[:, other] - low) // height).astype(np.intp)
+    last = np.maximum(np.ceil((boxes[:, other + 2] - low) / height).astype(np.intp) - 1, first)
+    copies = last - first + 1
+    owner = np.repeat(np.arange(n), copies)
+    strip = first[owner] + np.arange(len(owner)) - np.repeat(np.cumsum(copies) - copies, copies)
+
+    # One sorted sweep key: strip-major, then the low edge within the strip
+    origin = boxes[:, ax].min()
+    span = boxes[:, ax + 2].max() - origin + 1
+    key = strip * span + (boxes[owner, ax] - origin)
+    sort = np.argsort(key, kind='stable')
+    key, owner, strip = key[sort], owner[sort], strip[sort]
+    b = boxes[owner]
+
+    # Candidates for sorted copy i: the run after it in its strip that starts before it ends
+    m = len(key)
+    end = np.searchsorted(key, strip * span + (b[:, ax + 2] - origin), side='left')
+    count = np.maximum(end - np.arange(m) - 1, 0)
+    total = np.cumsum(count)
+
+    found_i, found_j = [], []
+    start = 0
+    while start < m:
+        done = total[start - 1] if start else 0
+        stop = max(int(np.searchsorted(total, done + chunk, side='right')), start + 1)
+        c = count[start:stop]
+        i = np.repeat(np.arange(start, stop), c)
+        j = i + 1 + np.arange(len(i)) - np.repeat(np.cumsum(c) - c, c)
+        overlap_low = np.maximum(b[i, other], b[j, other])
+        hit = ((overlap_low < np.minimum(b[i, other + 2], b[j, other + 2]))
+               & (((overlap_low - low) // height).astype(np.intp) == strip[i]))
+        found_i.append(solid[owner[i[hit]]])
+        found_j.append(solid[owner[j[hit]]])
+        start = stop
+    i, j = np.concatenate(found_i), np.concatenate(found_j)
+    return np.minimum(i, j), np.maximum(i, j)
+
+
+def find_conflicts(cset):
+    """Conflicting box pairs of a CollisionSet, as a dict of arrays.
+
+    a, b: box indices (a < b); kind: index into CONFLICT_KINDS; overlap:
+    (k, 4) intersection boxes; area: their areas in square inches.
+    """
+    i, j = sweep_pairs(cset.boxes)
+    ki, kj = cset.kinds[i], cset.kinds[j]
+    real = ((cset.owner[i] != cset.owner[j])
+            & ~((ki == ENVELOPE) & (kj == ENVELOPE))
+            & ~((ki == FIXED) & (kj == FIXED)))
+    i, j = i[real], j[real]
+    kind = ((cset.kinds[i] == ENVELOPE) | (cset.kinds[j] == ENVELOPE)).astype(int)
+    bi, bj = cset.boxes[i], cset.boxes[j]
+    overlap = np.c_[np.maximum(bi[:, :2], bj[:, :2]), np.minimum(bi[:, 2:], bj[:, 2:])]
+    area = np.prod(overlap[:, 2:] - overlap[:, :2], axis=1)
+    return {'a': i, 'b': j, 'kind': kind, 'overlap': overlap, 'area': area}
+
+
+def conflict_report(cset, conflicts=None):
+    """One row per conflicting owner pair: (name a, name b, kind, area) for its worst kind."""
+    conflicts = find_conflicts(cset) if conflicts is None else conflicts
+    oa, ob = cset.owner[conflicts['a']], cset.owner[conflicts['b']]
+    pairs = np.c_[np.minimum(oa, ob), np.maximum(oa, ob)]
+    rows = {}
+    for (p, q), kind, area in zip(pairs.tolist(), conflicts['kind'].tolist(),
+                                  conflicts['area'].tolist()):
+        worst, total = rows.get((p, q), (kind, 0.0))
+        if kind < worst:
+            rows[(p, q)] = (kind, area)
+        elif kind == worst:
+            rows[(p, q)] = (kind, total + area)
+    return [(cset.names[p], cset.names[q], CONFLICT_KINDS[kind], area)
+            for (p, q), (kind, area) in sorted(rows.items(), key=lambda r: (r[1][0], r[0]))]
+
+
+def main(argv=None):
+    """Print clearance conflicts; exit status 1 when any exist."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('params', nargs='?', default=PARAMS_FILE, help='parameters file')
+    args = parser.parse_args(argv)
+    cset = CollisionSet(load_parameters(args.params))
+    rows = conflict_report(cset)
+    owners, _ = cset.envelopes()
+    print(f"{len(cset)} boxes: {int((cset.kinds == FOOTPRINT).sum())} footprints, "
+          f"{len(owners)} service envelopes, {int((cset.kinds == FIXED).sum())} fixed")
+    for k in owners:
+        print(f"  {cset.names[k]} faces {cset.facing[k]}")
+    for a, b, kind, area in rows:
+        print(f"FAIL  {kind:<9} {a} / {b}: {area:.0f} sq in")
+    print(f"{len(rows)} conflict(s)")
+    return 1 if rows else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Layout constraint validator for Craft Room.
+Compiles the free-text constraints.do_not_regress / constraints.adjacencies
+entries from data/parameters.json into geometric rules and evaluates them
+with NumPy over rectangle arrays. Only NumPy is imported (no matplotlib), so
+it can run from hooks and inside optimization loops.
+
+Rectangles are (x0, y0, x1, y1) in inches. Station arrays carry a leading
+"layout" axis so many candidate placements are checked in one call.
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from model import as_layout, load_layout
+
+PARAMS_FILE = Path(__file__).parent / "data" / "parameters.json"
+
+# Footprints closer than this still count as "adjacent" (one sheet-width + slack)
+ADJACENCY_MAX_GAP = 60
+
+# Phrases used in constraint text -> zone / station ids (longest match wins)
+TERMS = {
+    'sheet goods receiving': 'zone_receiving',
+    'receiving': 'zone_receiving',
+    'breakdown table': 'breakdown_table',
+    'breakdown': 'breakdown_table',
+    'cnc bay': 'cnc_bay',
+    'cnc': 'cnc_bay',
+    'finish': 'zone_fume',
+    'fume zone': 'zone_fume',
+    'fume': 'zone_fume',
+    'pack/ship': 'zone_packship',
+    'pack': 'zone_packship',
+    'clean zone': 'zone_clean',
+    'clean': 'zone_clean',
+    'dusty zone': 'zone_dusty',
+    'dusty': 'zone_dusty',
+    'kayak lane': 'zone_kayak',
+}
+
+# (pattern, rule kind); matched case-insensitively against each constraint
+PATTERNS = [
+    (r'aisles? must not go below (\d+)\s*in', 'aisle_min'),
+    (r'kayak lane must remain clear', 'lane_clear'),
+    (r'no (\w+) operations in (\w+) zone', 'category_excluded'),
+    (r'one-way material flow:\s*(.+)', 'flow_order'),
+    (r'(.+?) adjacent to (.+)', 'adjacent'),
+    (r'(\w+) zone on (west|east), upwind from (\w+) zone', 'upwind'),
+    (r'(.+?) in bump-out', 'in_bump_out'),
+    (r'(.+?) at front (left|right)', 'front_corner'),
+]
+
+
+def load_parameters(path=PARAMS_FILE):
+    """Load and validate parameters from JSON file (via the compiled cache)."""
+    return load_layout(path).params
+
+
+def resolve_term(text):
+    """Map a constraint phrase to a zone/station id (None if unknown).
+
+    Phrases that already look like ids are returned as they are;
+    compile_rules checks them against the layout.
+    """
+    text = text.strip().lower()
+    if text.startswith('zone_') or '_' in text:
+        return text
+    for term in sorted(TERMS, key=len, reverse=True):
+        if term in text:
+            return TERMS[term]
+    return None
+
+
+def compile_rules(params):
+    """Turn constraint text into rule dicts; returns (rules, unchecked_texts).
+
+    Texts that match no pattern, or name a zone or station the layout does
+    not have (or has not placed), are unchecked.
+    """
+    layout = as_layout(params)
+    params = layout.params
+    known = set(layout.zones.ids) | set(layout.stations.placed_ids)
+    constraints = params.get('constraints', {})
+    texts = constraints.get('do_not_regress', []) + constraints.get('adjacencies', [])
+    circ = params.get('circulation', {})
+    rules, unchecked = [], []
+
+    for text in texts:
+        for pattern, kind in PATTERNS:
+            m = re.search(pattern, text, re.IGNORECASE)
+            if m:
+                break
+        else:
+            unchecked.append(text)
+            continue
+
+        rule = {'kind': kind, 'text': text}
+        if kind == 'aisle_min':
+            rule['min_width'] = circ.get('aisle_primary_min', int(m.group(1)))
+        elif kind == 'lane_clear':
+            rule['zone'] = 'zone_kayak'
+        elif kind == 'category_excluded':
+            rule['category'] = m.group(1).lower()
+            rule['zone'] = resolve_term(m.group(2))
+        elif kind == 'flow_order':
+            rule['steps'] = [resolve_term(step) for step in m.group(1).split('->')]
+        elif kind == 'adjacent':
+            rule['ids'] = [resolve_term(m.group(1)), resolve_term(m.group(2))]
+            rule['max_gap'] = ADJACENCY_MAX_GAP
+        elif kind == 'upwind':
+            rule['ids'] = [resolve_term(m.group(1)), resolve_term(m.group(3))]
+            rule['side'] = m.group(2).lower()
+        elif kind == 'in_bump_out':
+            rule['zone'] = resolve_term(m.group(1))
+        elif kind == 'front_corner':
+            rule['zone'] = resolve_term(m.group(1))
+            rule['side'] = m.group(2).lower()
+
+        ids = [rule['zone']] if 'zone' in rule else []
+        ids += rule.get('ids', []) + rule.get('steps', [])
+        if not all(i in known for i in ids):
+            unchecked.append(text)  # mentions something we cannot locate
+            continue
+        rules.append(rule)
+    return rules, unchecked
+
+
+def station_footprint(station):
+    """(width, depth) of a station's machine/bench footprint in inches."""
+    w = station.get('width', station.get('machine_width', 30))
+    d = station.get('depth', station.get('machine_depth', 24))
+    return w, d
+
+
+def placed_footprint(station, pos):
+    """(x-extent, y-extent) of a placed station, honoring pos['rotation']."""
+    w, d = station_footprint(station)
+    return (d, w) if pos.get('rotation', 0) % 180 == 90 else (w, d)
+
+
+class LayoutArrays:
+    """Rectangle arrays for one zone plan and L candidate station placements."""
+
+    __slots__ = ('zone_ids', 'zone_boxes', 'station_ids', 'station_boxes',
+                 'station_cats', 'sizes', 'bump_box', 'room_w', 'circulation')
+
+    def __init__(self, params, station_xy=None):
+        layout = as_layout(params)
+        self.zone_ids = layout.zones.ids
+        self.zone_boxes = layout.zones.boxes
+
+        stations = layout.stations
+        self.station_ids = stations.placed_ids
+        self.station_cats = stations.categories[stations.placed]
+        self.sizes = stations.extent[stations.placed]
+        if station_xy is None:
+            station_xy = stations.xy[stations.placed][None]
+        self.set_positions(station_xy)
+
+        self.bump_box = None
+        if layout.bump is not None:
+            self.bump_box = np.array(layout.bump.box, dtype=float)
+        self.room_w = layout.room.width
+        self.circulation = layout.circulation
+
+    def set_positions(self, station_xy):
+        """Replace station lower-left corners with an (L, S, 2) array."""
+        xy = np.asarray(station_xy, dtype=float).reshape(-1, len(self.station_ids), 2)
+        self.station_boxes = np.concatenate([xy, xy + self.sizes], axis=-1)
+
+    @property
+    def n_layouts(self):
+        return self.station_boxes.shape[0]
+
+    def box(self, entity_id):
+        """(L, 4) box for a zone or station id."""
+        if entity_id in self.station_ids:
+            return self.station_boxes[:, self.station_ids.index(entity_id)]
+        box = self.zone_boxes[self.zone_ids.index(entity_id)]
+        return np.broadcast_to(box, (self.n_layouts, 4))
+
+    def has(self, entity_id):
+        return entity_id in self.station_ids or entity_id in self.zone_ids
+
+
+# --- Vectorized geometry -------------------------------------------------
+
+def overlap_area(a, b):
+    """Intersection area of boxes a and b (broadcasting over leading axes)."""
+    w = np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0])
+    h = np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1])
+    return np.clip(w, 0, None) * np.clip(h, 0, None)
+
+
+def box_gap(a, b):
+    """Euclidean clearance between box edges (0 when touching/overlapping)."""
+    dx = np.maximum(0, np.maximum(a[..., 0] - b[..., 2], b[..., 0] - a[..., 2]))
+    dy = np.maximum(0, np.maximum(a[..., 1] - b[..., 3], b[..., 1] - a[..., 3]))
+    return np.hypot(dx, dy)
+
+
+def centroid(box):
+    return np.stack([(box[..., 0] + box[..., 2]) / 2, (box[..., 1] + box[..., 3]) / 2], axis=-1)
+
+
+def segment_hits_box(p0, p1, box):
+    """True where segment p0->p1 passes through box interior (Liang-Barsky)."""
+    d = p1 - p0
+    t0 = np.zeros(d.shape[:-1])
+    t1 = np.ones(d.shape[:-1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for axis in (0, 1):
+            lo, hi = box[..., axis], box[..., axis + 2]
+            ta = (lo - p0[..., axis]) / d[..., axis]
+            tb = (hi - p0[..., axis]) / d[..., axis]
+            still = d[..., axis] == 0
+            inside = (p0[..., axis] > lo) & (p0[..., axis] < hi)
+            t_near = np.where(still, np.where(inside, -np.inf, np.inf), np.minimum(ta, tb))
+            t_far = np.where(still, np.where(inside, np.inf, -np.inf), np.maximum(ta, tb))
+            t0 = np.maximum(t0, t_near)
+            t1 = np.minimum(t1, t_far)
+    return t0 < t1
+
+
+# --- Rule checks: each returns (mask (L, k), ids[k], message) -------------
+
+def _check_aisle_min(rule, geo):
+    widths, ids = [], []
+    if 'main_aisle_width' in geo.circulation:
+        widths.append(geo.circulation['main_aisle_width'])
+        ids.append('circulation.main_aisle_width')
+    if 'zone_kayak' in geo.zone_ids:
+        box = geo.zone_boxes[geo.zone_ids.index('zone_kayak')]
+        widths.append(min(box[2] - box[0], box[3] - box[1]))
+        ids.append('zone_kayak')
+    mask = np.broadcast_to(np.array(widths) < rule['min_width'], (geo.n_layouts, len(ids)))
+    return mask, ids, f"narrower than {rule['min_width']}\""
+
+
+def _check_lane_clear(rule, geo):
+    lane = geo.box(rule['zone'])[:, None, :]
+    mask = overlap_area(geo.station_boxes, lane) > 0
+    return mask, geo.station_ids, f"overlaps {rule['zone']}"
+
+
+def _check_category_excluded(rule, geo):
+    zone = geo.box(rule['zone'])[:, None, :]
+    mask = (overlap_area(geo.station_boxes, zone) > 0) & (geo.station_cats == rule['category'])
+    return mask, geo.station_ids, f"{rule['category']} station inside {rule['zone']}"
+
+
+def _check_flow_order(rule, geo):
+    # A leg backtracks if its straight path crosses an earlier stage
+    steps = rule['steps']
+    boxes = np.stack([geo.box(s) for s in steps], axis=1)         # (L, n, 4)
+    centers = centroid(boxes)
+    legs = []
+    masks = []
+    for i in range(1, len(steps) - 1):
+        earlier = boxes[:, :i]                                     # (L, i, 4)
+        p0 = np.broadcast_to(centers[:, i:i + 1], earlier.shape[:2] + (2,))
+        p1 = np.broadcast_to(centers[:, i + 1:i + 2], earlier.shape[:2] + (2,))
+        masks.append(segment_hits_box(p0, p1, earlier).any(axis=1))
+        legs.append(f"{steps[i]}->{steps[i + 1]}")
+    mask = np.stack(masks, axis=1) if masks else np.zeros((geo.n_layouts, 0), bool)
+    return mask, legs, "leg crosses an earlier stage (backtracking)"
+
+
+def _check_adjacent(rule, geo):
+    a, b = rule['ids']
+    gap = box_gap(geo.box(a), geo.box(b))
+    return (gap > rule['max_gap'])[:, None], [f"{a}|{b}"], f"more than {rule['max_gap']}\" apart"
+
+
+def _check_upwind(rule, geo):
+    # Airflow runs west -> east, so "upwind on west" means smaller x centroid
+    a, b = rule['ids']
+    ca, cb = centroid(geo.box(a))[:, 0], centroid(geo.box(b))[:, 0]
+    bad = ca >= cb if rule['side'] == 'west' else ca <= cb
+    return bad[:, None], [f"{a}|{b}"], f"{a} not {rule['side']} of {b}"
+
+
+def _check_in_bump_out(rule, geo):
+    box = geo.box(rule['zone'])
+    if geo.bump_box is None:
+        bad = np.ones(geo.n_layouts, bool)
+    else:
+        bad = overlap_area(box, geo.bump_box) < (box[:, 2] - box[:, 0]) * (box[:, 3] - box[:, 1])
+    return bad[:, None], [rule['zone']], "not inside the bump-out"
+
+
+def _check_front_corner(rule, geo):
+    box = geo.box(rule['zone'])
+    cx = centroid(box)[:, 0]
+    on_side = cx > geo.room_w / 2 if rule['side'] == 'right' else cx < geo.room_w / 2
+    bad = (box[:, 1] > 0) | ~on_side   # must touch the open (south) wall
+    return bad[:, None], [rule['zone']], f"not at front {rule['side']} on the open wall"
+
+
+CHECKS = {
+    'aisle_min': _check_aisle_min,
+    'lane_clear': _check_lane_clear,
+    'category_excluded': _check_category_excluded,
+    'flow_order': _check_flow_order,
+    'adjacent': _check_adjacent,
+    'upwind': _check_upwind,
+    'in_bump_out': _check_in_bump_out,
+    'front_corner': _check_front_corner,
+}
+
+
+def check_batch(params, station_xy=None, rules=None):
+    """Evaluate every rule for L layouts; returns a (L, n_rules) violation-count array.
+
+    station_xy is an (L, S, 2) array of lower-left corners in
+    LayoutArrays(params).station_ids order (default: station_positions).
+    """
+    if rules is None:
+        rules, _ = compile_rules(params)
+    geo = LayoutArrays(params, station_xy)
+    counts = [CHECKS[rule['kind']](rule, geo)[0].sum(axis=1) for rule in rules]
+    return np.stack(counts, axis=1) if counts else np.zeros((geo.n_layouts, 0), int)
+
+
+def validate(params):
+    """Check the current layout; returns (violations, unchecked_texts).
+
+    Each violation is a dict with the rule kind, constraint text, offending
+    zone/station ids and a short message.
+    """
+    rules, unchecked = compile_rules(params)
+    geo = LayoutArrays(params)
+    violations = []
+    for rule in rules:
+        mask, ids, message = CHECKS[rule['kind']](rule, geo)
+        bad = [ids[k] for k in np.flatnonzero(mask[0])]
+        if bad:
+            violations.append({'rule': rule['kind'], 'constraint': rule['text'],
+                               'ids': bad, 'message': message})
+    return violations, unchecked
+
+
+def main(argv=None):
+    """Print a constraint report; exit status 1 when anything is violated."""
+    parser = argparse.ArgumentParser(description='Check layout constraints from parameters.json.')
+    parser.add_argument('params', nargs='?', default=PARAMS_FILE, help='parameters file')
+    args = parser.parse_args(argv)
+    params = load_parameters(args.params)
+    violations, unchecked = validate(params)
+
+    for v in violations:
+        print(f"FAIL  {v['constraint']}")
+        print(f"      {', '.join(v['ids'])}: {v['message']}")
+    for text in unchecked:
+        print(f"SKIP  {text} (not machine-checkable against this layout)")
+    n_rules = len(compile_rules(params)[0])
+    print(f"{n_rules - len(violations)}/{n_rules} rules pass, {len(unchecked)} unchecked")
+    return 1 if violations else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Dust collection duct network for Craft Room.
+Models the trunk-and-drop system from DUST_COLLECTION.md: a riser from the
+collector (infrastructure.dust_collector) to a trunk along the back wall, and
+a gated drop to each dusty tool. Losses are velocity-pressure coefficients
+(duct friction, fittings, hood entry) per segment; the fan is a quadratic
+curve through its max static pressure and free-air CFM.
+
+Every blast-gate combination (2^n for n drops) is solved in one batched
+Newton iteration, so the report can list each configuration that starves a
+tool below its required CFM or lets duct velocity drop low enough for dust
+to settle.
+
+Example:
+    python ducts.py
+"""
+
+import argparse
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+from airflow import source_stations
+from constraints import PARAMS_FILE, load_parameters
+from model import as_layout
+
+VP_FPM = 4005               # V (fpm) = 4005 * sqrt(velocity pressure, in. WC), standard air
+FRICTION = 0.018            # Darcy friction factor, smooth spiral duct
+FLEX_FRICTION = 3.0         # corrugated flex hose vs spiral, same diameter
+
+# Loss coefficients in velocity pressures
+K_FITTING = {
+    'elbow_90': 0.25,       # long sweep, r/D 2.5 (no sharp 90s)
+    'wye_branch': 0.3,      # 45 degree wye, branch side
+    'blast_gate': 0.1,      # open gate
+    'hood': 1.0,            # tool port / hood entry
+}
+
+DEFAULT_FAN = {'max_static_in_wc': 10.1, 'free_air_cfm': 1314}
+DEFAULT_TRUNK = {'diameter': 6, 'y': 168, 'height': 84}
+DEFAULT_DROP = {'diameter': 4, 'flex_length': 72, 'port_height': 24}
+DEFAULT_REQUIRED_CFM = 350
+DEFAULT_MIN_VELOCITY = 3500
+MAX_GATES = 16              # 65536 configurations
+
+NEWTON_STEPS = 50
+NEWTON_TOL = 1e-9           # in. WC
+
+
+def _area_sqft(diameter):
+    return np.pi * (diameter / 12) ** 2 / 4
+
+
+@lru_cache(maxsize=None)
+def segment_resistance(diameter, length, fittings=(), flex_length=0):
+    """Loss R for a duct segment, with dP (in. WC) = R * Q(cfm)^2.
+
+    Memoized: drops and trunk runs repeat across layouts and sweeps.
+    """
+    k = FRICTION * (length + FLEX_FRICTION * flex_length) / diameter
+    k += sum(K_FITTING[f] for f in fittings)
+    return k / (_area_sqft(diameter) * VP_FPM) ** 2
+
+
+class DuctNetwork:
+    """Riser + trunk arms + one gated drop per tool, as arrays.
+
+    incidence[s, i] is True when drop i's air passes through trunk segment s
+    (segment 0 is the riser, shared by all drops).
+    """
+
+    def __init__(self, params):
+        layout = as_layout(params)
+        params = layout.params
+        net = params.get('duct_network', {})
+        fan = {**DEFAULT_FAN, **net.get('fan', {})}
+        self.fan_name = fan.get('model', 'collector')
+        self.fan_static = float(fan['max_static_in_wc'])
+        self.fan_free_air = float(fan['free_air_cfm'])
+        trunk = {**DEFAULT_TRUNK, **net.get('trunk', {})}
+        drop = {**DEFAULT_DROP, **net.get('drop', {})}
+        self.trunk_diameter = trunk['diameter']
+        self.min_velocity = net.get('min_velocity_fpm', DEFAULT_MIN_VELOCITY)
+
+        dc = params.get('infrastructure', {}).get('dust_collector')
+        if not dc:
+            raise ValueError('infrastructure.dust_collector is required for a duct network')
+        self.inlet = (dc['x'] + dc['width'] / 2, dc['y'] + dc['depth'])
+        y_trunk = trunk['y']
+
+        # Drops: dusty tools in dusty zones, plus any station named in duct_network.drops
+        st = layout.stations
+        settings = {sid: v for sid, v in net.get('drops', {}).items() if not sid.startswith('_')}
+        ids = [st.ids[k] for k in source_stations(layout, 'dusty')]
+        ids += [sid for sid in settings if sid not in ids and sid in st and st.placed[st.index(sid)]]
+        if len(ids) > MAX_GATES:
+            raise ValueError(f'{len(ids)} drops; at most {MAX_GATES} gates can be enumerated')
+        self.ids = ids
+        self.names, self.required, self.ports, drop_r = [], [], [], []
+        for sid in ids:
+            k = st.index(sid)
+            x, y = st.xy[k]
+            w, d = st.extent[k]
+            port = (x + w / 2, min(y + d, y_trunk))
+            run = y_trunk - port[1]
+            fittings = ('wye_branch', 'blast_gate', 'hood') + (('elbow_90',) if run > 0 else ())
+            s = settings.get(sid, {})
+            drop_r.append(segment_resistance(
+                s.get('diameter', drop['diameter']),
+                run + trunk['height'] - s.get('port_height', drop['port_height']),
+                fittings, s.get('flex_length', drop['flex_length'])))
+            self.names.append(st.names[k])
+            self.required.append(s.get('required_cfm', DEFAULT_REQUIRED_CFM))
+            self.ports.append(port)
+        self.drop_diameter = np.array([settings.get(sid, {}).get('diameter', drop['diameter'])
+                                       for sid in ids], dtype=float)
+        self.drop_r = np.array(drop_r)
+        self.required = np.array(self.required, dtype=float)
+
+        # Trunk: riser (with its two elbows), then each arm junction to junction
+        cx, cy = self.inlet
+        rise = abs(y_trunk - cy) + max(trunk['height'] - dc.get('height', 60), 0)
+        segments = [(segment_resistance(self.trunk_diameter, rise, ('elbow_90', 'elbow_90')),
+                     [(cx, cy), (cx, y_trunk)], list(range(len(ids))))]
+        xs = np.array([p[0] for p in self.ports])
+        west = [i for i in np.argsort(-xs) if xs[i] < cx]
+        east = [i for i in np.argsort(xs) if xs[i] >= cx]
+        for arm in (west, east):
+            last = cx
+            for n, i in enumerate(arm):
+                length = abs(xs[i] - last)
+                segments.append((segment_resistance(self.trunk_diameter, length),
+                                 [(last, y_trunk), (xs[i], y_trunk)], [int(j) for j in arm[n:]]))
+                last = xs[i]
+        self.trunk_r = np.array([r for r, _, _ in segments])
+        self.trunk_routes = [route for _, route, _ in segments]
+        self.incidence = np.zeros((len(segments), len(ids)), dtype=bool)
+        for s, (_, _, served) in enumerate(segments):
+            self.incidence[s, served] = True
+        self.drop_routes = [[(p[0], y_trunk), p] for p in self.ports]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def fan_pressure(self, q):
+        """Fan static pressure (in. WC) at total flow q (cfm)."""
+        return self.fan_static * (1 - (q / self.fan_free_air) ** 2)
+
+    def configurations(self):
+        """(2^n, n) bool array of every gate combination; row k opens the bits of k."""
+        n = len(self)
+        return ((np.arange(2 ** n)[:, None] >> np.arange(n)) & 1).astype(bool)
+
+    def solve(self, gates=None):
+        """Drop flows (cfm) for each gate row, shape (m, n); closed drops carry 0.
+
+        For every open drop i the fan pressure equals the trunk losses on its
+        path plus its own drop loss; all rows are solved together by Newton.
+        """
+        gates = self.configurations() if gates is None else np.atleast_2d(gates).astype(bool)
+        A = self.incidence.astype(float)
+        open_count = np.maximum(gates.sum(axis=1, keepdims=True), 1)
+        q = np.where(gates, 0.7 * self.fan_free_air / open_count, 0.0)
+        b = self.fan_static / self.fan_free_air ** 2
+        eye = np.eye(len(self))
+        for _ in range(NEWTON_STEPS):
+            flow = q @ A.T                                   # (m, segments)
+            residual = (self.fan_pressure(q.sum(axis=1))[:, None]
+                        - (flow ** 2 * self.trunk_r) @ A - self.drop_r * q ** 2)
+            residual = np.where(gates, residual, -q)
+            if np.abs(residual).max(initial=0) < NEWTON_TOL:
+                break
+            jac = (-2 * b * q.sum(axis=1)[:, None, None]
+                   - 2 * np.einsum('si,ms,sj->mij', A, flow * self.trunk_r, A)
+                   - 2 * eye * (self.drop_r * q)[:, None, :])
+            jac = np.where(gates[:, :, None], jac, -eye)
+            step = np.linalg.solve(jac, -residual[..., None])[..., 0]
+            q = np.maximum(q + step, 0.5 * q)                # damped: flows stay positive
+        return np.where(gates, q, 0.0)
+
+    def velocities(self, q):
+        """(drop fpm, trunk segment fpm) for flows from solve()."""
+        drop = q / _area_sqft(self.drop_diameter)
+        trunk = (q @ self.incidence.T.astype(float)) / _area_sqft(self.trunk_diameter)
+        return drop, trunk
+
+
+def gate_report(network, gates=None):
+    """Per configuration: flows, fan pressure, starved drops and low-velocity ducts."""
+    gates = network.configurations() if gates is None else gates
+    q = network.solve(gates)
+    drop_v, trunk_v = network.velocities(q)
+    carrying = (gates.astype(float) @ network.incidence.T.astype(float)) > 0
+    return {
+        'gates': gates,
+        'cfm': q,
+        'static': network.fan_pressure(q.sum(axis=1)),
+        'starved': gates & (q < network.required),
+        'slow_drops': gates & (drop_v < network.min_velocity),
+        'slow_trunk': (carrying & (trunk_v < network.min_velocity)).any(axis=1),
+    }
+
+
+def main(argv=None):
+    """Print drop flows and starving gate configurations; exit 1 if a tool starves alone."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('params', nargs='?', default=PARAMS_FILE, help='parameters file')
+    args = parser.parse_args(argv)
+    network = DuctNetwork(load_parameters(args.params))
+    n = len(network)
+    report = gate_report(network)
+    gates, q = report['gates'], report['cfm']
+    alone = 1 << np.arange(n)
+    print(f"{network.fan_name}: {n} drops, {2 ** n} gate configurations")
+    print(f"{'drop':<28} {'need':>6} {'alone':>7} {'all open':>9}")
+    for i, name in enumerate(network.names):
+        print(f"{name:<28} {network.required[i]:>6.0f} {q[alone[i], i]:>7.0f} {q[-1, i]:>9.0f}")
+
+    starving = np.flatnonzero(report['starved'].any(axis=1))
+    print(f"\n{len(starving)} configuration(s) starve a tool:")
+    for k in starving:
+        opened = '+'.join(network.ids[i] for i in np.flatnonzero(gates[k]))
+        short = ', '.join(f"{network.ids[i]} {q[k, i]:.0f}/{network.required[i]:.0f}"
+                          for i in np.flatnonzero(report['starved'][k]))
+        print(f"  open {opened}: {short} CFM")
+    slow = np.flatnonzero(report['slow_drops'].any(axis=1) | report['slow_trunk'])
+    if len(slow):
+        print(f"{len(slow)} configuration(s) run a duct under {network.min_velocity} FPM "
+              f"(dust settles)")
+    return 1 if report['starved'][alone, np.arange(n)].any() else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
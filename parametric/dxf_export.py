@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Native R12 (AC1009) DXF export of the parametric layout.
+Writes zones, stations, cabinetry runs, bump-out and circulation straight from
+parameters.json onto named layers, streaming entities to disk (no matplotlib).
+Output follows the hand-drawn craft_room_*.dxf files: LINE rectangles, TEXT
+labels, inches.
+"""
+
+import argparse
+import os
+from pathlib import Path
+
+from constraints import load_parameters, placed_footprint
+
+# Paths
+SCRIPT_DIR = Path(__file__).parent
+PARAMS_FILE = SCRIPT_DIR / "data" / "parameters.json"
+OUTPUT_DIR = SCRIPT_DIR / "exports"
+DXF_FILE = "layout.dxf"
+
+# Layer name -> (AutoCAD color index, linetype)
+LAYERS = {
+    'FOOTPRINT': (7, 'CONTINUOUS'),
+    'OPEN_EDGE': (7, 'DASHED'),
+    'BUMP_OUT': (7, 'CONTINUOUS'),
+    'ZONE_CLEAN': (3, 'CONTINUOUS'),
+    'ZONE_DUSTY': (30, 'CONTINUOUS'),
+    'ZONE_FUME': (1, 'CONTINUOUS'),
+    'ZONE_SHARED': (8, 'CONTINUOUS'),
+    'ZONE_INFRASTRUCTURE': (34, 'CONTINUOUS'),
+    'STATIONS': (5, 'CONTINUOUS'),
+    'CABINETRY': (34, 'CONTINUOUS'),
+    'CIRCULATION': (4, 'DASHED'),
+    'DUST_BARRIER': (6, 'DASHED'),
+    'NOTES': (7, 'CONTINUOUS'),
+}
+
+ZONE_LAYERS = {
+    'clean': 'ZONE_CLEAN',
+    'dusty': 'ZONE_DUSTY',
+    'dirty_fume': 'ZONE_FUME',
+    'shared': 'ZONE_SHARED',
+    'infrastructure': 'ZONE_INFRASTRUCTURE',
+}
+
+
+class DxfWriter:
+    """Writes group-code pairs for an R12 drawing to an open text file."""
+
+    def __init__(self, f):
+        self.f = f
+        self.count = 0
+
+    def pairs(self, *pairs):
+        self.f.write(''.join(f'{code}\n{value}\n' for code, value in pairs))
+
+    def header(self, layers):
+        self.pairs((0, 'SECTION'), (2, 'HEADER'),
+                   (9, '$ACADVER'), (1, 'AC1009'),
+                   # R12 has no units variable ($INSUNITS is AutoCAD 2000);
+                   # architectural linear units read drawing units as inches
+                   (9, '$LUNITS'), (70, 4),
+                   (0, 'ENDSEC'))
+        self.pairs((0, 'SECTION'), (2, 'TABLES'),
+                   (0, 'TABLE'), (2, 'LTYPE'), (70, 2),
+                   (0, 'LTYPE'), (2, 'CONTINUOUS'), (70, 0), (3, 'Solid line'),
+                   (72, 65), (73, 0), (40, 0.0),
+                   (0, 'LTYPE'), (2, 'DASHED'), (70, 0), (3, 'Dashed __ __ __'),
+                   (72, 65), (73, 2), (40, 0.5), (49, 0.25), (49, -0.25),
+                   (0, 'ENDTAB'),
+                   (0, 'TABLE'), (2, 'LAYER'), (70, len(layers)))
+        for name, (color, ltype) in layers.items():
+            self.pairs((0, 'LAYER'), (2, name), (70, 0), (62, color), (6, ltype))
+        self.pairs((0, 'ENDTAB'), (0, 'ENDSEC'),
+                   (0, 'SECTION'), (2, 'ENTITIES'))
+
+    def footer(self):
+        self.pairs((0, 'ENDSEC'), (0, 'EOF'))
+
+    def line(self, layer, x0, y0, x1, y1):
+        self.count += 1
+        self.pairs((0, 'LINE'), (8, layer),
+                   (10, float(x0)), (20, float(y0)), (30, 0.0),
+                   (11, float(x1)), (21, float(y1)), (31, 0.0))
+
+    def rect(self, layer, x0, y0, x1, y1):
+        """Closed rectangle as four LINEs (counter-clockwise from lower-left)."""
+        self.line(layer, x0, y0, x1, y0)
+        self.line(layer, x1, y0, x1, y1)
+        self.line(layer, x1, y1, x0, y1)
+        self.line(layer, x0, y1, x0, y0)
+
+    def text(self, layer, x, y, text, height=6.0, rotation=0):
+        self.count += 1
+        pairs = [(0, 'TEXT'), (8, layer), (10, float(x)), (20, float(y)), (30, 0.0),
+                 (40, float(height)), (1, text)]
+        if rotation:
+            pairs.append((50, float(rotation)))
+        self.pairs(*pairs)
+
+
+def iter_entities(params):
+    """Yield ('line'|'rect'|'text', args) for every entity of the layout."""
+    room = params['room']
+    bump = params.get('bump_out', {})
+    room_w, room_d = room['room_width'], room['room_depth']
+
+    # Room shell: open south edge, walls elsewhere (gap where the bump-out opens)
+    yield 'line', ('OPEN_EDGE', 0, 0, room_w, 0)
+    yield 'line', ('FOOTPRINT', room_w, 0, room_w, room_d)
+    if bump.get('enabled'):
+        bx0, bx1, by0, by1 = bump['x_start'], bump['x_end'], bump['y_start'], bump['y_end']
+        # Back wall either side of the opening (none where it is flush with a side wall)
+        if bx1 < room_w:
+            yield 'line', ('FOOTPRINT', room_w, room_d, bx1, room_d)
+        if bx0 > 0:
+            yield 'line', ('FOOTPRINT', bx0, room_d, 0, room_d)
+        yield 'line', ('BUMP_OUT', bx0, by0, bx0, by1)
+        yield 'line', ('BUMP_OUT', bx0, by1, bx1, by1)
+        yield 'line', ('BUMP_OUT', bx1, by1, bx1, by0)
+        yield 'text', ('BUMP_OUT', bx0 + 4, by1 + 4,
+                       f"{bump['width_ft']}' x {bump['depth_ft']}' BUMP-OUT", 5.0)
+    else:
+        yield 'line', ('FOOTPRINT', room_w, room_d, 0, room_d)
+    yield 'line', ('FOOTPRINT', 0, room_d, 0, 0)
+
+    # Zones, one layer per category
+    for zone_id, zone in params['zones'].items():
+        layer = ZONE_LAYERS.get(zone.get('category', 'shared'), 'ZONE_SHARED')
+        x0, y0 = zone['x_start'], zone['y_start']
+        x1, y1 = x0 + zone['width'], y0 + zone['depth']
+        yield 'rect', (layer, x0, y0, x1, y1)
+        if zone['width'] < 40:
+            yield 'text', (layer, x0 + zone['width'] / 2 + 2, y0 + 4, zone['name'], 5.0, 90)
+        else:
+            yield 'text', (layer, x0 + 4, y1 - 10, zone['name'], 5.0)
+
+    # Stations at their placed (possibly rotated) footprint
+    stations = params['stations']
+    for sid, pos in params.get('station_positions', {}).items():
+        if sid.startswith('_') or sid not in stations:
+            continue
+        w, d = placed_footprint(stations[sid], pos)
+        x, y = pos['x'], pos['y']
+        yield 'rect', ('STATIONS', x, y, x + w, y + d)
+        yield 'text', ('STATIONS', x + 2, y + d / 2, sid, 3.0)
+
+    # Cabinetry runs
+    for key, run in params.get('cabinetry', {}).items():
+        if key.startswith('cabinet_run_'):
+            yield 'rect', ('CABINETRY', run['x_start'], run['y_start'], run['x_end'], run['y_end'])
+            yield 'text', ('CABINETRY', run['x_start'] + 4, run['y_start'] + 4,
+                           f'CABINETRY ({run["length"] // 12}\')', 4.0)
+
+    # Circulation: main aisle band and kayak lane centerline
+    circ = params.get('circulation', {})
+    kayak = params['zones'].get('zone_kayak')
+    ax0, ax1 = 0, room_w
+    if kayak:
+        ax0, ax1 = kayak['x_start'], kayak['x_start'] + kayak['width']
+    if 'main_aisle_y' in circ:
+        y = circ['main_aisle_y']
+        half = circ.get('main_aisle_width', circ.get('aisle_primary_min', 36)) / 2
+        yield 'rect', ('CIRCULATION', ax0, y - half, ax1, y + half)
+        yield 'text', ('CIRCULATION', ax0 + 4, y - half + 4,
+                       f'MAIN AISLE ({2 * half:g}" clear)', 5.0)
+    if kayak:
+        y = kayak['y_start'] + kayak['depth'] / 2
+        yield 'line', ('CIRCULATION', ax0, y, ax1, y)
+
+    # Soft dust barrier
+    barrier = params.get('infrastructure', {}).get('soft_dust_barrier')
+    if barrier:
+        bx = barrier.get('x', 84)
+        yield 'line', ('DUST_BARRIER', bx, barrier.get('y_start', 72), bx, barrier.get('y_end', 300))
+
+    # Title
+    title = f'CRAFT ROOM LAYOUT ({room_w}" x {room_d}"; UNITS: INCHES)'
+    yield 'text', ('NOTES', 0, -24, title, 6.0)
+    version = params.get('_meta', {}).get('version')
+    if version:
+        yield 'text', ('NOTES', 0, -34, f'Generated from parameters.json v{version}', 4.0)
+
+
+def write_dxf(params, path):
+    """Stream the layout to an R12 DXF at path (atomic replace). Returns entity count."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+    with open(tmp, 'w', newline='\n') as f:
+        out = DxfWriter(f)
+        out.header(LAYERS)
+        for kind, args in iter_entities(params):
+            getattr(out, kind)(*args)
+        out.footer()
+    os.replace(tmp, path)
+    return out.count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export the parametric layout as R12 DXF.')
+    parser.add_argument('--params', default=PARAMS_FILE, help='parameters.json to export')
+    parser.add_argument('-o', '--out', default=OUTPUT_DIR / DXF_FILE, help='output .dxf path')
+    args = parser.parse_args(argv)
+
+    params = load_parameters(args.params)
+    count = write_dxf(params, args.out)
+    print(f'Saved: {args.out} ({count} entities)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Electrical plan for Craft Room: outlets, circuit assignment and checks.
+Loads come from the station inventory (power_circuits, power_voltage,
+power_special, optional power_amps); planned circuits from
+electrical.zones. The engine
+
+  - places receptacles along each cabinetry.cabinet_run_* at
+    electrical.outlet_spacing_cabinetry, on its wall side
+  - plugs each placed station into the nearest cabinetry receptacle within
+    cord reach, or gives it a drop at the station (240V, isolated-ground and
+    GFCI loads always get a receptacle of their own)
+  - packs loads into circuits per (zone, voltage, protection) by
+    first-fit decreasing, at the continuous-load fraction of the breaker
+    rating; 240V loads take a dedicated circuit, isolated-ground loads share
+    only isolated-ground circuits and GFCI zones protect every circuit
+
+and reports zones whose packed circuits exceed the plan or need protection
+the plan lacks. Packing is vectorized per load size, so facility-sized
+inventories pack in milliseconds.
+
+Example:
+    python electrical.py
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from constraints import PARAMS_FILE, load_parameters
+from inventory import INVENTORY_FILE, load_inventory
+from model import as_layout
+
+DEFAULT_SPACING = 48
+DEFAULT_REACH = 72              # inches of cord from station edge to receptacle
+DEFAULT_CONTINUOUS = 0.8        # continuous loads at 80% of breaker rating
+DEFAULT_LOAD_AMPS = {'120V': 6, '240V': 16}
+DEFAULT_CIRCUIT_AMPS = {'120V': 20, '240V': 30}
+WALL_SETBACK = 2                # receptacle distance from the wall face
+PLACE_CHUNK = 4096              # loads per nearest-receptacle distance block
+
+# Protection levels a circuit can carry; a load needs its level exactly
+PROTECTION = ['', 'isolated_ground', 'GFCI']
+
+# Station receptacles: general drop, then one kind per dedicated need
+OUTLET_KINDS = ['drop', '240V', 'IG', 'GFCI']
+
+
+def _plan_zone(zone_id, plans):
+    """electrical.zones key for an inventory zone id ('zone_fume' -> 'fume_zone'), or None."""
+    name = zone_id[5:] if zone_id.startswith('zone_') else zone_id
+    for key in plans:
+        if key == name or key.startswith(name + '_') or name.startswith(key):
+            return key
+    return None
+
+
+def _amps(value, default):
+    """Breaker rating from a plan value: number, or a '15-20' range (lower bound)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.split('-')[0])
+        except ValueError:
+            pass
+    return float(default)
+
+
+def _protection(special):
+    special = special.lower()
+    if 'isolated' in special:
+        return PROTECTION.index('isolated_ground')
+    if 'gfci' in special:
+        return PROTECTION.index('GFCI')
+    return 0
+
+
+def cabinetry_outlets(params, spacing=None):
+    """(n, 2) receptacle positions along the cabinet runs and the run key of each."""
+    layout = as_layout(params)
+    params = layout.params
+    room = layout.room
+    spacing = spacing or params.get('electrical', {}).get('outlet_spacing_cabinetry',
+                                                          DEFAULT_SPACING)
+    points, runs = [], []
+    for key, run in params.get('cabinetry', {}).items():
+        if not key.startswith('cabinet_run_'):
+            continue
+        x0, x1, y0, y1 = run['x_start'], run['x_end'], run['y_start'], run['y_end']
+        along_x = (x1 - x0) >= (y1 - y0)
+        length = (x1 - x0) if along_x else (y1 - y0)
+        n = max(int(length // spacing), 1)
+        offsets = (length - (n - 1) * spacing) / 2 + spacing * np.arange(n)
+        # Receptacles on the wall the run backs onto (else down its middle)
+        if along_x:
+            y = (y1 - WALL_SETBACK if y1 >= room.depth else
+                 y0 + WALL_SETBACK if y0 <= 0 else (y0 + y1) / 2)
+            points.append(np.c_[x0 + offsets, np.full(n, y)])
+        else:
+            x = (x0 + WALL_SETBACK if x0 <= 0 else
+                 x1 - WALL_SETBACK if x1 >= room.width else (x0 + x1) / 2)
+            points.append(np.c_[np.full(n, x), y0 + offsets])
+        runs += [key] * n
+    return (np.vstack(points) if points else np.empty((0, 2))), runs
+
+
+def pack(sizes, capacity):
+    """First-fit decreasing of sizes into bins of one capacity; returns bin per item.
+
+    Items are processed one size class at a time: identical items fill the
+    first bins with room before opening new ones, exactly as item-by-item
+    first fit would, but with array operations per class instead of a loop
+    per item. Items larger than capacity get a bin of their own, which then
+    has no room left for anything else.
+    """
+    sizes = np.maximum(np.asarray(sizes, dtype=float), 1e-6)
+    out = np.empty(len(sizes), dtype=int)
+    remaining = np.empty(0)
+    eps = 1e-9
+    for size in np.unique(sizes)[::-1]:
+        items = np.flatnonzero(sizes == size)
+        k = len(items)
+        per_bin = max(int((capacity + eps) // size), 1)
+        fits = np.minimum(np.floor((remaining + eps) / size), per_bin).astype(int)
+        # Existing bins in order, each taking as many as it can hold
+        take = np.minimum(fits, np.maximum(k - (np.cumsum(fits) - fits), 0))
+        placed = int(take.sum())
+        out[items[:placed]] = np.repeat(np.arange(len(remaining)), take)
+        remaining = remaining - take * size
+        # New bins for the rest
+        rest = k - placed
+        if rest:
+            new = -(-rest // per_bin)
+            out[items[placed:]] = len(remaining) + np.arange(rest) // per_bin
+            counts = np.full(new, per_bin)
+            counts[-1] = rest - per_bin * (new - 1)
+            remaining = np.concatenate([remaining, np.maximum(capacity - counts * size, 0)])
+    return out
+
+
+class ElectricalPlan:
+    """Loads, packed circuits, receptacles and findings for one layout + inventory.
+
+    Loads are rows of parallel arrays (one per circuit a station needs);
+    circuits likewise, with load[c] the packed amps and capacity[c] the
+    usable amps. Receptacles are (x, y) points with a kind per point
+    ('cabinet' or one of OUTLET_KINDS).
+    """
+
+    def __init__(self, params, table=None):
+        layout = as_layout(params)
+        params = layout.params
+        elec = params.get('electrical', {})
+        self.plans = elec.get('zones', {})
+        reach = elec.get('cord_reach', DEFAULT_REACH)
+        factor = elec.get('continuous_load_factor', DEFAULT_CONTINUOUS)
+        default_amps = {**DEFAULT_LOAD_AMPS, **elec.get('default_load_amps', {})}
+        table = load_inventory(INVENTORY_FILE) if table is None else table
+        table.join(layout)
+        self.table = table
+
+        # Loads: power_circuits per row; "120V/240V" splits into one 120V load + the rest 240V
+        n = np.nan_to_num(table.circuits).astype(int)
+        rows = np.repeat(np.arange(len(table)), n)
+        first = np.r_[0, np.cumsum(n)[:-1]]
+        nth = np.arange(len(rows)) - np.repeat(first, n)
+        volts = table.voltage[rows]
+        has_240 = np.char.find(volts, '240') >= 0
+        has_120 = (np.char.find(volts, '120') >= 0) | ~has_240
+        is_240 = has_240 & ~(has_120 & (nth == 0) & (np.repeat(n, n) > 1))
+        self.rows = rows
+        self.voltage = np.where(is_240, '240V', '120V')
+        special_levels = {s: _protection(s) for s in set(table.power_special.tolist())}
+        self.protection = np.array([special_levels[s] for s in table.power_special[rows]],
+                                   dtype=int).reshape(len(rows))
+        amps = table.amps[rows]                             # power_amps is per circuit
+        self.amps = np.where(np.isnan(amps), np.where(is_240, default_amps['240V'],
+                                                      default_amps['120V']), amps)
+        plan_of = {z: _plan_zone(z, self.plans) for z in set(table.zones.tolist())}
+        self.zone = np.array([plan_of[z] or z for z in table.zones[rows]], dtype=str).reshape(len(rows))
+        # GFCI zones protect every circuit they feed
+        for key, plan in self.plans.items():
+            if 'gfci' in str(plan.get('special', '')).lower():
+                self.protection[(self.zone == key) & (self.protection == 0)] = PROTECTION.index('GFCI')
+
+        self._pack(factor)
+        self._place_outlets(layout, reach)
+
+    def _circuit_amps(self, zone, voltage):
+        plan = self.plans.get(zone, {})
+        default = DEFAULT_CIRCUIT_AMPS[voltage]
+        if 'amps' in plan:
+            return _amps(plan['amps'], default)
+        return _amps(plan.get(f"amps_{voltage[:3]}", default), default)
+
+    def _pack(self, factor):
+        """Pack loads per (zone, voltage, protection) group into circuits."""
+        keys = np.char.add(np.char.add(self.zone, '|'),
+                           np.char.add(self.voltage, np.char.add('|', self.protection.astype(str))))
+        groups, inverse = np.unique(keys, return_inverse=True)
+        self.circuit = np.empty(len(self.rows), dtype=int)
+        zone, voltage, protection, capacity, load = [], [], [], [], []
+        for g, key in enumerate(groups.tolist()):
+            z, v, p = key.split('|')
+            members = np.flatnonzero(inverse == g)
+            cap = self._circuit_amps(z, v) * factor
+            # 240V tools get a dedicated circuit each
+            sizes = np.full(len(members), cap) if v == '240V' else self.amps[members]
+            bins = pack(sizes, cap)
+            count = bins.max() + 1 if len(bins) else 0
+            self.circuit[members] = len(zone) + bins
+            zone += [z] * count
+            voltage += [v] * count
+            protection += [int(p)] * count
+            capacity += [cap] * count
+            load.extend(np.bincount(bins, weights=self.amps[members], minlength=count).tolist())
+        self.circuit_zone = np.array(zone, dtype=str)
+        self.circuit_voltage = np.array(voltage, dtype=str)
+        self.circuit_protection = np.array(protection, dtype=int)
+        self.circuit_capacity = np.array(capacity)
+        self.circuit_load = np.array(load)
+
+    def _place_outlets(self, layout, reach):
+        """Cabinetry receptacles plus drops; plug[load] is the receptacle index or -1."""
+        cab, runs = cabinetry_outlets(layout)
+        runs = np.array(runs, dtype=str)
+        self.plug = np.full(len(self.rows), -1)
+
+        # Cabinet-run loads feed their own run's receptacles, round robin
+        cabinetry = layout.params.get('cabinetry', {})
+        run_of = {run['inventory_id']: key for key, run in cabinetry.items()
+                  if isinstance(run, dict) and run.get('inventory_id')}
+        load_run = np.array([run_of.get(self.table.ids[r], '') for r in self.rows],
+                            dtype=str).reshape(len(self.rows))
+        for key in np.unique(runs):
+            outlets = np.flatnonzero(runs == key)
+            loads = np.flatnonzero(load_run == key)
+            self.plug[loads] = outlets[np.arange(len(loads)) % len(outlets)]
+
+        # Placed stations: nearest cabinet receptacle in reach, else a drop at the station
+        st = layout.stations
+        station = self.table.station_row[self.rows]
+        placed = np.flatnonzero((station >= 0) & (self.plug < 0))
+        placed = placed[st.placed[station[placed]]]
+        lo = st.xy[station[placed]]
+        hi = lo + st.extent[station[placed]]
+        # 240V and isolated-ground/GFCI loads need a receptacle of their own kind
+        kind = np.where(self.voltage[placed] == '240V', 1,
+                        np.where(self.protection[placed] > 0, 1 + self.protection[placed], 0))
+        if len(cab):
+            for start in range(0, len(placed), PLACE_CHUNK):
+                part = slice(start, start + PLACE_CHUNK)
+                # Distance from each receptacle to each station box
+                d = np.maximum(np.maximum(lo[part, None, :] - cab, cab - hi[part, None, :]), 0)
+                dist = np.hypot(d[..., 0], d[..., 1])
+                best = dist.argmin(axis=1)
+                ok = (dist[np.arange(len(best)), best] <= reach) & (kind[part] == 0)
+                self.plug[placed[part][ok]] = best[ok]
+        rest = self.plug[placed] < 0
+        # One receptacle per station and kind, side by side from the station center
+        keys = station[placed[rest]] * len(OUTLET_KINDS) + kind[rest]
+        drops, inverse = np.unique(keys, return_inverse=True)
+        self.plug[placed[rest]] = len(cab) + inverse
+        s, k = np.divmod(drops, len(OUTLET_KINDS))
+        centers = st.xy[s] + st.extent[s] / 2
+        centers[:, 0] += 6 * k
+        self.outlets = np.vstack([cab, centers]).reshape(-1, 2)
+        self.outlet_kind = ['cabinet'] * len(cab) + [OUTLET_KINDS[i] for i in k]
+
+    # --- Findings -----------------------------------------------------------
+
+    def zone_summary(self):
+        """{zone: (circuits needed, circuits planned)} for zones with loads or a plan."""
+        needed = dict(zip(*np.unique(self.circuit_zone, return_counts=True)))
+        zones = sorted(set(needed) | set(self.plans))
+        return {z: (int(needed.get(z, 0)), int(self.plans.get(z, {}).get('circuits', 0)))
+                for z in zones}
+
+    def findings(self):
+        """Human-readable problems: over-subscribed zones, unplanned zones, missing protection."""
+        out = []
+        for zone, (need, plan) in self.zone_summary().items():
+            if zone not in self.plans:
+                names = sorted({self.table.ids[r] for r in self.rows[self.zone == zone]})
+                out.append(f"{zone}: {need} circuit(s) for {', '.join(names)} but no planned circuits")
+            elif need > plan:
+                out.append(f"{zone}: loads pack into {need} circuits, {plan} planned")
+        for c in np.flatnonzero(self.circuit_protection):
+            zone = self.circuit_zone[c]
+            special = str(self.plans.get(zone, {}).get('special', '')).lower()
+            need = PROTECTION[self.circuit_protection[c]]
+            if zone in self.plans and need.split('_')[0].lower() not in special:
+                out.append(f"{zone}: needs a {need} circuit the plan does not provide")
+        over = np.flatnonzero(self.circuit_load > self.circuit_capacity + 1e-9)
+        for c in over:
+            out.append(f"{self.circuit_zone[c]}: {self.circuit_voltage[c]} load of "
+                       f"{self.circuit_load[c]:.0f} A exceeds {self.circuit_capacity[c]:.0f} A usable")
+        return list(dict.fromkeys(out))
+
+    def circuit_names(self):
+        """Label per circuit, e.g. 'clean-2', 'dusty-240V-1', 'clean-IG-1'."""
+        names, seen = [], {}
+        tags = {1: 'IG', 2: 'GFCI'}
+        for z, v, p in zip(self.circuit_zone, self.circuit_voltage, self.circuit_protection):
+            tag = '-'.join(t for t in (z, v if v != '120V' else '', tags.get(p, '')) if t)
+            seen[tag] = seen.get(tag, 0) + 1
+            names.append(f'{tag}-{seen[tag]}')
+        return names
+
+
+def main(argv=None):
+    """Print the circuit plan and findings; exit 1 when the plan does not fit the loads."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('params', nargs='?', default=PARAMS_FILE, help='parameters file')
+    args = parser.parse_args(argv)
+    params = load_parameters(args.params)
+    plan = ElectricalPlan(params)
+    names = plan.circuit_names()
+    print(f"{len(plan.rows)} loads on {len(names)} circuits, {len(plan.outlets)} receptacles "
+          f"({plan.outlet_kind.count('cabinet')} cabinetry)")
+    print(f"{'circuit':<22} {'amps':>11}  loads")
+    for c, name in enumerate(names):
+        loads = [plan.table.ids[r] for r in plan.rows[plan.circuit == c]]
+        print(f"{name:<22} {plan.circuit_load[c]:>4.0f}/{plan.circuit_capacity[c]:<4.0f} A  "
+              + ', '.join(loads))
+    print(f"\n{'zone':<14} {'needed':>6} {'planned':>7}")
+    for zone, (need, planned) in plan.zone_summary().items():
+        print(f"{zone:<14} {need:>6} {planned:>7}")
+    problems = plan.findings()
+    for p in problems:
+        print(f"FAIL  {p}")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
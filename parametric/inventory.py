@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Station inventory (data/station_inventory.csv) as a columnar table.
+The CSV is read into one NumPy array per column (numbers as float with NaN
+for blanks, categorical text as str arrays), then joined to
+params['stations'] through an explicit id index: each parameters station
+names its inventory row with "inventory_id". Derived columns (footprint
+with clearances, circuits per zone, voltage mix) are computed on the whole
+arrays rather than row by row. Each distinct station type (the same
+categorical and numeric cells) is converted once, so a 100k-row multi-site
+list loads in well under a second, ahead of csv.DictReader rows
+(benchmarks/bench_inventory.py).
+
+Example:
+    python inventory.py [inventory.csv]
+"""
+
+import argparse
+import csv
+import gc
+import sys
+from operator import itemgetter
+from pathlib import Path
+
+import numpy as np
+
+from constraints import PARAMS_FILE, load_parameters
+from model import ParameterError, as_layout
+
+SCRIPT_DIR = Path(__file__).parent
+INVENTORY_FILE = SCRIPT_DIR / "data" / "station_inventory.csv"
+
+# CSV column -> table attribute
+NUMERIC = {
+    'width_in': 'width',
+    'depth_in': 'depth',
+    'height_in': 'height',
+    'clearance_front_in': 'clearance_front',
+    'clearance_sides_in': 'clearance_sides',
+    'clearance_rear_in': 'clearance_rear',
+    'power_circuits': 'circuits',
+    'power_amps': 'amps',
+}
+CATEGORICAL = {
+    'category': 'categories',
+    'zone': 'zones',
+    'power_voltage': 'voltage',
+    'power_special': 'power_special',
+    'dust_fume': 'dust_fume',
+    'status': 'status',
+}
+TEXT = {
+    'station_id': 'ids',
+    'station_name': 'names',
+    'network': 'network',
+    'storage_type': 'storage_type',
+    'adjacency_constraints': 'adjacency',
+    'notes': 'notes',
+}
+
+# Voltage mix labels, by which of 120V / 240V a row needs
+VOLTAGE_CLASSES = ['none', '120V', '240V', '120V/240V']
+
+
+def _floats(values, where):
+    """Float array from CSV cells (blank -> NaN); each distinct cell is parsed once."""
+    try:
+        parsed = {v: float(v) if v else np.nan for v in set(values)}
+    except ValueError as e:
+        raise ParameterError(f"{where}: {e}") from None
+    return np.fromiter(map(parsed.__getitem__, values), dtype=float, count=len(values))
+
+
+class InventoryTable:
+    """Inventory rows as parallel arrays, in file order.
+
+    Text columns are lists, categorical ones str arrays and numeric ones
+    float arrays (NaN where blank). station_row[k] is the parameters station
+    index for row k, or -1 when no station names it.
+    """
+
+    __slots__ = (tuple(NUMERIC.values()) + tuple(CATEGORICAL.values()) + tuple(TEXT.values())
+                 + ('_index', 'station_row', 'source'))
+
+    def __init__(self, columns, source=None):
+        n = len(columns['station_id'])
+        self.source = source
+        for col, attr in TEXT.items():
+            setattr(self, attr, columns.get(col, [''] * n))
+        # Rows repeat a handful of station types: convert each distinct
+        # combination of categorical and numeric cells once, then index by row
+        coded = [col for col in (*CATEGORICAL, *NUMERIC) if col in columns]
+        keys = list(zip(*(columns[col] for col in coded))) if coded else [()] * n
+        distinct = {key: k for k, key in enumerate(dict.fromkeys(keys))}
+        rows = np.fromiter(map(distinct.__getitem__, keys), dtype=np.intp, count=n)
+        levels = dict(zip(coded, zip(*distinct)))
+        for col, attr in CATEGORICAL.items():
+            setattr(self, attr, np.array(levels[col], dtype=str)[rows] if col in levels
+                    else np.full(n, ''))
+        for col, attr in NUMERIC.items():
+            setattr(self, attr, _floats(levels[col], f'{source or "inventory"}:{col}')[rows]
+                    if col in levels else np.full(n, np.nan))
+        self._index = dict(zip(self.ids, range(n)))
+        self.station_row = np.full(n, -1)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, inventory_id):
+        return inventory_id in self._index
+
+    def index(self, inventory_id):
+        return self._index[inventory_id]
+
+    # --- Derived columns ----------------------------------------------------
+
+    @property
+    def total_width(self):
+        """Width including side clearance on both sides (blank clearances count as 0)."""
+        return self.width + 2 * np.nan_to_num(self.clearance_sides)
+
+    @property
+    def total_depth(self):
+        """Depth including front and rear clearance."""
+        return self.depth + np.nan_to_num(self.clearance_front) + np.nan_to_num(self.clearance_rear)
+
+    @property
+    def footprint_sqft(self):
+        return self.width * self.depth / 144
+
+    @property
+    def total_footprint_sqft(self):
+        return self.total_width * self.total_depth / 144
+
+    @property
+    def voltage_class(self):
+        """Index into VOLTAGE_CLASSES per row: bit 0 needs 120V, bit 1 needs 240V."""
+        return (np.char.find(self.voltage, '120') >= 0) + 2 * (np.char.find(self.voltage, '240') >= 0)
+
+    def by_zone(self, values):
+        """{zone: sum of values} over rows, NaN counted as 0."""
+        zones, inverse = np.unique(self.zones, return_inverse=True)
+        totals = np.bincount(inverse, weights=np.nan_to_num(values), minlength=len(zones))
+        return dict(zip(zones.tolist(), totals.tolist()))
+
+    def circuits_per_zone(self):
+        return {zone: int(n) for zone, n in self.by_zone(self.circuits).items()}
+
+    def voltage_mix(self):
+        """{zone: {voltage class: circuits}} for rows that need power."""
+        zones, inverse = np.unique(self.zones, return_inverse=True)
+        k = len(VOLTAGE_CLASSES)
+        counts = np.bincount(inverse * k + self.voltage_class,
+                             weights=np.nan_to_num(self.circuits),
+                             minlength=len(zones) * k).reshape(len(zones), k)
+        return {zone: {VOLTAGE_CLASSES[c]: int(counts[z, c]) for c in range(1, k) if counts[z, c]}
+                for z, zone in enumerate(zones.tolist())}
+
+    # --- Join ---------------------------------------------------------------
+
+    def join(self, params):
+        """Link rows to parameters stations via their inventory_id; returns unresolved ids.
+
+        Sets station_row and returns the inventory_id values in parameters
+        that no row matches (a renamed or missing inventory entry).
+        """
+        layout = as_layout(params)
+        stations = layout.params['stations']
+        self.station_row = np.full(len(self), -1)
+        missing = []
+        for k, sid in enumerate(layout.stations.ids):
+            inv = stations[sid].get('inventory_id')
+            if inv is None:
+                continue
+            row = self._index.get(inv)
+            if row is None:
+                missing.append(inv)
+            else:
+                self.station_row[row] = k
+        return missing
+
+    def station_rows(self, params):
+        """Inventory row per parameters station (-1 where unlinked), after join()."""
+        out = np.full(len(as_layout(params).stations), -1)
+        linked = np.flatnonzero(self.station_row >= 0)
+        out[self.station_row[linked]] = linked
+        return out
+
+
+def _read_columns(path):
+    """{csv column: list of cells} for the columns InventoryTable keeps."""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header or 'station_id' not in header:
+            raise ParameterError(f"{path.name}: missing header with a station_id column")
+        kept = [(i, col) for i, col in enumerate(header)
+                if col in NUMERIC or col in CATEGORICAL or col in TEXT]
+        index = [i for i, _ in kept]
+        need = max(index) + 1
+        # Only short rows (trailing blanks dropped by editors) are padded, and
+        # columns nothing reads are dropped before the transpose
+        rows = (row if len(row) >= need else row + [''] * (need - len(row))
+                for row in reader if row)
+        if len(kept) < len(header):
+            rows = map(itemgetter(*index) if len(index) > 1 else lambda row: (row[index[0]],),
+                       rows)
+        cells = list(zip(*rows)) or [()] * len(kept)
+    return {col: list(values) for (_, col), values in zip(kept, cells)}
+
+
+def load_inventory(path=INVENTORY_FILE, params=None):
+    """Read an inventory CSV into an InventoryTable, joined to params if given."""
+    path = Path(path)
+    # Hundreds of thousands of short-lived cell strings and row lists: cyclic
+    # GC passes over them find nothing to free, so pause it for the ingest
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        table = InventoryTable(_read_columns(path), source=path.name)
+    finally:
+        if enabled:
+            gc.enable()
+    if params is not None:
+        table.join(params)
+    return table
+
+
+def main(argv=None):
+    """Print the join against parameters.json and per-zone power; exit 1 on unresolved ids."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('inventory', nargs='?', default=INVENTORY_FILE, help='station inventory CSV')
+    args = parser.parse_args(argv)
+    params = load_parameters(PARAMS_FILE)
+    table = load_inventory(args.inventory)
+    missing = table.join(params)
+    layout = as_layout(params)
+    linked = table.station_rows(layout)
+
+    print(f"{table.source}: {len(table)} rows, "
+          f"{int((table.station_row >= 0).sum())} linked to parameters stations")
+    print(f"{'station':<28} {'inventory_id':<34} {'params':>9} {'inventory':>9} {'+clear':>9}")
+    size = layout.stations.size
+    total_w, total_d = table.total_width, table.total_depth
+    for k, sid in enumerate(layout.stations.ids):
+        row = linked[k]
+        if row < 0:
+            print(f"{sid:<28} {'-':<34} {size[k, 0]:>4.0f}x{size[k, 1]:<4.0f}")
+            continue
+        print(f"{sid:<28} {table.ids[row]:<34} {size[k, 0]:>4.0f}x{size[k, 1]:<4.0f} "
+              f"{table.width[row]:>4.0f}x{table.depth[row]:<4.0f} "
+              f"{total_w[row]:>4.0f}x{total_d[row]:<4.0f}")
+    for inv in missing:
+        print(f"! inventory_id {inv} not found in {table.source}")
+
+    print(f"\n{'zone':<18} {'circuits':>8}  voltage mix")
+    mix = table.voltage_mix()
+    for zone, n in sorted(table.circuits_per_zone().items()):
+        if n:
+            print(f"{zone:<18} {n:>8}  "
+                  + ', '.join(f'{v}: {c}' for v, c in mix[zone].items()))
+    return 1 if missing else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
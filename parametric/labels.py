@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Collision-free label placement for the Craft Room plans.
+Every label belongs to a box (a zone or a station footprint) and is tried
+at each font size, largest first, and each text variant (e.g. one line or
+wrapped), in this order of spots:
+
+  inside    centred in its box (or against its top/bottom edge), horizontal
+  rotated   centred in its box, turned 90 degrees
+  leader    outside the box by a side or corner, joined to it by a leader line
+  callout   a number in the box, spelled out in a callout table
+
+Labels with no free spot even for their number are left out.
+
+A spot is taken only if it overlaps no label placed before it (leader
+labels also keep off the other boxes), so nothing is drawn on top of
+anything else. Text extents are measured once per string/size/weight with
+matplotlib's own layout; placed labels live in a uniform grid hash, so each
+test only looks at labels in nearby cells and n labels place in
+O(n log n) (the sort by box size) rather than n^2.
+
+Example:
+    python labels.py [params.json]
+"""
+
+import argparse
+import sys
+from collections import defaultdict
+from functools import lru_cache
+
+import numpy as np
+
+from constraints import PARAMS_FILE, load_parameters
+from model import as_layout
+
+MODES = ['inside', 'rotated', 'leader', 'callout']
+
+INDEX_CELL = 24.0       # grid-hash cell, drawing inches
+PAD_POINTS = 1.5        # clear space kept around every label, points
+LEADER_GAPS = (1, 3)    # leader label distance from its box, in label heights
+CALLOUT_ROWS = 40       # callout table rows before "+N more"
+
+# Font sizes tried, largest first
+ZONE_SIZES = (9, 8, 7)
+STATION_SIZES = (6, 5)
+
+
+@lru_cache(maxsize=None)
+def _measurer():
+    """A text artist on a 72 dpi Agg canvas (one pixel per point) and its renderer."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(dpi=72)
+    canvas = FigureCanvasAgg(fig)
+    return fig.text(0, 0, ''), canvas.get_renderer()
+
+
+@lru_cache(maxsize=1 << 16)
+def text_extent(text, size, weight='normal', style='normal'):
+    """(width, height) in points of text as matplotlib lays it out (multi-line aware)."""
+    artist, renderer = _measurer()
+    artist.set_text(text)
+    artist.set_fontsize(size)
+    artist.set_fontweight(weight)
+    artist.set_fontstyle(style)
+    box = artist.get_window_extent(renderer)
+    return box.width, box.height
+
+
+def wrap(text):
+    """text split onto two lines at the space nearest its middle (unchanged if none)."""
+    spaces = [k for k, ch in enumerate(text) if ch == ' ']
+    if not spaces:
+        return text
+    k = min(spaces, key=lambda k: abs(2 * k - len(text)))
+    return text[:k] + '\n' + text[k + 1:]
+
+
+class LabelIndex:
+    """Uniform grid hash of rectangles (x0, y0, x1, y1) for overlap queries."""
+
+    def __init__(self, cell=INDEX_CELL):
+        self.cell = cell
+        self.rects = []
+        self.cells = defaultdict(list)
+
+    def _span(self, r):
+        c = self.cell
+        return range(int(r[0] // c), int(r[2] // c) + 1), range(int(r[1] // c), int(r[3] // c) + 1)
+
+    def add(self, r):
+        k = len(self.rects)
+        self.rects.append(r)
+        cols, rows = self._span(r)
+        for i in cols:
+            for j in rows:
+                self.cells[i, j].append(k)
+        return k
+
+    def hits(self, r, skip=None):
+        """True when r overlaps a stored rectangle (other than index skip)."""
+        c, cells, rects = self.cell, self.cells, self.rects
+        x0, y0, x1, y1 = r
+        for i in range(int(x0 // c), int(x1 // c) + 1):
+            for j in range(int(y0 // c), int(y1 // c) + 1):
+                for k in cells.get((i, j), ()):
+                    q = rects[k]
+                    if q[0] < x1 and x0 < q[2] and q[1] < y1 and y0 < q[3] and k != skip:
+                        return True
+        return False
+
+
+class LabelPlacer:
+    """Places labels for one drawing, keeping each clear of all earlier ones.
+
+    points_per_inch converts font points to drawing inches (see
+    Scene.text_points_per_inch); leader labels stay inside bounds
+    (x0, y0, x1, y1) when given. Callout rows collect in callouts as
+    (number, text) for draw_callouts.
+    """
+
+    def __init__(self, points_per_inch, bounds=None, cell=INDEX_CELL):
+        self.k = points_per_inch
+        self.bounds = bounds
+        self.pad = PAD_POINTS / points_per_inch
+        self.index = LabelIndex(cell)
+        self.callouts = []
+
+    def extent(self, text, size, weight='normal', style='normal'):
+        """(width, height) of text in drawing inches, padding included."""
+        w, h = text_extent(text, size, weight, style)
+        return w / self.k + 2 * self.pad, h / self.k + 2 * self.pad
+
+    def reserve(self, x, y, text, size, weight='normal', style='normal', ha='left',
+                va='baseline', rotation=0):
+        """Keep later labels off a text already in the drawing (anchored like scene.text)."""
+        w, h = self.extent(text, size, weight, style)
+        if rotation % 180:
+            w, h = h, w
+        x0 = x - {'left': 0, 'center': w / 2, 'right': w}[ha]
+        y0 = y - {'bottom': 0, 'baseline': self.pad, 'center': h / 2, 'center_baseline': h / 2,
+                  'top': h}[va]
+        self.index.add((x0, y0, x0 + w, y0 + h))
+
+    def reserve_segment(self, x0, y0, x1, y1):
+        """Keep later labels off a drawn line segment (its bounding box, padded)."""
+        p = self.pad
+        self.index.add((min(x0, x1) - p, min(y0, y1) - p, max(x0, x1) + p, max(y0, y1) + p))
+
+    def reserve_scene(self, scene):
+        """reserve() every label the scene has so far."""
+        from scene import Label
+        for item in scene.items:
+            if isinstance(item, Label):
+                s = item.style
+                self.reserve(item.x, item.y, str(item.text), s.get('fontsize', 10),
+                             s.get('fontweight', 'normal'), s.get('style', 'normal'),
+                             s.get('ha', 'left'), s.get('va', 'baseline'), s.get('rotation', 0))
+
+    def _inside(self, box, w, h, anchor):
+        """Candidate label rectangles inside box: centred, then a quarter up or down."""
+        x0, y0, x1, y1 = box
+        if w > x1 - x0 or h > y1 - y0:
+            return
+        cx = (x0 + x1) / 2
+        if anchor == 'center':
+            lo, hi = y0 + h / 2, y1 - h / 2
+            spots = ((lo + hi) / 2, (lo + 3 * hi) / 4, (3 * lo + hi) / 4)
+        else:
+            spots = (y0 + h / 2,) if anchor == 'bottom' else (y1 - h / 2,)
+        for cy in spots:
+            yield (cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2)
+
+    def _outside(self, box, w, h):
+        """Candidate label rectangles around box, nearest first."""
+        x0, y0, x1, y1 = box
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+        for gap in LEADER_GAPS:
+            g = gap * h
+            for px, py in ((cx, y1 + g + h / 2), (cx, y0 - g - h / 2),
+                           (x1 + g + w / 2, cy), (x0 - g - w / 2, cy),
+                           (x1 + g + w / 2, y1 + g + h / 2), (x0 - g - w / 2, y1 + g + h / 2),
+                           (x1 + g + w / 2, y0 - g - h / 2), (x0 - g - w / 2, y0 - g - h / 2)):
+                yield (px - w / 2, py - h / 2, px + w / 2, py + h / 2)
+
+    def _inbounds(self, r):
+        b = self.bounds
+        return b is None or (r[0] >= b[0] and r[1] >= b[1] and r[2] <= b[2] and r[3] <= b[3])
+
+    def _take(self, r, text, size, rotation, mode, leader=None, number=None):
+        self.index.add(r)
+        return {'x': (r[0] + r[2]) / 2, 'y': (r[1] + r[3]) / 2, 'text': text, 'size': size,
+                'rotation': rotation, 'mode': mode, 'rect': r, 'leader': leader,
+                'number': number}
+
+    def _fit(self, box, variants, sizes, turns, weight, style, anchor):
+        for size in sizes:
+            for rotation in turns:
+                for text in variants:
+                    w, h = self.extent(text, size, weight, style)
+                    if rotation:
+                        w, h = h, w
+                    for r in self._inside(box, w, h, anchor):
+                        if not self.index.hits(r):
+                            yield self._take(r, text, size, rotation, MODES[rotation // 90])
+                            return
+
+    def place(self, boxes, texts, sizes=(8,), weight='normal', style='normal', anchor='center',
+              rotate=True, leaders=True, callouts=True):
+        """Place one label per box; returns a list of dicts (None where dropped).
+
+        boxes are (n, 4) rows (x0, y0, x1, y1); texts[i] is a string or a
+        tuple of variants, preferred first. Each dict has x, y (label
+        centre), text, size, rotation, mode (see MODES), rect, leader
+        ((2, 2) segment or None) and number (callout number or None).
+        Boxes that fit none of the allowed modes (a callout number
+        that would cover another label included) get no label.
+        """
+        boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        variants = [(t,) if isinstance(t, str) else tuple(t) for t in texts]
+        order = np.argsort((boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1]),
+                           kind='stable')
+        rows = boxes.tolist()
+        out = [None] * len(rows)
+
+        # Inside first, smallest boxes first: they have the fewest spots to give up.
+        # At each size every horizontal variant is tried before any turned one.
+        turns = (0, 90) if rotate and anchor == 'center' else (0,)
+        left = []
+        for k in order.tolist():
+            out[k] = next(self._fit(rows[k], variants[k], sizes, turns, weight, style, anchor),
+                          None)
+            if out[k] is None:
+                left.append(k)
+
+        # Leader labels outside their box, clear of every other box too
+        if leaders and left:
+            sides = np.r_[boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]]
+            others = LabelIndex(max(2 * float(np.median(sides)), self.pad))
+            for box in rows:
+                others.add(tuple(box))
+            size = sizes[-1]
+            still = []
+            for k in left:
+                box = rows[k]
+                text = variants[k][-1]
+                w, h = self.extent(text, size, weight, style)
+                for r in self._outside(box, w, h):
+                    if self._inbounds(r) and not others.hits(r, skip=k) and not self.index.hits(r):
+                        p = (min(max((r[0] + r[2]) / 2, box[0]), box[2]),
+                             min(max((r[1] + r[3]) / 2, box[1]), box[3]))
+                        q = (min(max(p[0], r[0]), r[2]), min(max(p[1], r[1]), r[3]))
+                        out[k] = self._take(r, text, size, 0, 'leader', leader=np.array([p, q]))
+                        break
+                else:
+                    still.append(k)
+            left = still
+
+        # Numbered callouts, in reading order (top to bottom, left to right); a
+        # number may overhang a tiny box but still never covers another label
+        if callouts and left:
+            size = sizes[-1]
+            for k in sorted(left, key=lambda k: (-rows[k][3], rows[k][0])):
+                box = rows[k]
+                number = len(self.callouts) + 1
+                w, h = self.extent(str(number), size, weight, style)
+                cx, cy = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+                spots = list(self._inside(box, w, h, 'center')) or [
+                    (cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2)]
+                r = next((r for r in spots if not self.index.hits(r)), None)
+                if r is not None:
+                    out[k] = self._take(r, str(number), size, 0, 'callout', number=number)
+                    self.callouts.append((number, variants[k][0].replace('\n', ' ')))
+        return out
+
+
+def draw_labels(scene, layer, placed, leader_color='#757575', **style):
+    """Add placed labels to a scene as centred text, plus one batch of leader lines."""
+    leaders = []
+    for label in placed:
+        if label is None:
+            continue
+        s = dict(style, ha='center', va='center', fontsize=label['size'])
+        if label['rotation']:
+            s['rotation'] = label['rotation']
+        scene.text(layer, label['x'], label['y'], label['text'], **s)
+        if label['leader'] is not None:
+            leaders.append(label['leader'])
+    if leaders:
+        scene.lines(layer, leaders, color=leader_color, linewidth=0.5)
+
+
+def draw_callouts(scene, layer, placer, x, y, fontsize=6, max_rows=CALLOUT_ROWS, **style):
+    """The placer's callout table as one text block, top-left corner at (x, y)."""
+    rows = placer.callouts
+    if not rows:
+        return
+    lines = [f'{n}  {text}' for n, text in rows[:max_rows]]
+    if len(rows) > max_rows:
+        lines.append(f'+{len(rows) - max_rows} more')
+    scene.text(layer, x, y, '\n'.join(lines), ha='left', va='top', fontsize=fontsize, **style)
+
+
+def plan_bounds(layout):
+    """(x0, y0, x1, y1) of the room plus its bump-out, where leader labels may go."""
+    room, bump = layout.room, layout.bump
+    if bump is None:
+        return (0.0, 0.0, room.width, room.depth)
+    return (min(0.0, bump.x0), min(0.0, bump.y0), max(room.width, bump.x1),
+            max(room.depth, bump.y1))
+
+
+def station_texts(station_ids):
+    """Label variants per station id: stacked words, then one line."""
+    out = []
+    for sid in station_ids:
+        words = [w for w in sid.split('_') if w not in ('phenolic', 'station')] or [sid]
+        out.append(('\n'.join(words), ' '.join(words)))
+    return out
+
+
+def main(argv=None):
+    """Place the station labels on the bare room frame and print where each one went."""
+    from render_layout import room_scene
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('params', nargs='?', default=PARAMS_FILE, help='parameters file')
+    args = parser.parse_args(argv)
+    layout = as_layout(load_parameters(args.params))
+    scene = room_scene(layout, '')
+    placer = LabelPlacer(scene.text_points_per_inch, plan_bounds(layout))
+    placer.reserve_scene(scene)
+    st = layout.stations
+    xywh = st.placed_xywh
+    placed = placer.place(np.c_[xywh[:, :2], xywh[:, :2] + xywh[:, 2:]],
+                          station_texts(st.placed_ids), sizes=STATION_SIZES)
+    for sid, label in zip(st.placed_ids, placed):
+        if label is None:
+            print(f"{sid:<28} dropped")
+        else:
+            print(f"{sid:<28} {label['mode']:<8} {label['size']}pt")
+    modes = [p['mode'] if p else 'dropped' for p in placed]
+    counts = ', '.join(f"{modes.count(m)} {m}" for m in (*MODES, 'dropped'))
+    print(f"{len(placed)} labels: {counts}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Geometric diff between two versions of the Craft Room parameters.
+The room, the bump-out, zones, cabinet runs and placed stations are matched
+by id and compared as boxes:
+
+  added     only in the new version
+  removed   only in the old version
+  moved     same size, new position
+  resized   new size (and possibly position; a station turned 90 degrees
+            counts as resized)
+
+The comparison is NumPy over id-aligned box arrays. The overlay plan draws
+only the changed boxes - the old box dashed, the new one filled, an arrow
+between their centres - over the new version's room frame, so the PNG is
+composited onto the cached room Background instead of redrawing the plan.
+With --history every consecutive pair of committed parameters.json versions
+is diffed: each version is loaded once and pairs on an unchanged room reuse
+one background.
+
+Examples:
+    python layout_diff.py old.json new.json -o diff.png
+    python layout_diff.py --history 20
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+
+from model import PARAMS_FILE, as_layout, load_layout
+
+OUTPUT_DIR = Path(__file__).parent / "exports"
+HISTORY_DIR = OUTPUT_DIR / "diffs"
+
+ENTITIES = ['room', 'bump_out', 'zone', 'cabinetry', 'station']
+KINDS = ['added', 'removed', 'moved', 'resized']
+
+# Smaller differences (inches) are unit-conversion noise, not edits
+TOLERANCE = 0.01
+
+# (face, edge) per kind; old boxes are drawn dashed and unfilled
+COLORS = {
+    'added': ('#C8E6C9', '#2E7D32'),
+    'removed': ('none', '#C62828'),
+    'moved': ('#FFE0B2', '#EF6C00'),
+    'resized': ('#BBDEFB', '#1565C0'),
+}
+OLD_EDGE = '#9E9E9E'
+
+# Above this many moves, centre shifts are one batch of plain lines (each
+# arrow is a separate annotation artist, costly to draw and crop)
+MAX_ARROWS = 100
+
+# old/new are (x0, y0, x1, y1) boxes, None where the entity does not exist
+Change = namedtuple('Change', 'entity id kind old new')
+
+
+def entity_boxes(params):
+    """{entity: (ids, (n, 4) boxes as x0, y0, x1, y1)} for everything a diff compares."""
+    layout = as_layout(params)
+    room, st = layout.room, layout.stations
+    runs = {key: run for key, run in layout.params.get('cabinetry', {}).items()
+            if key.startswith('cabinet_run_')}
+    xywh = st.placed_xywh
+    out = {
+        'room': (['room'], [(0, 0, room.width, room.depth)]),
+        'bump_out': (['bump_out'], [layout.bump.box]) if layout.bump else ([], []),
+        'zone': (layout.zones.ids, layout.zones.boxes),
+        'cabinetry': (list(runs), [(r['x_start'], r['y_start'], r['x_end'], r['y_end'])
+                                   for r in runs.values()]),
+        'station': (st.placed_ids, np.c_[xywh[:, :2], xywh[:, :2] + xywh[:, 2:]]),
+    }
+    return {e: (ids, np.asarray(boxes, dtype=float).reshape(-1, 4))
+            for e, (ids, boxes) in out.items()}
+
+
+def diff_layouts(old, new):
+    """Changes from old to new: by entity (ENTITIES order), then kind, then id."""
+    before, after = entity_boxes(old), entity_boxes(new)
+    changes = []
+    for entity in ENTITIES:
+        (old_ids, old_boxes), (new_ids, new_boxes) = before[entity], after[entity]
+        old_at = {i: k for k, i in enumerate(old_ids)}
+        new_at = {i: k for k, i in enumerate(new_ids)}
+        common = [i for i in new_ids if i in old_at]
+        a = old_boxes[[old_at[i] for i in common]]
+        b = new_boxes[[new_at[i] for i in common]]
+        resized = (np.abs((b[:, 2:] - b[:, :2]) - (a[:, 2:] - a[:, :2])) > TOLERANCE).any(axis=1)
+        moved = (np.abs(b[:, :2] - a[:, :2]) > TOLERANCE).any(axis=1)
+
+        rows = [(i, 'added', None, new_boxes[k]) for i, k in new_at.items() if i not in old_at]
+        rows += [(i, 'removed', old_boxes[k], None) for i, k in old_at.items() if i not in new_at]
+        rows += [(common[k], 'resized' if resized[k] else 'moved', a[k], b[k])
+                 for k in np.flatnonzero(moved | resized).tolist()]
+        rows.sort(key=lambda r: (KINDS.index(r[1]), r[0]))
+        changes += [Change(entity, i, kind, None if o is None else tuple(o.tolist()),
+                           None if n is None else tuple(n.tolist()))
+                    for i, kind, o, n in rows]
+    return changes
+
+
+def _size(box):
+    return f'{box[2] - box[0]:.4g}x{box[3] - box[1]:.4g}'
+
+
+def _at(box):
+    return f'({box[0]:.4g}, {box[1]:.4g})'
+
+
+def change_report(changes):
+    """One (entity, id, kind, detail) row per change."""
+    rows = []
+    for c in changes:
+        if c.kind == 'added':
+            detail = f'{_size(c.new)} at {_at(c.new)}'
+        elif c.kind == 'removed':
+            detail = f'{_size(c.old)} at {_at(c.old)}'
+        elif c.kind == 'moved':
+            detail = f'{_at(c.old)} -> {_at(c.new)}'
+        else:
+            detail = f'{_size(c.old)} -> {_size(c.new)}'
+            if _at(c.old) != _at(c.new):
+                detail += f', {_at(c.old)} -> {_at(c.new)}'
+        rows.append((c.entity, c.id, c.kind, detail))
+    return rows
+
+
+def summary(changes):
+    """'2 added, 1 moved' style count of changes by kind."""
+    counts = [(sum(c.kind == kind for c in changes), kind) for kind in KINDS]
+    return ', '.join(f'{n} {kind}' for n, kind in counts if n) or 'no changes'
+
+
+def diff_scene(new, changes, title):
+    """Scene of the changes over the new version's room frame."""
+    from labels import LabelPlacer, draw_callouts, draw_labels, plan_bounds, station_texts
+    from render_layout import MAX_LABELS, room_scene
+
+    layout = as_layout(new)
+    scene = room_scene(layout, title)
+
+    def xywh(boxes):
+        b = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        return np.c_[b[:, :2], b[:, 2:] - b[:, :2]]
+
+    # The room and bump-out are outlines only; filling them would hide the plan
+    def face(c):
+        return 'none' if c.entity in ('room', 'bump_out') else COLORS[c.kind][0]
+
+    # Where things are now (filled, largest first so small boxes stay on top),
+    # then where they were (dashed) above them
+    now = sorted((c for c in changes if c.new is not None),
+                 key=lambda c: -(c.new[2] - c.new[0]) * (c.new[3] - c.new[1]))
+    was = [c for c in changes if c.old is not None]
+    if now:
+        scene.boxes('DIFF_NEW', xywh([c.new for c in now]), facecolor=[face(c) for c in now],
+                    edgecolor=[COLORS[c.kind][1] for c in now], alpha=0.8, linewidth=1.5)
+    if was:
+        scene.boxes('DIFF_OLD', xywh([c.old for c in was]), facecolor='none',
+                    edgecolor=[COLORS['removed'][1] if c.kind == 'removed' else OLD_EDGE
+                               for c in was], linewidth=1.5, linestyle='--')
+
+    # Centre to centre for boxes whose corner moved (not for a resize alone)
+    shifts = []
+    for c in changes:
+        if c.old is not None and c.new is not None and _at(c.old) != _at(c.new):
+            tail = ((c.old[0] + c.old[2]) / 2, (c.old[1] + c.old[3]) / 2)
+            head = ((c.new[0] + c.new[2]) / 2, (c.new[1] + c.new[3]) / 2)
+            shifts.append((tail, head, COLORS[c.kind][1]))
+    if len(shifts) <= MAX_ARROWS:
+        for tail, head, color in shifts:
+            scene.arrow('DIFF_MOVES', tail, head, color=color, linewidth=1)
+    else:
+        scene.lines('DIFF_MOVES', [(t, h) for t, h, _ in shifts], color=OLD_EDGE, linewidth=0.5)
+
+    # Ids of the changed entities (the room is named by the frame itself)
+    named = [c for c in changes if c.entity != 'room']
+    if 0 < len(named) <= MAX_LABELS:
+        placer = LabelPlacer(scene.text_points_per_inch, plan_bounds(layout))
+        placer.reserve_scene(scene)
+        placed = placer.place([c.new or c.old for c in named],
+                              station_texts([c.id for c in named]), sizes=(6, 5))
+        for kind in KINDS:
+            draw_labels(scene, 'DIFF_LABELS',
+                        [p if c.kind == kind else None for p, c in zip(placed, named)],
+                        color=COLORS[kind][1])
+        draw_callouts(scene, 'DIFF_LABELS', placer, plan_bounds(layout)[2] + 6,
+                      layout.room.depth, fontsize=5, color='#37474F')
+
+    scene.text('LEGEND', layout.room.width / 2, -46,
+               f'Changes: {summary(changes)} (green: added, red dashed: removed, orange: '
+               f'moved, blue: resized; grey dashed: previous box)',
+               ha='center', fontsize=8, color='#37474F', style='italic')
+    return scene
+
+
+def render_png(old, new, title, dpi=150, changes=None):
+    """PNG bytes of the diff overlay, composited on the new room's cached background."""
+    from render_layout import background
+
+    changes = diff_layouts(old, new) if changes is None else changes
+    scene = diff_scene(new, changes, title)
+    return background(as_layout(new), scene, dpi).png(scene)
+
+
+def print_report(changes):
+    for entity, cid, kind, detail in change_report(changes):
+        print(f"  {entity:<9} {cid:<32} {kind:<8} {detail}")
+    print(f"  {summary(changes)}")
+
+
+def git_versions(path=PARAMS_FILE, limit=None):
+    """[(short rev, subject)] of the commits that touched path, oldest first."""
+    path = Path(path).resolve()
+    cmd = ['git', 'log', '--format=%h %s'] + (['-n', str(limit + 1)] if limit else [])
+    out = subprocess.run(cmd + ['--', path.name], cwd=path.parent, capture_output=True,
+                         text=True, check=True).stdout
+    return [tuple(line.split(' ', 1)) for line in reversed(out.splitlines())]
+
+
+def git_params(rev, path=PARAMS_FILE):
+    """The parameters dict of path as committed in rev."""
+    path = Path(path).resolve()
+    blob = subprocess.run(['git', 'show', f'{rev}:./{path.name}'], cwd=path.parent,
+                          capture_output=True, check=True).stdout
+    return json.loads(blob)
+
+
+def diff_history(path=PARAMS_FILE, limit=None, out_dir=HISTORY_DIR, dpi=150):
+    """Diff every consecutive pair of committed versions; returns the PNGs written."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    prev = None
+    for rev, subject in git_versions(path, limit):
+        try:
+            layout = as_layout(git_params(rev, path))
+        except (ValueError, subprocess.CalledProcessError) as e:
+            print(f"! {rev}: {e} (skipped)")
+            continue
+        if prev is not None:
+            changes = diff_layouts(prev[1], layout)
+            print(f"{prev[0]}..{rev} {subject}")
+            print_report(changes)
+            if changes:
+                out_file = out_dir / f'diff_{prev[0]}_{rev}.png'
+                title = f'LAYOUT DIFF - {prev[0]} -> {rev}'
+                out_file.write_bytes(render_png(prev[1], layout, title, dpi, changes))
+                written.append(out_file)
+        prev = (rev, layout)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('old', nargs='?', type=Path, help='old parameters file')
+    parser.add_argument('new', nargs='?', type=Path, default=PARAMS_FILE,
+                        help='new parameters file (default: data/parameters.json)')
+    parser.add_argument('-o', '--out', type=Path, default=None,
+                        help='overlay PNG (default: exports/layout_diff.png; '
+                             'with --history the output directory)')
+    parser.add_argument('--history', type=int, metavar='N', default=None,
+                        help='diff the last N committed versions of the new file instead')
+    parser.add_argument('--dpi', type=int, default=150)
+    parser.add_argument('--no-render', action='store_true', help='print the change table only')
+    args = parser.parse_args(argv)
+
+    if args.history is not None:
+        written = diff_history(args.new, args.history, args.out or HISTORY_DIR, args.dpi)
+        print(f"{len(written)} diff(s) written")
+        return 0
+    if args.old is None:
+        parser.error('old parameters file required (or --history N)')
+
+    try:
+        old, new = load_layout(args.old), load_layout(args.new)
+    except (OSError, ValueError) as e:
+        print(f"! {e}")
+        return 2
+    changes = diff_layouts(old, new)
+    print(f"{args.old} -> {args.new}")
+    print_report(changes)
+    if changes and not args.no_render:
+        out_file = args.out or OUTPUT_DIR / 'layout_diff.png'
+        title = f'LAYOUT DIFF - {args.old.name} -> {args.new.name}'
+        out_file.write_bytes(render_png(old, new, title, args.dpi, changes))
+        print(f"Saved: {out_file}")
+    return 1 if changes else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Typed, compiled layout model for Craft Room.
+compile_layout() validates a parameters dict once and resolves units (inches,
+with *_ft / *_mm fallbacks) and defaults into slotted objects and array-backed
+zone/station tables, so render and constraint loops index arrays instead of
+repeating nested dict lookups with scattered defaults.
+
+load_layout() adds an on-disk compiled cache: a pickled model per source file,
+reused while the file's mtime/size match (or, when they differ, its content
+hash still does), so large parameter files skip JSON parsing and validation.
+The raw dict stays available as layout.params for code that still reads it.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+PARAMS_FILE = SCRIPT_DIR / "data" / "parameters.json"
+CACHE_DIR = SCRIPT_DIR / ".cache" / "params"
+
+# Bump when the compiled classes change shape; older cache files are ignored
+MODEL_VERSION = 1
+
+# Station footprint when neither width/depth nor machine_width/depth is given
+DEFAULT_STATION_SIZE = (30, 24)
+
+
+class ParameterError(ValueError):
+    """parameters.json is missing a required value or has one of the wrong type."""
+
+
+def _number(value, where):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ParameterError(f"{where}: expected a number, got {value!r}")
+    return value
+
+
+def _inches(d, key, where, default=None):
+    """d[key] in inches, falling back to key_ft / key_mm, then default."""
+    if key in d:
+        return _number(d[key], f"{where}.{key}")
+    if f"{key}_ft" in d:
+        return _number(d[f"{key}_ft"], f"{where}.{key}_ft") * 12
+    if f"{key}_mm" in d:
+        return _number(d[f"{key}_mm"], f"{where}.{key}_mm") / 25.4
+    if default is None:
+        raise ParameterError(f"{where}: missing '{key}'")
+    return default
+
+
+def _section(params, key, where='parameters'):
+    value = params.get(key)
+    if not isinstance(value, dict):
+        raise ParameterError(f"{where}: missing section '{key}'")
+    return value
+
+
+class Room:
+    __slots__ = ('width', 'depth', 'width_ft', 'depth_ft', 'main_sqft', 'total_sqft')
+
+    def __init__(self, room, bump):
+        self.width = _inches(room, 'room_width', 'room')
+        self.depth = _inches(room, 'room_depth', 'room')
+        if self.width <= 0 or self.depth <= 0:
+            raise ParameterError('room: room_width and room_depth must be positive')
+        self.width_ft = room.get('room_width_ft', self.width / 12)
+        self.depth_ft = room.get('room_depth_ft', self.depth / 12)
+        self.main_sqft = room.get('main_area_sqft', round(self.width * self.depth / 144))
+        self.total_sqft = self.main_sqft
+        if bump is not None:
+            self.total_sqft = bump.total_sqft or self.main_sqft + bump.area_sqft
+
+
+class BumpOut:
+    __slots__ = ('x0', 'y0', 'x1', 'y1', 'width_ft', 'depth_ft', 'area_sqft', 'total_sqft')
+
+    def __init__(self, bump):
+        self.x0 = _inches(bump, 'x_start', 'bump_out')
+        self.y0 = _inches(bump, 'y_start', 'bump_out')
+        self.x1 = _inches(bump, 'x_end', 'bump_out')
+        self.y1 = _inches(bump, 'y_end', 'bump_out')
+        if self.x1 <= self.x0 or self.y1 <= self.y0:
+            raise ParameterError('bump_out: x_end/y_end must exceed x_start/y_start')
+        self.width_ft = bump.get('width_ft', (self.x1 - self.x0) / 12)
+        self.depth_ft = bump.get('depth_ft', (self.y1 - self.y0) / 12)
+        self.area_sqft = bump.get('area_sqft', round((self.x1 - self.x0) * (self.y1 - self.y0) / 144))
+        self.total_sqft = bump.get('total_room_sqft')
+
+    @property
+    def box(self):
+        return (self.x0, self.y0, self.x1, self.y1)
+
+
+class ZoneTable:
+    """Zones as parallel arrays; boxes are (x0, y0, x1, y1) rows in inches."""
+
+    __slots__ = ('ids', 'names', 'categories', 'boxes', 'in_bump_out', 'area_sqft', '_index')
+
+    def __init__(self, zones):
+        self.ids = list(zones)
+        rows, self.names, cats, bump, area = [], [], [], [], []
+        for zid, z in zones.items():
+            where = f'zones.{zid}'
+            if not isinstance(z, dict):
+                raise ParameterError(f"{where}: expected an object")
+            x, y = _inches(z, 'x_start', where), _inches(z, 'y_start', where)
+            w, d = _inches(z, 'width', where), _inches(z, 'depth', where)
+            if w <= 0 or d <= 0:
+                raise ParameterError(f"{where}: width and depth must be positive")
+            rows.append((x, y, x + w, y + d))
+            self.names.append(str(z.get('name', zid)))
+            cats.append(z.get('category', 'shared'))
+            bump.append(bool(z.get('in_bump_out')))
+            area.append(z.get('area_sqft', 0))
+        self.boxes = np.array(rows, dtype=float).reshape(-1, 4)
+        self.categories = np.array(cats, dtype=str)
+        self.in_bump_out = np.array(bump, dtype=bool)
+        self.area_sqft = area
+        self._index = {zid: i for i, zid in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, zone_id):
+        return zone_id in self._index
+
+    def index(self, zone_id):
+        return self._index[zone_id]
+
+    @property
+    def xywh(self):
+        """(n, 4) array of (x, y, width, depth) boxes."""
+        b = self.boxes
+        return np.c_[b[:, :2], b[:, 2:] - b[:, :2]]
+
+
+class StationTable:
+    """Stations as parallel arrays, in parameters order.
+
+    size holds the unrotated (width, depth) footprint; for placed stations
+    xy is the lower-left corner and extent the (x, y) size after rotation.
+    Unplaced rows have placed=False and NaN xy.
+    """
+
+    __slots__ = ('ids', 'names', 'categories', 'size', 'placed', 'xy', 'rotation', 'extent',
+                 '_index')
+
+    def __init__(self, stations, positions):
+        self.ids = list(stations)
+        n = len(self.ids)
+        self.names, cats = [], []
+        size = np.empty((n, 2))
+        xy = np.full((n, 2), np.nan)
+        rotation = np.zeros(n)
+        for i, (sid, s) in enumerate(stations.items()):
+            where = f'stations.{sid}'
+            if not isinstance(s, dict):
+                raise ParameterError(f"{where}: expected an object")
+            size[i] = (_inches(s, 'width', where,
+                               _inches(s, 'machine_width', where, DEFAULT_STATION_SIZE[0])),
+                       _inches(s, 'depth', where,
+                               _inches(s, 'machine_depth', where, DEFAULT_STATION_SIZE[1])))
+            self.names.append(str(s.get('name', sid)))
+            cats.append(s.get('category', 'shared'))
+            pos = positions.get(sid)
+            if pos is not None:
+                where = f'station_positions.{sid}'
+                if not isinstance(pos, dict):
+                    raise ParameterError(f"{where}: expected an object")
+                xy[i] = (_inches(pos, 'x', where), _inches(pos, 'y', where))
+                rotation[i] = _number(pos.get('rotation', 0), f'{where}.rotation')
+        self.categories = np.array(cats, dtype=str)
+        self.size = size
+        self.xy = xy
+        self.rotation = rotation
+        self.placed = ~np.isnan(xy[:, 0])
+        turned = (rotation % 180) == 90
+        self.extent = np.where(turned[:, None], size[:, ::-1], size)
+        self._index = {sid: i for i, sid in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, station_id):
+        return station_id in self._index
+
+    def index(self, station_id):
+        return self._index[station_id]
+
+    @property
+    def placed_ids(self):
+        return [sid for sid, p in zip(self.ids, self.placed) if p]
+
+    @property
+    def placed_xywh(self):
+        """(m, 4) array of (x, y, x-extent, y-extent) for placed stations."""
+        return np.c_[self.xy[self.placed], self.extent[self.placed]]
+
+
+class Layout:
+    """Validated, unit-resolved view of one parameters dict.
+
+    The tables are a snapshot: edit params and recompile rather than mutating
+    layout.params in place.
+    """
+
+    __slots__ = ('params', 'room', 'bump', 'zones', 'stations', 'circulation')
+
+    def __init__(self, params):
+        if not isinstance(params, dict):
+            raise ParameterError('parameters: expected a JSON object')
+        bump = params.get('bump_out') or {}
+        self.bump = BumpOut(bump) if bump.get('enabled') else None
+        self.room = Room(_section(params, 'room'), self.bump)
+        self.zones = ZoneTable(_section(params, 'zones'))
+        positions = {sid: pos for sid, pos in params.get('station_positions', {}).items()
+                     if not sid.startswith('_')}
+        self.stations = StationTable(_section(params, 'stations'), positions)
+        self.circulation = params.get('circulation', {})
+        self.params = params
+
+
+def compile_layout(params):
+    """Validate a parameters dict and build its Layout (raises ParameterError)."""
+    return Layout(params)
+
+
+def as_layout(params):
+    """params itself if already a Layout, else its compiled Layout."""
+    return params if isinstance(params, Layout) else Layout(params)
+
+
+# --- Compiled cache ---------------------------------------------------------
+
+def _cache_file(path, cache_dir):
+    name = hashlib.sha1(str(Path(path).resolve()).encode('utf-8')).hexdigest()[:16]
+    return Path(cache_dir) / f"{name}.pickle"
+
+
+def _read_cache(entry):
+    """(header, file) with the file positioned at the pickled Layout, or (None, None)."""
+    try:
+        f = open(entry, 'rb')
+    except FileNotFoundError:
+        return None, None
+    try:
+        header = pickle.load(f)
+        if isinstance(header, dict) and header.get('version') == MODEL_VERSION:
+            return header, f
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        pass
+    f.close()
+    return None, None
+
+
+def _write_cache(entry, header, layout):
+    """Write header + layout atomically; a failed write only costs a re-parse later."""
+    try:
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp, 'wb') as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(layout, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, entry)
+    except OSError:
+        pass
+
+
+def load_layout(path=PARAMS_FILE, cache_dir=CACHE_DIR):
+    """Load and compile a parameters file, via the compiled cache unless cache_dir is None."""
+    path = Path(path)
+    if cache_dir is None:
+        with open(path, 'rb') as f:
+            return Layout(json.loads(f.read()))
+
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    entry = _cache_file(path, cache_dir)
+    header, f = _read_cache(entry)
+    if f is not None:
+        with f:
+            if tuple(header['stamp']) == stamp:
+                try:
+                    return pickle.load(f)
+                except (EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+                    pass
+
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    layout = None
+    if header is not None and header['digest'] == digest:
+        # Touched but unchanged: reuse the compiled model, refresh the stamp
+        _, f = _read_cache(entry)
+        if f is not None:
+            with f:
+                try:
+                    layout = pickle.load(f)
+                except (EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+                    layout = None
+    if layout is None:
+        layout = Layout(json.loads(data))
+    _write_cache(entry, {'version': MODEL_VERSION, 'stamp': stamp, 'digest': digest}, layout)
+    return layout
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Occupancy grid and clearance analysis for Craft Room.
+Rasterizes the room (plus bump-out) with stations, cabinetry runs, the dust
+collector and infrastructure zones as obstacles, then runs a capped
+Euclidean distance transform to measure actual clear widths. The open south
+wall is modeled as free floor so the entry edge does not read as a wall.
+
+SciPy's distance transform is used when available; otherwise an exact
+separable NumPy version (capped at max_clearance) is used.
+"""
+
+import sys
+
+import numpy as np
+
+from constraints import PARAMS_FILE, load_parameters, placed_footprint
+
+try:
+    from scipy import ndimage
+except ImportError:  # optional dependency
+    ndimage = None
+
+DEFAULT_RESOLUTION = 1.0   # inches per cell
+MAX_CLEARANCE = 60.0       # distances are capped here (inches)
+
+
+def obstacle_boxes(params):
+    """{id: (x0, y0, x1, y1)} for everything that blocks floor space."""
+    boxes = {}
+    stations = params['stations']
+    for sid, pos in params.get('station_positions', {}).items():
+        if sid.startswith('_') or sid not in stations:
+            continue
+        w, d = placed_footprint(stations[sid], pos)
+        boxes[sid] = (pos['x'], pos['y'], pos['x'] + w, pos['y'] + d)
+    for key, run in params.get('cabinetry', {}).items():
+        if key.startswith('cabinet_run_'):
+            boxes[key] = (run['x_start'], run['y_start'], run['x_end'], run['y_end'])
+    dc = params.get('infrastructure', {}).get('dust_collector')
+    if dc:
+        boxes['dust_collector'] = (dc['x'], dc['y'], dc['x'] + dc['width'], dc['y'] + dc['depth'])
+    for zone_id, zone in params['zones'].items():
+        if zone.get('category') == 'infrastructure':
+            boxes[zone_id] = (zone['x_start'], zone['y_start'],
+                              zone['x_start'] + zone['width'], zone['y_start'] + zone['depth'])
+    return boxes
+
+
+def _row_distance(blocked, cap):
+    """Distance (cells) along each row to the nearest blocked cell, capped."""
+    ny, nx = blocked.shape
+    idx = np.arange(nx, dtype=float)
+    left = np.where(blocked, idx, -np.inf)
+    left = np.maximum.accumulate(left, axis=1)
+    right = np.where(blocked, idx, np.inf)[:, ::-1]
+    right = np.minimum.accumulate(right, axis=1)[:, ::-1]
+    return np.minimum(np.minimum(idx - left, right - idx), cap + 1)
+
+
+def capped_edt(free, cap):
+    """Euclidean distance (cells) from each free cell to the nearest blocked one, <= cap."""
+    if ndimage is not None:
+        return np.minimum(ndimage.distance_transform_edt(free), cap)
+
+    # Exact separable transform limited to |dy| <= cap: rows first, then columns
+    g2 = _row_distance(~free, cap) ** 2
+    ny = free.shape[0]
+    best = g2.copy()
+    for dy in range(1, int(np.ceil(cap)) + 1):
+        if dy >= ny:
+            break
+        dy2 = dy * dy
+        np.minimum(best[dy:], g2[:-dy] + dy2, out=best[dy:])
+        np.minimum(best[:-dy], g2[dy:] + dy2, out=best[:-dy])
+    return np.minimum(np.sqrt(best), cap)
+
+
+class OccupancyGrid:
+    """Rasterized room with per-obstacle bookkeeping and a clearance field.
+
+    Cell (i, j) covers y in [y0 + i*res, y0 + (i+1)*res) and the same for x.
+    Obstacles are reference-counted so overlapping footprints can be moved
+    independently; move() only recomputes the affected window.
+    """
+
+    def __init__(self, params, resolution=DEFAULT_RESOLUTION, max_clearance=MAX_CLEARANCE):
+        self.res = float(resolution)
+        self.cap = max_clearance / self.res     # cap in cells
+        room = params['room']
+        bump = params.get('bump_out', {})
+        self.room_w, self.room_d = room['room_width'], room['room_depth']
+        x_max = max(self.room_w, bump.get('x_end', 0) if bump.get('enabled') else 0)
+        y_max = max(self.room_d, bump.get('y_end', 0) if bump.get('enabled') else 0)
+
+        # One wall cell west/east/north; free apron south of the open edge
+        self.x0 = -self.res
+        self.y0 = -max_clearance
+        self.nx = int(np.ceil((x_max - self.x0) / self.res)) + 1
+        self.ny = int(np.ceil((y_max - self.y0) / self.res)) + 1
+
+        xs = self.x0 + (np.arange(self.nx) + 0.5) * self.res
+        ys = self.y0 + (np.arange(self.ny) + 0.5) * self.res
+        X, Y = np.meshgrid(xs, ys)
+        inside = (X > 0) & (X < self.room_w) & (Y < self.room_d)   # room + south apron
+        if bump.get('enabled'):
+            inside |= ((X > bump['x_start']) & (X < bump['x_end']) &
+                       (Y >= bump['y_start']) & (Y < bump['y_end']))
+        self.outside = ~inside
+        self.room_mask = inside & (Y > 0)     # floor we actually report on
+
+        self.counts = np.zeros((self.ny, self.nx), dtype=np.int16)
+        self.obstacles = {}
+        for oid, box in obstacle_boxes(params).items():
+            self._stamp(box, +1)
+            self.obstacles[oid] = box
+        self.dist = capped_edt(~self.blocked(), self.cap) * self.res
+
+    # --- geometry helpers ---
+
+    def _cells(self, box):
+        """Cell slice bounds (i0, i1, j0, j1) covered by a box (x0, y0, x1, y1)."""
+        j0 = int(np.floor((box[0] - self.x0) / self.res))
+        j1 = int(np.ceil((box[2] - self.x0) / self.res))
+        i0 = int(np.floor((box[1] - self.y0) / self.res))
+        i1 = int(np.ceil((box[3] - self.y0) / self.res))
+        # Clamp both ends: a box off the grid must give an empty slice, not a
+        # negative end that wraps around
+        i0, j0 = min(max(i0, 0), self.ny), min(max(j0, 0), self.nx)
+        return i0, min(max(i1, i0), self.ny), j0, min(max(j1, j0), self.nx)
+
+    def _stamp(self, box, delta):
+        i0, i1, j0, j1 = self._cells(box)
+        self.counts[i0:i1, j0:j1] += delta
+
+    def cell(self, x, y):
+        """(i, j) index of the cell containing point (x, y)."""
+        return int((y - self.y0) // self.res), int((x - self.x0) // self.res)
+
+    def blocked(self):
+        return self.outside | (self.counts > 0)
+
+    def obstacle_at(self, x, y):
+        """Id of an obstacle covering (x, y), 'wall' outside the room, else None."""
+        for oid, (x0, y0, x1, y1) in self.obstacles.items():
+            if x0 <= x <= x1 and y0 <= y <= y1:
+                return oid
+        i, j = self.cell(x, y)
+        return 'wall' if self.outside[i, j] else None
+
+    # --- incremental updates ---
+
+    def move(self, oid, box):
+        """Move (or add) one obstacle and refresh the clearance field around it."""
+        old = self.obstacles.get(oid)
+        if old is not None:
+            self._stamp(old, -1)
+        self._stamp(box, +1)
+        self.obstacles[oid] = box
+        self._refresh([b for b in (old, box) if b is not None])
+
+    def remove(self, oid):
+        """Remove one obstacle and refresh the clearance field around it."""
+        old = self.obstacles.pop(oid)
+        self._stamp(old, -1)
+        self._refresh([old])
+
+    def _refresh(self, boxes):
+        # Distances are capped at R, so only cells within R of a change can
+        # differ, and their nearest obstacle lies within 2R of the change.
+        r = int(np.ceil(self.cap))
+        cells = [self._cells(b) for b in boxes]
+        i0, i1 = min(c[0] for c in cells), max(c[1] for c in cells)
+        j0, j1 = min(c[2] for c in cells), max(c[3] for c in cells)
+        wi0, wi1 = max(i0 - r, 0), min(i1 + r, self.ny)
+        wj0, wj1 = max(j0 - r, 0), min(j1 + r, self.nx)
+        si0, si1 = max(i0 - 2 * r, 0), min(i1 + 2 * r, self.ny)
+        sj0, sj1 = max(j0 - 2 * r, 0), min(j1 + 2 * r, self.nx)
+
+        free = ~self.blocked()[si0:si1, sj0:sj1]
+        sub = capped_edt(free, self.cap) * self.res
+        self.dist[wi0:wi1, wj0:wj1] = sub[wi0 - si0:wi1 - si0, wj0 - sj0:wj1 - sj0]
+
+    # --- analysis ---
+
+    def clear_width(self):
+        """Clear width (inches) through each free cell's medial point; 0 when blocked.
+
+        2 * distance - one cell, i.e. a conservative width for a corridor
+        whose centerline passes through the cell.
+        """
+        width = np.clip(2 * self.dist - self.res, 0, None)
+        width[~self.room_mask] = 0
+        return width
+
+    def ridge(self, min_width=0.0):
+        """Boolean mask of medial-axis cells (local maxima across x or y)."""
+        d = self.dist
+        pad = np.pad(d, 1, constant_values=0)
+        across_x = (d >= pad[1:-1, :-2]) & (d >= pad[1:-1, 2:])
+        across_y = (d >= pad[:-2, 1:-1]) & (d >= pad[2:, 1:-1])
+        width = self.clear_width()
+        return (across_x | across_y) & self.room_mask & (width >= max(min_width, self.res))
+
+    def min_width_along(self, points):
+        """Minimum clear width over a polyline sampled at cell resolution."""
+        points = np.asarray(points, dtype=float)
+        samples = [points[0]]
+        for a, b in zip(points[:-1], points[1:]):
+            n = max(1, int(np.ceil(np.abs(b - a).max() / self.res)))
+            samples.extend(a + (b - a) * (np.arange(1, n + 1)[:, None] / n))
+        samples = np.array(samples)
+        i = ((samples[:, 1] - self.y0) // self.res).astype(int).clip(0, self.ny - 1)
+        j = ((samples[:, 0] - self.x0) // self.res).astype(int).clip(0, self.nx - 1)
+        widths = self.clear_width()[i, j]
+        k = int(np.argmin(widths))
+        return float(widths[k]), (float(samples[k, 0]), float(samples[k, 1]))
+
+
+def _spread_runs(reach, mask):
+    """Flood reach along contiguous runs of mask within each row."""
+    ny, nx = mask.shape
+    run_id = np.cumsum(~mask, axis=1) + (np.arange(ny) * (nx + 1))[:, None]
+    hit = np.bincount(run_id[reach & mask], minlength=ny * (nx + 1) + nx + 1) > 0
+    return mask & hit[run_id]
+
+
+def flood(mask, seed):
+    """Cells of mask 4-connected to seed; alternates row/column run spreading."""
+    reach = seed & mask
+    while True:
+        prev = reach
+        reach = _spread_runs(reach, mask)
+        reach = _spread_runs(reach.T, mask.T).T
+        if np.array_equal(reach, prev):
+            return reach
+
+
+def access_levels(params, cap=MAX_CLEARANCE):
+    """Width thresholds (inches) used for bottleneck analysis."""
+    circ = params.get('circulation', {})
+    levels = {circ.get(k) for k in ('aisle_tertiary_min', 'aisle_secondary_min',
+                                    'aisle_primary_min', 'aisle_min_target')}
+    levels |= set(range(6, int(2 * cap), 6))
+    return sorted(level for level in levels if level)
+
+
+def access_width(grid, levels):
+    """Bottleneck width (inches) of the widest path from the open edge to each cell.
+
+    A cell reachable from the south apron through cells at least w wide
+    gets access width >= w; evaluated at each threshold in levels.
+    """
+    width = np.clip(2 * grid.dist - grid.res, 0, None)
+    width[grid.outside & ~grid.room_mask] = 0
+    free = ~grid.blocked()
+    apron = np.zeros_like(free)
+    apron[:grid.cell(0, 0)[0], :] = True
+    access = np.zeros(width.shape)
+    for level in levels:
+        reach = flood(free & (width >= level - 1e-9), apron)
+        if not reach.any():
+            break
+        access[reach] = level
+    return access
+
+
+def paths(params):
+    """Named walkable centerlines: {name: [(x, y), ...]} from circulation + kayak lane."""
+    room = params['room']
+    circ = params.get('circulation', {})
+    named = {}
+    kayak = params['zones'].get('zone_kayak')
+    if 'main_aisle_y' in circ:
+        # The kayak lane doubles as main circulation; use its span when present
+        y = circ['main_aisle_y']
+        x0, x1 = 0.5, room['room_width'] - 0.5
+        if kayak:
+            x0, x1 = kayak['x_start'], kayak['x_start'] + kayak['width']
+        named['main_aisle'] = [(x0, y), (x1, y)]
+    if kayak:
+        y = kayak['y_start'] + kayak['depth'] / 2
+        named['kayak_lane'] = [(kayak['x_start'], y), (kayak['x_start'] + kayak['width'], y)]
+    return named
+
+
+def clearance_report(params, grid=None):
+    """Clear-width report for named paths, zones and stations.
+
+    Paths: minimum clear width along the centerline (and what blocks it).
+    Zones/stations: access width, the bottleneck of the widest path from the
+    open edge into the zone / up to the station's front edge.
+    Returns {name: {'min_width', 'at', 'required', 'blocked_by'}}.
+    """
+    grid = grid or OccupancyGrid(params)
+    circ = params.get('circulation', {})
+    primary = circ.get('aisle_primary_min', 36)
+    walkable = circ.get('aisle_tertiary_min', 24)
+    report = {}
+    for name, pts in paths(params).items():
+        width, at = grid.min_width_along(pts)
+        report[name] = {'min_width': width, 'at': at, 'required': primary,
+                        'blocked_by': grid.obstacle_at(*at) if width == 0 else None}
+
+    access = access_width(grid, access_levels(params, grid.cap * grid.res))
+    for zone_id, zone in params['zones'].items():
+        if zone.get('category') == 'infrastructure':
+            continue
+        i0, i1, j0, j1 = grid._cells((zone['x_start'], zone['y_start'],
+                                      zone['x_start'] + zone['width'], zone['y_start'] + zone['depth']))
+        report[zone_id] = {'min_width': float(access[i0:i1, j0:j1].max(initial=0)), 'at': None,
+                           'required': walkable, 'blocked_by': None}
+
+    # Station fronts face south: best access within a walkable reach of the front edge
+    for sid, (x0, y0, x1, y1) in grid.obstacles.items():
+        if sid not in params['stations']:
+            continue
+        i0, i1, j0, j1 = grid._cells((x0, y0 - walkable - grid.res, x1, y0))
+        report[sid] = {'min_width': float(access[i0:i1, j0:j1].max(initial=0)), 'at': None,
+                       'required': walkable, 'blocked_by': None}
+    return report
+
+
+def main(argv=None):
+    """Print the clearance report for a parameters file."""
+    argv = sys.argv[1:] if argv is None else argv
+    params = load_parameters(argv[0] if argv else PARAMS_FILE)
+    failing = 0
+    for name, r in clearance_report(params).items():
+        ok = r['min_width'] >= r['required']
+        failing += not ok
+        at = f" at ({r['at'][0]:.0f}, {r['at'][1]:.0f})" if r['at'] else ''
+        by = f" blocked by {r['blocked_by']}" if r['blocked_by'] else ''
+        print(f"{'OK   ' if ok else 'TIGHT'} {name:28s} {r['min_width']:5.0f}\" "
+              f"(need {r['required']}\"){at}{by}")
+    return 1 if failing else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Automatic station placement for Craft Room.
+Places every station from params['stations'] inside its assigned zone with
+simulated annealing, scoring candidates in NumPy batches. Independent chains
+run on a process pool under a shared time budget and the best layout wins.
+
+Hard requirements (weighted penalties): machine footprint inside its zone,
+no footprint inside another station's service-clearance envelope, clear of
+cabinetry / dust collector / kayak lane, envelope inside the room shell.
+Soft objective: material-flow travel distance along constraints' one-way
+flow plus any adjacency gaps beyond constraints.ADJACENCY_MAX_GAP.
+
+Example:
+    python placement.py --time-budget 10 --jobs 4 --write --render
+
+Exits 1 while hard constraints remain violated; --write then refuses to
+save the positions unless --force is given.
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from constraints import (PARAMS_FILE, box_gap, compile_rules, load_parameters,
+                         overlap_area, placed_footprint, station_footprint, validate)
+
+# Penalty per square inch of hard-constraint violation, vs 1 per inch of travel
+HARD_WEIGHT = 50.0
+# Probability that a proposal re-seeds a station anywhere in its zone
+JUMP_PROB = 0.1
+# Probability that a proposal rotates a (rotatable) station by 90 degrees
+ROTATE_PROB = 0.1
+
+
+def service_clearance(station):
+    """(front, sides, rear) clearance in inches; front faces south (the aisle)."""
+    return (station.get('service_clearance_front', 0),
+            station.get('service_clearance_sides', 0),
+            station.get('service_clearance_rear', 0))
+
+
+def _zone_box(zone):
+    return [zone['x_start'], zone['y_start'],
+            zone['x_start'] + zone['width'], zone['y_start'] + zone['depth']]
+
+
+class PlacementProblem:
+    """Station/zone geometry and a vectorized layout score.
+
+    A layout state is an (S, 3) array of (x, y, rotated) per station, where
+    x/y is the lower-left footprint corner and rotated is 0 or 1 (90 deg).
+    Only stations without service clearances may rotate, so machines keep
+    their front toward the aisle.
+    """
+
+    def __init__(self, params):
+        zones = params['zones']
+        stations = params['stations']
+        self.ids = [sid for sid, s in stations.items() if s.get('zone') in zones]
+        self.sizes = np.array([station_footprint(stations[sid]) for sid in self.ids],
+                              dtype=float).reshape(-1, 2)
+        front_sides_rear = np.array([service_clearance(stations[sid]) for sid in self.ids],
+                                    dtype=float).reshape(-1, 3)
+        f, s, r = front_sides_rear.T
+        self.env_pad = np.stack([-s, -f, s, r], axis=1)
+        self.rotatable = (front_sides_rear.sum(axis=1) == 0) & (self.sizes[:, 0] != self.sizes[:, 1])
+        self.zone_boxes = np.array([_zone_box(zones[stations[sid]['zone']]) for sid in self.ids],
+                                   dtype=float).reshape(-1, 4)
+
+        # Fixed obstacles: cabinet runs, dust collector, kayak lane
+        obstacles = []
+        for key, run in params.get('cabinetry', {}).items():
+            if key.startswith('cabinet_run_'):
+                obstacles.append([run['x_start'], run['y_start'], run['x_end'], run['y_end']])
+        dc = params.get('infrastructure', {}).get('dust_collector')
+        if dc:
+            obstacles.append([dc['x'], dc['y'], dc['x'] + dc['width'], dc['y'] + dc['depth']])
+        if 'zone_kayak' in zones:
+            obstacles.append(_zone_box(zones['zone_kayak']))
+        self.obstacles = np.array(obstacles, dtype=float).reshape(-1, 4)
+
+        # Room shell = main room + bump-out (disjoint boxes)
+        room = params['room']
+        shell = [[0, 0, room['room_width'], room['room_depth']]]
+        bump = params.get('bump_out', {})
+        if bump.get('enabled'):
+            shell.append([bump['x_start'], bump['y_start'], bump['x_end'], bump['y_end']])
+        self.shell = np.array(shell, dtype=float)
+
+        # Flow legs / adjacencies from the compiled constraints. Each endpoint is
+        # a station index, or a fixed zone box stored after the stations.
+        rules, _ = compile_rules(params)
+        fixed = []
+
+        positions = params.get('station_positions', {})
+
+        def endpoint(entity_id):
+            if entity_id in self.ids:
+                return self.ids.index(entity_id)
+            if entity_id in zones:
+                fixed.append(_zone_box(zones[entity_id]))
+            else:
+                # A placed station this problem does not move stays where it is
+                pos = positions[entity_id]
+                w, d = placed_footprint(stations[entity_id], pos)
+                fixed.append([pos['x'], pos['y'], pos['x'] + w, pos['y'] + d])
+            return len(self.ids) + len(fixed) - 1
+
+        self.flow = []
+        self.adjacent = []
+        for rule in rules:
+            if rule['kind'] == 'flow_order':
+                idx = [endpoint(s) for s in rule['steps']]
+                self.flow.extend(zip(idx[:-1], idx[1:]))
+            elif rule['kind'] == 'adjacent':
+                self.adjacent.append((endpoint(rule['ids'][0]), endpoint(rule['ids'][1]),
+                                      rule['max_gap']))
+        self.fixed_boxes = np.array(fixed, dtype=float).reshape(-1, 4)
+
+    def state_from_positions(self, positions, fallback):
+        """(S, 3) state from station_positions, using fallback rows for missing ids."""
+        state = np.array(fallback, dtype=float)
+        for i, sid in enumerate(self.ids):
+            if sid in positions:
+                pos = positions[sid]
+                state[i] = [pos['x'], pos['y'], pos.get('rotation', 0) % 180 == 90]
+        return state
+
+    def boxes(self, state):
+        """Footprint and clearance-envelope boxes, each (L, S, 4)."""
+        xy = state[..., :2]
+        size = np.where(state[..., 2:3] > 0, self.sizes[:, ::-1], self.sizes)
+        fp = np.concatenate([xy, xy + size], axis=-1)
+        return fp, fp + self.env_pad
+
+    def _endpoint_boxes(self, fp):
+        n = fp.shape[0]
+        return np.concatenate([fp, np.broadcast_to(self.fixed_boxes, (n,) + self.fixed_boxes.shape)],
+                              axis=1)
+
+    def _travel(self, boxes):
+        pts = (boxes[..., :2] + boxes[..., 2:]) / 2
+        travel = np.zeros(boxes.shape[0])
+        for a, b in self.flow:
+            travel += np.abs(pts[:, a] - pts[:, b]).sum(-1)  # aisles are orthogonal
+        return travel
+
+    def score(self, state):
+        """Score L candidate layouts given an (L, S, 3) state; lower is better."""
+        fp, env = self.boxes(state)
+        area = self.sizes[:, 0] * self.sizes[:, 1]
+
+        # Hard: footprint outside its zone
+        outside = area - overlap_area(fp, self.zone_boxes)
+        # Hard: footprint inside another station's envelope
+        pair = overlap_area(fp[:, :, None, :], env[:, None, :, :])
+        idx = np.arange(len(self.ids))
+        pair[:, idx, idx] = 0
+        # Hard: footprint on fixed obstacles
+        blocked = overlap_area(fp[:, :, None, :], self.obstacles).sum(axis=-1)
+        # Hard: clearance envelope leaving the room shell
+        env_area = (env[..., 2] - env[..., 0]) * (env[..., 3] - env[..., 1])
+        escaped = env_area - overlap_area(env[:, :, None, :], self.shell).sum(axis=-1)
+        hard = outside.sum(-1) + pair.sum((-1, -2)) + blocked.sum(-1) + escaped.sum(-1)
+
+        # Soft: flow travel + adjacency gaps beyond the allowed maximum
+        boxes = self._endpoint_boxes(fp)
+        soft = self._travel(boxes)
+        for a, b, max_gap in self.adjacent:
+            soft += np.clip(box_gap(boxes[:, a], boxes[:, b]) - max_gap, 0, None) * 10
+        return HARD_WEIGHT * hard + soft
+
+    def flow_distance(self, state):
+        """Material-flow travel distance (inches) for a single (S, 3) state."""
+        fp, _ = self.boxes(state[None])
+        return float(self._travel(self._endpoint_boxes(fp))[0])
+
+    def random_in_zone(self, rng, which, rotated):
+        """Uniform lower-left corners keeping footprints inside their zones."""
+        zb = self.zone_boxes[which]
+        size = np.where(rotated[:, None] > 0, self.sizes[which, ::-1], self.sizes[which])
+        lo = zb[:, :2]
+        hi = np.maximum(lo, zb[:, 2:] - size)
+        return np.round(lo + rng.random(lo.shape) * (hi - lo))
+
+
+def anneal(problem, state0, seed, budget, batch=64):
+    """One simulated-annealing chain; returns (best_score, best_state)."""
+    rng = np.random.default_rng(seed)
+    n = len(problem.ids)
+    cur = state0.copy()
+    cur_s = problem.score(cur[None])[0]
+    best, best_s = cur.copy(), cur_s
+    t0_temp = max(cur_s * 0.02, 10.0)
+    start = time.perf_counter()
+    rows = np.arange(batch)
+
+    while True:
+        frac = (time.perf_counter() - start) / budget
+        if frac >= 1:
+            break
+        temp = t0_temp * (1 - frac) + 1e-3
+        step = max(1.0, 36.0 * (1 - frac))
+
+        # Each candidate perturbs one station: nudge, rotate, or jump in-zone
+        which = rng.integers(n, size=batch)
+        cand = np.repeat(cur[None], batch, axis=0)
+        cand[rows, which, :2] += np.round(rng.normal(0, step, (batch, 2)))
+        flip = (rng.random(batch) < ROTATE_PROB) & problem.rotatable[which]
+        cand[rows[flip], which[flip], 2] = 1 - cand[rows[flip], which[flip], 2]
+        jump = rng.random(batch) < JUMP_PROB
+        if jump.any():
+            cand[rows[jump], which[jump], :2] = problem.random_in_zone(
+                rng, which[jump], cand[rows[jump], which[jump], 2])
+
+        scores = problem.score(cand)
+        k = int(np.argmin(scores))
+        delta = scores[k] - cur_s
+        if delta <= 0 or rng.random() < math.exp(-delta / temp):
+            cur, cur_s = cand[k], scores[k]
+            if cur_s < best_s:
+                best, best_s = cur.copy(), cur_s
+    return best_s, best
+
+
+def _chain(args):
+    params, state0, seed, budget = args
+    return anneal(PlacementProblem(params), state0, seed, budget)
+
+
+def optimize(params, time_budget=5.0, jobs=None, seed=0):
+    """Place stations; returns ({station_id: {'x', 'y'[, 'rotation']}}, score).
+
+    Runs one annealing chain per worker, all sharing the same wall-clock
+    budget, seeded from the current station_positions when present.
+    """
+    problem = PlacementProblem(params)
+    n = len(problem.ids)
+    rng = np.random.default_rng(seed)
+    fallback = np.zeros((n, 3))
+    fallback[:, :2] = problem.random_in_zone(rng, np.arange(n), fallback[:, 2])
+    state0 = problem.state_from_positions(params.get('station_positions', {}), fallback)
+
+    jobs = jobs or os.cpu_count() or 1
+    tasks = [(params, state0, seed + i, time_budget) for i in range(jobs)]
+    if jobs == 1:
+        results = [_chain(tasks[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_chain, tasks))
+    score, state = min(results, key=lambda r: r[0])
+
+    placed = {}
+    for sid, (x, y, rotated) in zip(problem.ids, state):
+        placed[sid] = {'x': int(x), 'y': int(y)}
+        if rotated:
+            placed[sid]['rotation'] = 90
+    return placed, float(score)
+
+
+def apply_positions(params, placed):
+    """Merge optimized positions into params['station_positions'] (in place)."""
+    positions = params.setdefault('station_positions', {})
+    positions.update(placed)
+    return params
+
+
+def save_positions(path, placed):
+    """Rewrite only the station_positions block of a parameters file.
+
+    Optimized stations get new x/y (and rotation) inside their existing
+    entries, so other keys such as facing are kept; stations that were not
+    optimized and the _notes entries stay as they were. The rest of the
+    hand-formatted JSON is left byte-for-byte untouched.
+    """
+    text = open(path, 'r').read()
+    m = re.search(r'\n  "station_positions": \{\n(.*?)\n  \}', text, re.DOTALL)
+    if not m:
+        raise ValueError(f"{path} has no station_positions section")
+    positions = json.loads(text)['station_positions']
+    for sid, pos in placed.items():
+        entry = positions.setdefault(sid, {})
+        entry['x'], entry['y'] = pos['x'], pos['y']
+        turned = pos.get('rotation', 0) % 180 == 90
+        if (entry.get('rotation', 0) % 180 == 90) != turned:
+            if turned:
+                entry['rotation'] = 90
+            else:
+                entry.pop('rotation')
+
+    def value(v):
+        if isinstance(v, dict):
+            return '{ ' + ', '.join(f'{json.dumps(k)}: {json.dumps(x)}' for k, x in v.items()) + ' }'
+        return json.dumps(v, ensure_ascii=False)
+
+    block = ',\n'.join(f'    {json.dumps(sid)}: {value(v)}' for sid, v in positions.items())
+    text = text[:m.start(1)] + block + text[m.end(1):]
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def main(argv=None):
+    """Optimize station placement and optionally persist / render it."""
+    parser = argparse.ArgumentParser(description="Optimize station placement.")
+    parser.add_argument('params', nargs='?', default=PARAMS_FILE, help='parameters file')
+    parser.add_argument('-t', '--time-budget', type=float, default=5.0,
+                        help='wall-clock seconds per chain (default: %(default)s)')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='parallel annealing chains (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--write', action='store_true',
+                        help='write positions back to station_positions in the parameters file')
+    parser.add_argument('--force', action='store_true',
+                        help='with --write, save even if hard constraints are still violated')
+    parser.add_argument('--render', action='store_true',
+                        help='render the layout views with the new positions')
+    args = parser.parse_args(argv)
+
+    from routing import flow_distance  # routing imports this module (via collisions)
+
+    params = load_parameters(args.params)
+    problem = PlacementProblem(params)
+    positions = params.get('station_positions', {})
+    if all(sid in positions for sid in problem.ids):
+        state = problem.state_from_positions(positions, np.zeros((len(problem.ids), 3)))
+        print(f"Current: score {problem.score(state[None])[0]:.0f}, "
+              f"flow {problem.flow_distance(state):.0f}\" ({flow_distance(params):.0f}\" routed)")
+
+    placed, score = optimize(params, args.time_budget, args.jobs, args.seed)
+    state = problem.state_from_positions(placed, np.zeros((len(problem.ids), 3)))
+    print(f"Optimized: score {score:.0f}, flow {problem.flow_distance(state):.0f}\"")
+    for sid, pos in placed.items():
+        rot = ' rotated' if pos.get('rotation') else ''
+        print(f"  {sid:28s} x={pos['x']:4d} y={pos['y']:4d}{rot}")
+
+    apply_positions(params, placed)
+    print(f"Routed flow: {flow_distance(params):.0f}\"")
+    violations, _ = validate(params)
+    for v in violations:
+        print(f"  still violated: {v['constraint']} ({', '.join(v['ids'])})")
+
+    # Stored positions should be valid ones: a layout that still breaks hard
+    # rules is only written on request
+    if args.write and violations and not args.force:
+        print(f"Not writing {args.params}: {len(violations)} hard constraint(s) still violated "
+              f"(raise --time-budget, or --force to write anyway)")
+    elif args.write:
+        save_positions(args.params, placed)
+        print(f"Wrote station_positions to {args.params}")
+    if args.render:
+        import render_layout  # matplotlib only when rendering
+        for out_file, status in render_layout.render_all(params):
+            print(f"Saved: {out_file}")
+    return 1 if violations else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
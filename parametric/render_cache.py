@@ -0,0 +1,122 @@
+"""
+Content-addressed render cache for the parametric layout views.
+Each view is keyed on a hash of only the parameter subsections it reads, so
+edits to unrelated sections (hvac, _meta, ...) leave its key unchanged.
+Rendered bytes are stored on disk with least-recently-used eviction.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).parent / ".cache" / "renders"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+INDEX_FILE = "outputs.json"
+
+
+def get_path(params, path, default=None):
+    """Look up a dotted-path key (e.g. 'infrastructure.soft_dust_barrier')."""
+    node = params
+    for key in path.split('.'):
+        if not isinstance(node, dict) or key not in node:
+            return default
+        node = node[key]
+    return node
+
+
+def view_key(view, params, inputs, extra=None):
+    """Hash the view name, its input subsections and any renderer settings."""
+    payload = {
+        'view': view,
+        'inputs': {path: get_path(params, path) for path in inputs},
+        'extra': extra,
+    }
+    blob = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """On-disk byte store keyed by view hash, bounded by total size (LRU)."""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def _entry(self, key):
+        return self.cache_dir / key[:2] / f"{key}.bin"
+
+    def get(self, key):
+        """Return cached bytes for key (refreshing its LRU stamp) or None."""
+        entry = self._entry(key)
+        try:
+            data = entry.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(entry)  # mtime is the LRU clock; atime is often disabled
+        return data
+
+    def put(self, key, data):
+        """Store bytes atomically, then evict old entries over the size budget."""
+        entry = self._entry(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, entry)
+        self.evict()
+
+    def evict(self):
+        """Delete least-recently-used entries until under max_bytes."""
+        entries = []
+        total = 0
+        for entry in self.cache_dir.glob("*/*.bin"):
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue  # evicted concurrently by another worker
+            entries.append((st.st_mtime_ns, st.st_size, entry))
+            total += st.st_size
+        entries.sort()
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                entry.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    # Output index: which key was last written to which export file.
+    # Lets callers skip the render *and* the write when nothing changed.
+
+    def _load_index(self):
+        try:
+            with open(self.cache_dir / INDEX_FILE, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def is_current(self, out_file, key):
+        """True if out_file is untouched since we last wrote key to it."""
+        record = self._load_index().get(str(Path(out_file).resolve()))
+        if not record or record['key'] != key:
+            return False
+        try:
+            st = Path(out_file).stat()
+        except FileNotFoundError:
+            return False
+        return [st.st_size, st.st_mtime_ns] == [record['size'], record['mtime_ns']]
+
+    def record_outputs(self, written):
+        """Remember the key for each freshly written (out_file, key) pair."""
+        index = self._load_index()
+        for out_file, key in written:
+            st = Path(out_file).stat()
+            index[str(Path(out_file).resolve())] = {
+                'key': key, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+            }
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_dir / f"{INDEX_FILE}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(index, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.cache_dir / INDEX_FILE)
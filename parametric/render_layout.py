@@ -4,111 +4,103 @@ Parametric 2D floor plan renderer for Craft Room.
 Reads dimensions from data/parameters.json and generates layout visualization.
 """
 
-import json
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import Rectangle, FancyBboxPatch, FancyArrowPatch
+import argparse
+import hashlib
+import io
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import matplotlib
+import numpy as np
+from matplotlib.collections import PolyCollection
 from pathlib import Path
 
+from airflow import simulate, velocity, zone_exposure
+from collisions import CONFLICT_KINDS, CollisionSet, conflict_report, find_conflicts
+from ducts import DuctNetwork, gate_report
+from electrical import ElectricalPlan
+from inventory import load_inventory
+from labels import (STATION_SIZES, ZONE_SIZES, LabelPlacer, draw_callouts, draw_labels,
+                    plan_bounds, station_texts, wrap)
+from model import as_layout, load_layout
+from occupancy import OccupancyGrid, clearance_report, paths
+from render_cache import CACHE_DIR, DEFAULT_MAX_BYTES, RenderCache, view_key
+from routing import FlowRouter
+from scene import (FORMATS, Arrow, Background, Boxes, Label, box_collection, export,
+                   room_frame, to_figure)
+import tracing
+from tracing import count, span, traced
+
 # Paths
 SCRIPT_DIR = Path(__file__).parent
 PARAMS_FILE = SCRIPT_DIR / "data" / "parameters.json"
+INVENTORY_FILE = SCRIPT_DIR / "data" / "station_inventory.csv"
 OUTPUT_DIR = SCRIPT_DIR / "exports"
 
+# Flow step labels by stage id (others print the id)
+FLOW_LABELS = {
+    'zone_receiving': 'RECEIVE',
+    'breakdown_table': 'BREAKDOWN',
+    'cnc_bay': 'CNC',
+    'zone_fume': 'FINISH',
+    'zone_packship': 'SHIP',
+}
 
-def load_parameters():
-    """Load parameters from JSON file."""
-    with open(PARAMS_FILE, 'r') as f:
-        return json.load(f)
+# Above this many zones/stations, per-item labels are skipped (unreadable and
+# they dominate draw time); the geometry is still drawn.
+MAX_LABELS = 500
 
 
-def setup_figure(params, title):
-    """Create figure with room outline from parameters."""
-    room = params['room']
-    bump = params.get('bump_out', {})
+@traced()
+def load_parameters(path=PARAMS_FILE):
+    """Load and validate parameters from JSON file (via the compiled cache)."""
+    return load_layout(path).params
 
-    room_w = room['room_width']
-    room_d = room['room_depth']
+
+def room_scene(params, title):
+    """Scene with grid, room outline, bump-out, dimensions and wall labels."""
+    layout = as_layout(params)
+    room, bump = layout.room, layout.bump
+    room_w, room_d = room.width, room.depth
 
     # Figure size proportional to room (landscape orientation for wide rooms)
     fig_w = 16
-    aspect = room_d / room_w
-    fig_h = max(8, fig_w * aspect * 1.1)  # Ensure minimum height for labels
-    fig, ax = plt.subplots(1, 1, figsize=(fig_w, fig_h))
-
-    ax.set_facecolor('white')
-
-    # Grid (4' = 48")
-    for x in range(0, room_w + 1, 48):
-        ax.axvline(x, color='#e8e8e8', linewidth=0.5, zorder=0)
-        if 0 < x < room_w:
-            ax.text(x, -12, f"{x//12}'", ha='center', fontsize=7, color='#999')
-    for y in range(0, room_d + 1, 48):
-        ax.axhline(y, color='#e8e8e8', linewidth=0.5, zorder=0)
-        if 0 < y < room_d:
-            ax.text(-12, y, f"{y//12}'", ha='right', va='center', fontsize=7, color='#999')
-
-    # Main room outline
-    ax.plot([0, room_w], [0, 0], 'k--', linewidth=2.5)  # South - OPEN (dashed)
-    ax.plot([room_w, room_w], [0, room_d], 'k-', linewidth=3)  # East
-    ax.plot([room_w, 0], [room_d, room_d], 'k-', linewidth=3)  # North
-    ax.plot([0, 0], [room_d, 0], 'k-', linewidth=3)  # West
-
-    # Bump-out outline (if enabled)
-    if bump.get('enabled'):
-        bx0 = bump['x_start']
-        bx1 = bump['x_end']
-        by0 = bump['y_start']
-        by1 = bump['y_end']
-        # Draw bump-out extension
-        ax.plot([bx0, bx1], [by0, by0], 'k-', linewidth=3)  # Bottom of bump
-        ax.plot([bx1, bx1], [by0, by1], 'k-', linewidth=3)  # Right side
-        ax.plot([bx1, bx0], [by1, by1], 'k-', linewidth=3)  # Top
-        # Opening into main room (remove wall segment)
-        ax.plot([bx0, bx0], [by0, by1], 'k--', linewidth=1, alpha=0.3)  # Opening
-
-    # Axis setup
-    x_max = max(room_w, bump.get('x_end', room_w)) + 60
-    ax.set_xlim(-40, x_max)
-    ax.set_ylim(-50, room_d + 70)
-    ax.set_aspect('equal')
-    ax.set_xlabel('Inches', fontsize=10)
-    ax.set_ylabel('Inches', fontsize=10)
-    ax.set_title(title, fontsize=14, fontweight='bold', pad=15)
-
-    # Dimension annotations
-    ax.annotate('', xy=(room_w, -25), xytext=(0, -25),
-                arrowprops=dict(arrowstyle='<->', color='#666', lw=1.5))
-    ax.text(room_w/2, -35, f'{room_w}" ({room["room_width_ft"]}\'-0")',
-            ha='center', fontsize=10, color='#444')
-
-    ax.annotate('', xy=(-25, room_d), xytext=(-25, 0),
-                arrowprops=dict(arrowstyle='<->', color='#666', lw=1.5))
-    ax.text(-30, room_d/2, f'{room_d}" ({room["room_depth_ft"]}\'-0")',
-            ha='center', va='center', fontsize=10, color='#444', rotation=90)
+    fig_h = max(8, fig_w * room_d / room_w * 1.1)  # Ensure minimum height for labels
+    scene = room_frame(title, room_w, room_d,
+                       xlim=(-40, max(room_w, bump.x1 if bump else room_w) + 60),
+                       ylim=(-50, room_d + 70), figsize=(fig_w, fig_h),
+                       bump=bump.box if bump else None,
+                       dims=(f'{room_w:g}" ({room.width_ft:g}\'-0")',
+                             f'{room_d:g}" ({room.depth_ft:g}\'-0")'))
 
     # Wall labels
-    ax.text(room_w/2, 15, 'OPEN EDGE (south - entry)',
-            ha='center', fontsize=9, color='#666', style='italic')
-    ax.text(room_w/2, room_d + 15, 'BACK WALL (north - exterior)',
-            ha='center', fontsize=9, color='#666', style='italic')
-
-    return fig, ax
+    scene.text('NOTES', room_w/2, 15, 'OPEN EDGE (south - entry)',
+               ha='center', fontsize=9, color='#666', style='italic')
+    scene.text('NOTES', room_w/2, room_d + 15, 'BACK WALL (north - exterior)',
+               ha='center', fontsize=9, color='#666', style='italic')
+    scene.background = len(scene.items)
+    return scene
 
 
-def render_zones(params):
-    """Render zone allocation diagram from parameters."""
-    room = params['room']
-    bump = params.get('bump_out', {})
-    title = f'CRAFT ROOM - ZONE LAYOUT ({room["room_width_ft"]}\' x {room["room_depth_ft"]}\''
-    if bump.get('enabled'):
-        title += f' + {bump["width_ft"]}\'x{bump["depth_ft"]}\' Bump-Out)'
+@traced()
+def setup_figure(params, title):
+    """Create figure with room outline from parameters."""
+    return to_figure(room_scene(params, title))
+
+
+@traced()
+def zones_scene(params):
+    """Zone allocation diagram from parameters."""
+    layout = as_layout(params)
+    params = layout.params
+    room, bump, zones = layout.room, layout.bump, layout.zones
+    title = f'CRAFT ROOM - ZONE LAYOUT ({room.width_ft:g}\' x {room.depth_ft:g}\''
+    if bump:
+        title += f' + {bump.width_ft:g}\'x{bump.depth_ft:g}\' Bump-Out)'
     else:
         title += ')'
-    fig, ax = setup_figure(params, title)
-
-    zones = params['zones']
-    bump = params.get('bump_out', {})
+    scene = room_scene(layout, title)
 
     # Zone colors
     colors = {
@@ -119,51 +111,11 @@ def render_zones(params):
         'infrastructure': '#795548',  # Brown
     }
 
-    # Draw each zone
-    for zone_id, zone in zones.items():
-        x = zone['x_start']
-        y = zone['y_start']
-        w = zone['width']
-        d = zone['depth']
-        cat = zone.get('category', 'shared')
-        color = colors.get(cat, '#999999')
-
-        # Special handling for bump-out zone
-        alpha = 0.35 if zone.get('in_bump_out') else 0.25
-
-        rect = Rectangle((x, y), w, d,
-                         facecolor=color, alpha=alpha,
-                         edgecolor=color, linewidth=2)
-        ax.add_patch(rect)
-
-        # Zone label
-        cx, cy = x + w/2, y + d/2
-        name = zone['name']
-
-        # Adjust text for narrow/tall zones
-        fontsize = 8 if w < 50 or d < 50 else 9
-
-        if w < 40:  # Vertical text for narrow zones
-            ax.text(cx, cy, name, ha='center', va='center',
-                   fontsize=fontsize, fontweight='bold', rotation=90)
-        else:
-            # Split long names
-            if len(name) > 20:
-                parts = name.split(' ', 2)
-                ax.text(cx, cy + 8, ' '.join(parts[:2]), ha='center', va='center',
-                       fontsize=fontsize, fontweight='bold')
-                if len(parts) > 2:
-                    ax.text(cx, cy - 8, parts[2], ha='center', va='center',
-                           fontsize=fontsize-1)
-            else:
-                ax.text(cx, cy, name, ha='center', va='center',
-                       fontsize=fontsize, fontweight='bold')
-
-        # Area label
-        area = zone.get('area_sqft', 0)
-        if area and d > 30:
-            ax.text(cx, y + 12, f'{area} sq ft', ha='center', va='center',
-                   fontsize=7, color='#666', style='italic')
+    # Zone rectangles, one batch (bump-out zones drawn more opaque)
+    boxes = zones.xywh
+    scene.boxes('ZONES', boxes,
+                colors=[colors.get(c, '#999999') for c in zones.categories],
+                alpha=np.where(zones.in_bump_out, 0.35, 0.25), linewidth=2)
 
     # Draw soft dust barrier
     barrier = params.get('infrastructure', {}).get('soft_dust_barrier', {})
@@ -171,20 +123,38 @@ def render_zones(params):
         bx = barrier.get('x', 84)
         by0 = barrier.get('y_start', 72)
         by1 = barrier.get('y_end', 300)
-        ax.plot([bx, bx], [by0, by1], color='#9C27B0', linewidth=2,
-               linestyle=':', alpha=0.7)
-        ax.text(bx, (by0+by1)/2, 'DUST\nBARRIER', ha='center', va='center',
-               fontsize=7, color='#7B1FA2', rotation=90, alpha=0.8)
+        scene.line('DUST_BARRIER', [bx, bx], [by0, by1], color='#9C27B0', linewidth=2,
+                   linestyle=':', alpha=0.7)
+        scene.text('DUST_BARRIER', bx, (by0+by1)/2, 'DUST\nBARRIER', ha='center', va='center',
+                   fontsize=7, color='#7B1FA2', rotation=90, alpha=0.8)
+
+    # Zone names (wrapped or turned when narrow, numbered when nothing fits),
+    # then areas along the bottom edge where there is room left
+    if len(zones) <= MAX_LABELS:
+        placer = LabelPlacer(scene.text_points_per_inch, plan_bounds(layout))
+        placer.reserve_scene(scene)
+        if barrier:
+            placer.reserve_segment(bx, by0, bx, by1)
+        names = placer.place(zones.boxes, [(name, wrap(name)) for name in zones.names],
+                             sizes=ZONE_SIZES, weight='bold', leaders=False)
+        draw_labels(scene, 'ZONES', names, fontweight='bold')
+        sized = [k for k, area in enumerate(zones.area_sqft) if area]
+        areas = placer.place(zones.boxes[sized], [f'{zones.area_sqft[k]} sq ft' for k in sized],
+                             sizes=(7,), style='italic', anchor='bottom', leaders=False,
+                             callouts=False)
+        draw_labels(scene, 'ZONES', areas, color='#666', style='italic')
+        draw_callouts(scene, 'ZONES', placer, plan_bounds(layout)[2] + 6, room.depth,
+                      fontweight='bold')
 
     # Bump-out label
-    if bump.get('enabled'):
-        bx = (bump['x_start'] + bump['x_end']) / 2
-        by = bump['y_end'] + 8
-        ax.text(bx, by, f"{bump['width_ft']}' × {bump['depth_ft']}' BUMP-OUT",
-               ha='center', fontsize=8, color='#666', style='italic')
+    if bump:
+        bx = (bump.x0 + bump.x1) / 2
+        by = bump.y1 + 8
+        scene.text('BUMP_OUT', bx, by, f"{bump.width_ft:g}' × {bump.depth_ft:g}' BUMP-OUT",
+                   ha='center', fontsize=8, color='#666', style='italic')
 
     # Legend
-    legend_y = params['room']['room_depth'] + 45
+    legend_y = room.depth + 45
     legend_items = [
         ('Clean Zone', colors['clean']),
         ('Dusty Zone', colors['dusty']),
@@ -192,203 +162,631 @@ def render_zones(params):
         ('Shared', colors['shared']),
         ('Infrastructure', colors['infrastructure']),
     ]
+    scene.boxes('LEGEND', [(10 + i * 38, legend_y, 12, 8) for i in range(len(legend_items))],
+                colors=[color for _, color in legend_items], alpha=0.3, linewidth=1.5)
     for i, (label, color) in enumerate(legend_items):
-        x = 10 + i * 38
-        rect = Rectangle((x, legend_y), 12, 8, facecolor=color, alpha=0.3,
-                         edgecolor=color, linewidth=1.5)
-        ax.add_patch(rect)
-        ax.text(x + 6, legend_y - 8, label, ha='center', va='top',
-               fontsize=6, rotation=45)
+        scene.text('LEGEND', 10 + i * 38 + 6, legend_y - 8, label, ha='center', va='top',
+                   fontsize=6, rotation=45)
 
     # Total area
-    total_sqft = params['bump_out'].get('total_room_sqft',
-                 params['room'].get('main_area_sqft', 0))
-    ax.text(params['room']['room_width'] - 10, legend_y + 4,
-           f'Total: {total_sqft} sq ft', ha='right', fontsize=9,
-           fontweight='bold', color='#333')
-
-    return fig, ax
+    scene.text('LEGEND', room.width - 10, legend_y + 4,
+               f'Total: {room.total_sqft:g} sq ft', ha='right', fontsize=9,
+               fontweight='bold', color='#333')
 
+    return scene
 
-def render_stations(params):
-    """Render station placement diagram."""
-    room = params['room']
-    fig, ax = setup_figure(params, f'CRAFT ROOM - STATION LAYOUT ({room["room_width_ft"]}\' x {room["room_depth_ft"]}\')')
 
-    zones = params['zones']
-    stations = params['stations']
+@traced()
+def stations_scene(params):
+    """Station placement diagram."""
+    layout = as_layout(params)
+    params = layout.params
+    room, zones, stations = layout.room, layout.zones, layout.stations
+    scene = room_scene(layout, f'CRAFT ROOM - STATION LAYOUT ({room.width_ft:g}\' x {room.depth_ft:g}\')')
 
     # Draw zones as ghost background
-    for zone_id, zone in zones.items():
-        rect = Rectangle((zone['x_start'], zone['y_start']),
-                         zone['width'], zone['depth'],
-                         facecolor='#f5f5f5', alpha=0.5,
-                         edgecolor='#ddd', linewidth=1)
-        ax.add_patch(rect)
-
-    # Station placements for 30'x15' layout (wide orientation)
-    station_positions = {
-        # Clean zone stations (left/west side)
-        'melissa_workbench_phenolic': {'x': 24, 'y': 100},
-        'melissa_pc_station': {'x': 24, 'y': 66},
-        'electronics_bench': {'x': 60, 'y': 120},
-        'printer_bay_3d': {'x': 84, 'y': 100},
-        'cricut_station': {'x': 84, 'y': 66},
-
-        # Dusty zone stations (center-right)
-        'breakdown_table': {'x': 168, 'y': 6},
-        'cnc_bay': {'x': 180, 'y': 60},
-        'sanding_table_downdraft': {'x': 260, 'y': 100},
-
-        # Receiving zone (front left)
-        'vertical_sheet_rack': {'x': 6, 'y': 6},
-        'lumber_rack': {'x': 6, 'y': 24},
-
-        # Pack/ship (front right)
-        'pack_ship_bench': {'x': 312, 'y': 6},
-
-        # Fume zone (bump-out, upper right)
-        'dirty_vent_table': {'x': 276, 'y': 186},
-    }
+    scene.boxes('ZONES', zones.xywh, facecolor='#f5f5f5', edgecolor='#ddd', alpha=0.5,
+                linewidth=1)
 
-    # Draw stations
-    for station_id, pos in station_positions.items():
-        if station_id not in stations:
-            continue
+    # Station placements (lower-left corners) from data, see station_positions
+    boxes = stations.placed_xywh
+    scene.boxes('STATIONS', boxes, facecolor='#E3F2FD', edgecolor='#1976D2', alpha=0.8,
+                linewidth=1.5)
 
-        s = stations[station_id]
-        x, y = pos['x'], pos['y']
-        w = s.get('width', s.get('machine_width', 30))
-        d = s.get('depth', s.get('machine_depth', 24))
+    # Draw kayak lane indicator (E-W orientation for wide room)
+    if 'zone_kayak' in zones:
+        kx, ky, kw, kd = zones.xywh[zones.index('zone_kayak')]
+        scene.box('CIRCULATION', kx, ky, kw, kd, facecolor='#E8F5E9', alpha=0.3,
+                  edgecolor='#4CAF50', linewidth=2, linestyle='--')
+        scene.text('CIRCULATION', kx + kw/2, ky + kd/2, f'KAYAK LANE - {kw//12:g}\' CLEAR (E-W)',
+                   ha='center', va='center', fontsize=9, color='#2E7D32')
 
-        # Station rectangle
-        rect = Rectangle((x, y), w, d,
-                         facecolor='#E3F2FD', alpha=0.8,
-                         edgecolor='#1976D2', linewidth=1.5)
-        ax.add_patch(rect)
+    # Cabinetry runs
+    back_cab = params['cabinetry']['cabinet_run_back_wall']
+    scene.box('CABINETRY', back_cab['x_start'], back_cab['y_start'],
+              back_cab['length'], back_cab['depth'],
+              facecolor='#795548', alpha=0.3, edgecolor='#5D4037', linewidth=2)
+    scene.text('CABINETRY', back_cab['length']/2, back_cab['y_start'] + 12,
+               'CABINETRY (15\')', ha='center', fontsize=8, color='#4E342E')
+
+    # Station labels, clear of each other and of the text above: inside the
+    # footprint, else beside it with a leader, else a numbered callout
+    if len(boxes) <= MAX_LABELS:
+        placer = LabelPlacer(scene.text_points_per_inch, plan_bounds(layout))
+        placer.reserve_scene(scene)
+        placed = placer.place(np.c_[boxes[:, :2], boxes[:, :2] + boxes[:, 2:]],
+                              station_texts(stations.placed_ids), sizes=STATION_SIZES)
+        draw_labels(scene, 'STATIONS', placed, color='#0D47A1')
+        draw_callouts(scene, 'STATIONS', placer, plan_bounds(layout)[2] + 6, room.depth,
+                      fontsize=5, color='#0D47A1')
+
+    # Service-clearance envelopes and their conflicts (see collisions.py)
+    cset = CollisionSet(layout)
+    _, envelopes = cset.envelopes()
+    scene.boxes('CLEARANCE', np.c_[envelopes[:, :2], envelopes[:, 2:] - envelopes[:, :2]],
+                facecolor='none', edgecolor='#F57C00', linewidth=1, linestyle='--')
+    conflicts = find_conflicts(cset)
+    overlap = conflicts['overlap']
+    colors = np.array(['#D32F2F', '#FF9800'])[conflicts['kind']]
+    scene.boxes('CONFLICTS', np.c_[overlap[:, :2], overlap[:, 2:] - overlap[:, :2]],
+                facecolor=colors, edgecolor=colors, alpha=0.45, linewidth=1)
+    rows = conflict_report(cset, conflicts)
+    counts = ', '.join(f'{sum(r[2] == kind for r in rows)} {kind}' for kind in CONFLICT_KINDS)
+    scene.text('LEGEND', room.width / 2, -46,
+               f'Conflicts: {counts} (red: footprints overlap, orange: inside a service '
+               f'clearance; dashed: clearance envelope)',
+               ha='center', fontsize=8, color='#B71C1C' if rows else '#37474F', style='italic')
+    return scene
+
+
+@traced()
+def flow_scene(params):
+    """Traffic and material flow diagram."""
+    layout = as_layout(params)
+    room, bump, zones = layout.room, layout.bump, layout.zones
+    scene = room_scene(layout, 'CRAFT ROOM - WORKFLOW + EXHAUST')
 
-        # Label
-        label = station_id.replace('_', '\n').replace('phenolic', '').replace('station', '')
-        ax.text(x + w/2, y + d/2, label, ha='center', va='center',
-               fontsize=5, color='#0D47A1')
+    # Ghost zones
+    scene.boxes('ZONES', zones.xywh, facecolor='#f0f0f0', edgecolor='#ccc', alpha=0.3,
+                linewidth=1)
+    # Zone labels
+    if len(zones) <= MAX_LABELS:
+        centers = ((zones.boxes[:, :2] + zones.boxes[:, 2:]) / 2).tolist()
+        for name, (cx, cy) in zip(zones.names, centers):
+            scene.text('ZONES', cx, cy, name.split()[0], ha='center', va='center',
+                       fontsize=9, color='#aaa')
 
-    # Draw kayak lane indicator (E-W orientation for wide room)
-    circ = params['circulation']
-    kayak_len = circ.get('kayak_lane_length_available', 276)
-    kayak_zone = zones.get('zone_kayak', {})
-    if kayak_zone:
-        kx = kayak_zone.get('x_start', 36)
-        ky = kayak_zone.get('y_start', 60)
-        kw = kayak_zone.get('width', kayak_len)
-        kd = kayak_zone.get('depth', 36)
-        ax.add_patch(Rectangle((kx, ky), kw, kd,
-                               facecolor='#E8F5E9', alpha=0.3,
-                               edgecolor='#4CAF50', linewidth=2, linestyle='--'))
-        ax.text(kx + kw/2, ky + kd/2, f'KAYAK LANE - {kw//12}\' CLEAR (E-W)',
-               ha='center', va='center', fontsize=9, color='#2E7D32')
+    # Entry indicator (center of open wall)
+    entry_x = room.width / 2
+    scene.box('CIRCULATION', entry_x - 40, -25, 80, 20, round=True,
+              facecolor='#E3F2FD', edgecolor='#1976D2', linewidth=2)
+    scene.text('CIRCULATION', entry_x, -15, 'ENTRY (30\' open wall)', ha='center', va='center',
+               fontsize=10, fontweight='bold', color='#1565C0')
 
-    # Cabinetry runs
-    cab = params['cabinetry']
-    back_cab = cab['cabinet_run_back_wall']
-    ax.add_patch(Rectangle((back_cab['x_start'], back_cab['y_start']),
-                           back_cab['length'], back_cab['depth'],
-                           facecolor='#795548', alpha=0.3,
-                           edgecolor='#5D4037', linewidth=2))
-    ax.text(back_cab['length']/2, back_cab['y_start'] + 12,
-           'CABINETRY (15\')', ha='center', fontsize=8, color='#4E342E')
+    # Material flow (orange, one-way): routed around stations, see routing.py
+    flow_color = '#FF9800'
+    step_kw = dict(fontsize=9, color='#E65100', fontweight='bold')
+    router = FlowRouter(layout)
+    obstacles = np.array(list(router.grid.obstacles.values()), dtype=float).reshape(-1, 4)
+    scene.boxes('OBSTACLES', np.c_[obstacles[:, :2], obstacles[:, 2:] - obstacles[:, :2]],
+                facecolor='#e0e0e0', edgecolor='#bdbdbd', alpha=0.6, linewidth=1)
+    for k, leg in enumerate(router.route()):
+        pts = leg['points']
+        color = flow_color if leg['status'] == 'ok' else '#D32F2F'
+        scene.lines('FLOW', [pts], color=color, linewidth=3,
+                    linestyle='-' if leg['status'] != 'blocked' else ':')
+        scene.arrow('FLOW', pts[-2], pts[-1], arrowstyle='->', color=color, linewidth=3)
+        label = f"{k + 1}. {FLOW_LABELS.get(leg['to'], leg['to'].upper())}"
+        if leg['status'] != 'blocked':
+            label += f"\n{leg['length'] / 12:.1f} ft"
+        if leg['status'] != 'ok':
+            label += f" ({leg['status']})"
+        scene.text('FLOW', pts[-1][0] + 6, pts[-1][1] + 6, label, **step_kw)
+
+    # Airflow itself is simulated in the airflow view (airflow.py); only the
+    # exhaust is marked here. Exhaust at bump-out (north wall)
+    if bump:
+        ex_x = (bump.x0 + bump.x1) / 2
+        ex_y = bump.y1
+        scene.arrow('AIRFLOW', (ex_x, ex_y - 20), (ex_x, ex_y + 5), color='#9C27B0', linewidth=2)
+        scene.text('AIRFLOW', ex_x, ex_y - 20, 'EXHAUST\n(exterior)', fontsize=9, ha='center',
+                   color='#7B1FA2', fontweight='bold')
 
-    return fig, ax
+    # Legend
+    ly = room.depth + 35
+    scene.line('LEGEND', [20, 60], [ly, ly], color=flow_color, linewidth=3)
+    scene.text('LEGEND', 65, ly, 'Material Flow (one-way)', va='center', fontsize=9)
+
+    scene.text('LEGEND', 180, ly, f"Airflow: see {VIEWS['airflow'][1]}", va='center',
+               fontsize=9, color='#7B1FA2', style='italic')
+
+    return scene
+
+
+@traced()
+def ducts_scene(params):
+    """Dust collection duct routes over the zone plan, with flows per drop."""
+    layout = as_layout(params)
+    scene = zones_scene(layout)
+    scene.title = 'CRAFT ROOM - DUST COLLECTION DUCTS'
+    network = DuctNetwork(layout)
+    if not len(network):
+        return scene
+    report = gate_report(network)
+    n = len(network)
+    q, starved = report['cfm'], report['starved']
+    alone = 1 << np.arange(n)
+
+    # Collector, 6" trunk and 4" drops (line width ~ duct diameter)
+    dc = layout.params['infrastructure']['dust_collector']
+    scene.box('DUCTS', dc['x'], dc['y'], dc['width'], dc['depth'], facecolor='#455A64',
+              edgecolor='#263238', alpha=0.8, linewidth=1.5)
+    scene.text('DUCTS', dc['x'] + dc['width'] / 2, dc['y'] + dc['depth'] / 2, 'DC',
+               ha='center', va='center', fontsize=8, fontweight='bold', color='white')
+    scene.lines('DUCTS', network.trunk_routes, color='#546E7A', linewidth=5)
+    scene.lines('DUCTS', network.drop_routes, color='#78909C', linewidth=3)
+
+    # Blast gates and flow labels: alone / all gates open, red if all-open starves it
+    for i, (x, y) in enumerate(network.ports):
+        color = '#C62828' if starved[-1, i] or starved[alone[i], i] else '#263238'
+        scene.box('DUCTS', x - 4, y - 4, 8, 8, facecolor=color, edgecolor='white', linewidth=1)
+        scene.text('DUCTS', x + 7, y - 6,
+                   f'{q[alone[i], i]:.0f} / {q[-1, i]:.0f} CFM\n(need {network.required[i]:.0f})',
+                   fontsize=7, color=color, va='top')
+
+    starving = int(starved.any(axis=1).sum())
+    scene.text('LEGEND', layout.room.width / 2, -40,
+               f'{network.fan_name}: CFM with gate open alone / all {n} open. '
+               f'{starving} of {2 ** n} gate configurations starve a tool.',
+               ha='center', fontsize=8, color='#37474F', style='italic')
+    return scene
+
+
+@traced()
+def electrical_scene(params):
+    """Receptacles, cords and circuit assignment from the inventory loads."""
+    layout = as_layout(params)
+    params = layout.params
+    room, zones, stations = layout.room, layout.zones, layout.stations
+    scene = room_scene(layout, f'CRAFT ROOM - ELECTRICAL ({room.width_ft:g}\' x {room.depth_ft:g}\')')
+    plan = ElectricalPlan(layout, load_inventory(INVENTORY_FILE))
+
+    scene.boxes('ZONES', zones.xywh, facecolor='#f5f5f5', edgecolor='#ddd', alpha=0.5,
+                linewidth=1)
+    scene.boxes('STATIONS', stations.placed_xywh, facecolor='#ECEFF1', edgecolor='#90A4AE',
+                linewidth=1)
+    runs = [(r['x_start'], r['y_start'], r['x_end'] - r['x_start'], r['y_end'] - r['y_start'])
+            for key, r in params.get('cabinetry', {}).items() if key.startswith('cabinet_run_')]
+    scene.boxes('CABINETRY', runs, facecolor='#795548', alpha=0.2, edgecolor='#5D4037',
+                linewidth=1.5)
+
+    # Cords from placed stations to the cabinetry receptacle they use
+    n_cab = plan.outlet_kind.count('cabinet')
+    station = plan.table.station_row[plan.rows]
+    corded = np.flatnonzero((plan.plug >= 0) & (plan.plug < n_cab) & (station >= 0))
+    cords = [(stations.xy[station[k]] + stations.extent[station[k]] / 2, plan.outlets[plan.plug[k]])
+             for k in corded if stations.placed[station[k]]]
+    scene.lines('ELECTRICAL', cords, color='#9E9E9E', linewidth=0.8, linestyle='--')
+
+    # Receptacles, colored by kind, labelled with the circuits they carry
+    colors = {'cabinet': '#FFC107', 'drop': '#FFD54F', '240V': '#E53935', 'IG': '#FB8C00',
+              'GFCI': '#1E88E5'}
+    size = 6
+    xywh = np.c_[plan.outlets - size / 2, np.full((len(plan.outlets), 2), size)]
+    scene.boxes('ELECTRICAL', xywh, colors=[colors[k] for k in plan.outlet_kind], alpha=1,
+                edgecolor='#333', linewidth=0.5, zorder=4)
+    names = plan.circuit_names()
+    if len(plan.outlets) <= MAX_LABELS:
+        for i, (x, y) in enumerate(plan.outlets.tolist()):
+            circuits = sorted({names[c] for c in plan.circuit[plan.plug == i]})
+            if circuits:
+                scene.text('ELECTRICAL', x, y - size, '\n'.join(circuits), ha='center', va='top',
+                           fontsize=5, color='#333', zorder=5)
+
+    # Circuits needed vs planned per zone
+    problems = plan.findings()
+    summary = '   '.join(f'{zone} {need}/{planned}'
+                         for zone, (need, planned) in plan.zone_summary().items())
+    scene.text('LEGEND', room.width / 2, -46, f'Circuits needed/planned: {summary}',
+               ha='center', fontsize=8, color='#C62828' if problems else '#2E7D32')
+    legend = [('Cabinetry', 'cabinet'), ('Drop', 'drop'), ('240V', '240V'),
+              ('Isolated ground', 'IG'), ('GFCI', 'GFCI')]
+    ly = room.depth + 35
+    scene.boxes('LEGEND', [(20 + i * 60, ly, 8, 8) for i in range(len(legend))],
+                colors=[colors[k] for _, k in legend], alpha=1, linewidth=0.5)
+    for i, (label, _) in enumerate(legend):
+        scene.text('LEGEND', 32 + i * 60, ly + 4, label, va='center', fontsize=8)
+    return scene
+
+
+@traced()
+def render_zones(params):
+    """Render zone allocation diagram from parameters."""
+    return to_figure(zones_scene(params))
+
+
+@traced()
+def render_stations(params):
+    """Render station placement diagram."""
+    return to_figure(stations_scene(params))
 
 
+@traced()
 def render_flow(params):
     """Render traffic and material flow diagram."""
-    fig, ax = setup_figure(params, 'CRAFT ROOM - WORKFLOW + AIRFLOW')
-
-    zones = params['zones']
-    room = params['room']
-    bump = params.get('bump_out', {})
+    return to_figure(flow_scene(params))
+
+
+@traced()
+def render_ducts(params):
+    """Render dust collection duct routes and drop flows."""
+    return to_figure(ducts_scene(params))
+
+
+@traced()
+def render_electrical(params):
+    """Render receptacles and circuit assignment."""
+    return to_figure(electrical_scene(params))
+
+
+@traced()
+def render_clearance(params):
+    """Render clear-width heatmap from the occupancy grid."""
+    layout = as_layout(params)
+    params = layout.params
+    room, circ = layout.room, layout.circulation
+    fig, ax = setup_figure(layout, f'CRAFT ROOM - CLEARANCE ({room.width_ft:g}\' x {room.depth_ft:g}\')')
+    xlim, ylim = ax.get_xlim(), ax.get_ylim()
+
+    grid = OccupancyGrid(params)
+    width = grid.clear_width()
+    floor = grid.room_mask & ~grid.blocked()
+    extent = (grid.x0, grid.x0 + grid.nx * grid.res, grid.y0, grid.y0 + grid.ny * grid.res)
+    target = circ.get('aisle_min_target', 42)
+    img = ax.imshow(np.ma.masked_where(~floor, width), origin='lower', extent=extent,
+                    cmap='RdYlGn', vmin=0, vmax=target * 1.5, alpha=0.75,
+                    interpolation='nearest', zorder=1)
+
+    # Primary-aisle contour: anything inside it is narrower than required
+    primary = circ.get('aisle_primary_min', 36)
+    xs = grid.x0 + (np.arange(grid.nx) + 0.5) * grid.res
+    ys = grid.y0 + (np.arange(grid.ny) + 0.5) * grid.res
+    ax.contour(xs, ys, np.where(floor, width, 0), levels=[primary],
+               colors='#B71C1C', linewidths=0.8, zorder=2)
+
+    # Obstacles
+    ax.add_collection(box_collection(
+        [(x0, y0, x1 - x0, y1 - y0) for x0, y0, x1, y1 in grid.obstacles.values()],
+        facecolors='#BDBDBD', edgecolors='#616161', alpha=0.9, linewidths=1, zorder=3))
+
+    # Narrowest point on each named path
+    report = clearance_report(params, grid)
+    for k, name in enumerate(paths(params)):
+        r = report[name]
+        x, y = r['at']
+        ax.plot(x, y, 'x', color='#B71C1C', markersize=8, mew=2, zorder=4)
+        ax.text(x + 4, y + 4 + 10 * k, f'{name}: {r["min_width"]:.0f}"', fontsize=8,
+               color='#B71C1C', fontweight='bold', zorder=4)
+
+    ax.set_xlim(xlim)
+    ax.set_ylim(ylim)
+    fig.colorbar(img, ax=ax, shrink=0.6, pad=0.01, label='Clear width (inches)')
+    return fig, ax
 
-    # Ghost zones
-    for zone_id, zone in zones.items():
-        rect = Rectangle((zone['x_start'], zone['y_start']),
-                         zone['width'], zone['depth'],
-                         facecolor='#f0f0f0', alpha=0.3,
-                         edgecolor='#ccc', linewidth=1)
-        ax.add_patch(rect)
-        # Zone label
-        cx = zone['x_start'] + zone['width']/2
-        cy = zone['y_start'] + zone['depth']/2
-        short_name = zone['name'].split()[0]
-        ax.text(cx, cy, short_name, ha='center', va='center',
-               fontsize=9, color='#aaa')
 
-    # Entry indicator (center of open wall)
-    entry_x = room['room_width'] / 2
-    entry = FancyBboxPatch((entry_x - 40, -25), 80, 20,
-                           boxstyle="round,pad=0.02",
-                           facecolor='#E3F2FD', edgecolor='#1976D2', linewidth=2)
-    ax.add_patch(entry)
-    ax.text(entry_x, -15, 'ENTRY (30\' open wall)', ha='center', va='center',
-           fontsize=10, fontweight='bold', color='#1565C0')
-
-    # Material flow arrows (orange, one-way) for 30x15 layout
-    flow_color = '#FF9800'
-    arrow_kw = dict(arrowstyle='->', color=flow_color, lw=3)
-
-    # 1. Entry to Receiving (front left)
-    ax.annotate('', xy=(48, 30), xytext=(140, 0),
-                arrowprops=arrow_kw)
-    ax.text(48, 50, '1. RECEIVE', fontsize=9, color='#E65100', fontweight='bold')
-
-    # 2. Receiving to Breakdown (center)
-    ax.annotate('', xy=(200, 30), xytext=(80, 30),
-                arrowprops=arrow_kw)
-    ax.text(200, 50, '2. BREAKDOWN', fontsize=9, color='#E65100', fontweight='bold')
-
-    # 3. Breakdown to CNC
-    ax.annotate('', xy=(210, 90), xytext=(210, 50),
-                arrowprops=arrow_kw)
-    ax.text(230, 100, '3. CNC', fontsize=9, color='#E65100', fontweight='bold')
-
-    # 4. CNC to Fume Zone (bump-out upper right)
-    ax.annotate('', xy=(300, 200), xytext=(240, 120),
-                arrowprops=arrow_kw)
-    ax.text(290, 210, '4. FINISH', fontsize=9, color='#E65100', fontweight='bold')
-
-    # 5. Fume to Pack/Ship (back to front right)
-    ax.annotate('', xy=(336, 40), xytext=(320, 185),
-                arrowprops=dict(arrowstyle='->', color=flow_color, lw=3,
-                               connectionstyle='arc3,rad=0.2'))
-    ax.text(336, 50, '5. SHIP', fontsize=9, color='#E65100', fontweight='bold')
-
-    # Airflow (west to east, purple dashed)
-    air_y = 130
-    ax.annotate('', xy=(340, air_y), xytext=(20, air_y),
-                arrowprops=dict(arrowstyle='->', color='#9C27B0', lw=2.5, linestyle='dashed'))
-    ax.text(180, air_y + 15, 'AIRFLOW: Clean (W) → Dusty → Fume (E) → EXHAUST',
-           ha='center', fontsize=9, color='#7B1FA2', style='italic')
-
-    # Exhaust at bump-out (north wall)
-    if bump.get('enabled'):
-        ex_x = (bump['x_start'] + bump['x_end']) / 2
-        ex_y = bump['y_end']
-        ax.annotate('EXHAUST\n(exterior)', xy=(ex_x, ex_y + 5), xytext=(ex_x, ex_y - 20),
-                   arrowprops=dict(arrowstyle='->', color='#9C27B0', lw=2),
-                   fontsize=9, ha='center', color='#7B1FA2', fontweight='bold')
+@traced()
+def render_airflow(params):
+    """Render steady dust concentration, fume plume and airflow streamlines."""
+    layout = as_layout(params)
+    room = layout.room
+    fig, ax = setup_figure(layout, f'CRAFT ROOM - AIRFLOW ({room.width_ft:g}\' x {room.depth_ft:g}\')')
+    xlim, ylim = ax.get_xlim(), ax.get_ylim()
+
+    result = simulate(layout)
+    grid = result['grid']
+    extent = (0, grid.nx * grid.res, 0, grid.ny * grid.res)
+    if result['dust'] is not None:
+        # Log scale: concentration spans decades between the tools and the open wall
+        dust = np.log10(np.clip(result['dust']['c'], 1e-3, None))
+        img = ax.imshow(np.ma.masked_invalid(dust), origin='lower', extent=extent,
+                        cmap='YlOrBr', vmin=-2, vmax=0.5, alpha=0.8,
+                        interpolation='bilinear', zorder=1)
+        cbar = fig.colorbar(img, ax=ax, shrink=0.6, pad=0.01, ticks=[-2, -1, 0],
+                            label='Dust relative to well mixed')
+        cbar.ax.set_yticklabels(['0.01', '0.1', '1'])
+    if result['fume'] is not None:
+        ax.contour(grid.xs, grid.ys, np.nan_to_num(result['fume']['c']), levels=[0.1, 0.5, 1.0],
+                   colors='#6A1B9A', linewidths=[0.6, 1.0, 1.6], zorder=2)
+
+    # Streamlines of the potential flow
+    u, v = velocity(grid, result['flow'])
+    step = max(1, int(round(6 / grid.res)))
+    ax.streamplot(grid.xs[::step], grid.ys[::step], np.nan_to_num(u[::step, ::step]),
+                  np.nan_to_num(v[::step, ::step]), density=1.4, color='#1565C0',
+                  linewidth=0.6, arrowsize=0.7, zorder=3)
+
+    # Zone outlines with mean exposure
+    ax.add_collection(box_collection(layout.zones.xywh, facecolors='none',
+                                     edgecolors='#424242', linewidths=0.8, zorder=4))
+    exposure = zone_exposure(result)
+    for zid, (x0, y0, x1, y1) in zip(layout.zones.ids, layout.zones.boxes):
+        row = exposure[zid]
+        parts = [f'{species} {row[species][0]:.2f}' for species in ('dust', 'fume') if row[species]]
+        ax.text((x0 + x1) / 2, y1 - 4, '\n'.join(parts), ha='center', va='top', fontsize=7,
+                color='#212121', zorder=5,
+                bbox=dict(boxstyle='round,pad=0.2', facecolor='white', alpha=0.7, linewidth=0))
+
+    ax.set_xlim(xlim)
+    ax.set_ylim(ylim)
+    return fig, ax
 
-    # Legend
-    ly = room['room_depth'] + 35
-    ax.plot([20, 60], [ly, ly], color=flow_color, lw=3)
-    ax.text(65, ly, 'Material Flow (one-way)', va='center', fontsize=9)
 
-    ax.plot([180, 220], [ly, ly], color='#9C27B0', lw=2.5, linestyle='--')
-    ax.text(225, ly, 'Airflow', va='center', fontsize=9)
+# View name -> (render function, export filename)
+VIEWS = {
+    'zones': (render_zones, 'layout_zones.png'),
+    'stations': (render_stations, 'layout_stations.png'),
+    'flow': (render_flow, 'layout_flow.png'),
+    'clearance': (render_clearance, 'layout_clearance.png'),
+    'airflow': (render_airflow, 'layout_airflow.png'),
+    'ducts': (render_ducts, 'layout_ducts.png'),
+    'electrical': (render_electrical, 'layout_electrical.png'),
+}
+
+# Views built as a Scene (exportable to every FORMATS entry from one build)
+SCENES = {
+    'zones': zones_scene,
+    'stations': stations_scene,
+    'flow': flow_scene,
+    'ducts': ducts_scene,
+    'electrical': electrical_scene,
+}
+
+# Views rendered when none are requested explicitly
+DEFAULT_VIEWS = ['zones', 'stations', 'flow']
+
+# Parameter subsections each view reads (setup_figure reads room + bump_out).
+# Keep in sync with the render functions: these drive the render cache key.
+VIEW_INPUTS = {
+    'zones': ['room', 'bump_out', 'zones', 'infrastructure.soft_dust_barrier'],
+    'stations': ['room', 'bump_out', 'zones', 'stations', 'station_positions',
+                 'circulation', 'cabinetry', 'infrastructure.dust_collector'],
+    'flow': ['room', 'bump_out', 'zones', 'stations', 'station_positions', 'circulation',
+             'cabinetry', 'infrastructure.dust_collector', 'constraints'],
+    'clearance': ['room', 'bump_out', 'zones', 'stations', 'station_positions',
+                  'circulation', 'cabinetry', 'infrastructure.dust_collector'],
+    'airflow': ['room', 'bump_out', 'zones', 'stations', 'station_positions', 'hvac',
+                'infrastructure.dust_collector', 'infrastructure.soft_dust_barrier'],
+    'ducts': ['room', 'bump_out', 'zones', 'stations', 'station_positions', 'infrastructure',
+              'duct_network'],
+    'electrical': ['room', 'bump_out', 'zones', 'stations', 'station_positions', 'cabinetry',
+                   'electrical'],
+}
+
+# Data files besides parameters.json that a view reads; their content hash is
+# part of the view's cache key (and what watch mode tracks).
+VIEW_FILES = {
+    'electrical': [INVENTORY_FILE],
+}
+
+
+# Parameter subsections room_scene reads: the pre-drawn room background a
+# scene view is composited onto is shared by every view and parameter set
+# that agrees on these (at one dpi).
+BACKGROUND_INPUTS = ['room', 'bump_out']
+
+# Pre-drawn backgrounds kept per process (least recently used dropped first)
+BACKGROUND_CACHE_SIZE = 8
+_backgrounds = OrderedDict()
+
+# Modules whose code determines the rendered pixels: this one and everything it
+# imports from this directory, directly or through another of them. Listed rather
+# than read from sys.modules so every process (render, watch, serve) gets the
+# same fingerprint whatever else it has imported.
+RENDER_SOURCES = ['render_layout.py', 'scene.py', 'model.py', 'constraints.py', 'placement.py',
+                  'occupancy.py', 'airflow.py', 'ducts.py', 'electrical.py', 'inventory.py',
+                  'collisions.py', 'routing.py', 'labels.py']
+
+
+@lru_cache(maxsize=None)
+def renderer_fingerprint():
+    """Hash of the rendering modules' source + matplotlib version; code edits invalidate the cache."""
+    source = b''.join(Path(__file__).with_name(name).read_bytes() for name in RENDER_SOURCES)
+    return hashlib.sha256(source + matplotlib.__version__.encode()).hexdigest()[:16]
+
+
+@lru_cache(maxsize=64)
+def _file_digest(path, mtime_ns, size):
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def file_digest(path):
+    """Content hash of a data file (memoized on mtime/size), None if missing."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return _file_digest(str(path), st.st_mtime_ns, st.st_size)
+
+
+def cache_key(view, params, dpi=150):
+    """Render cache key for a view: its input subsections plus renderer settings."""
+    extra = {'dpi': dpi, 'renderer': renderer_fingerprint()}
+    if VIEW_FILES.get(view):
+        extra['files'] = {Path(f).name: file_digest(f) for f in VIEW_FILES[view]}
+    return view_key(view, params, VIEW_INPUTS[view], extra=extra)
+
+
+def _count_artists(fig):
+    """Tracing counters for what a view drew (boxes inside collections count as patches)."""
+    for ax in fig.axes:
+        count('texts', len(ax.texts))
+        count('patches', len(ax.patches) + sum(len(c.get_paths()) for c in ax.collections
+                                               if isinstance(c, PolyCollection)))
+        count('collections', len(ax.collections))
+
+
+def _count_items(scene):
+    """_count_artists for a scene drawn without a figure of its own."""
+    items = scene.items
+    count('texts', sum(isinstance(it, (Label, Arrow)) for it in items))
+    count('patches', sum(len(it.xywh) for it in items if isinstance(it, Boxes)))
+    count('collections', sum(not isinstance(it, (Label, Arrow)) for it in items))
+
+
+def background(params, scene, dpi=150):
+    """The pre-drawn room background for scene, built once per room geometry and dpi."""
+    key = view_key('background', as_layout(params).params, BACKGROUND_INPUTS,
+                   extra={'dpi': dpi})
+    bg = _backgrounds.pop(key, None)
+    if bg is None:
+        with span('background', dpi=dpi):
+            bg = Background(scene, dpi)
+    _backgrounds[key] = bg
+    while len(_backgrounds) > BACKGROUND_CACHE_SIZE:
+        _backgrounds.popitem(last=False)
+    return bg
+
+
+def render_bytes(view, params, dpi=150):
+    """Render a single view and return the encoded PNG bytes.
+
+    Scene views draw only their own items over the cached room background;
+    the others go through a full savefig.
+    """
+    if view in SCENES:
+        scene = SCENES[view](params)
+        if tracing.enabled():
+            _count_items(scene)
+        with span('savefig', view=view, dpi=dpi):
+            return background(params, scene, dpi).png(scene)
+    render, _ = VIEWS[view]
+    fig, ax = render(params)
+    if tracing.enabled():
+        _count_artists(fig)
+    buf = io.BytesIO()
+    with span('savefig', view=view, dpi=dpi):
+        fig.savefig(buf, format='png', dpi=dpi, bbox_inches='tight', facecolor='white')
+    return buf.getvalue()
+
+
+def _render_to_file(view, params, output_dir, dpi, cache):
+    """Write one view to its export file, via the cache if given; returns (path, status)."""
+    out_file = Path(output_dir) / VIEWS[view][1]
+    with span('render_view', view=view):
+        data = None
+        if cache is not None:
+            with span('cache_get', view=view):
+                key = cache_key(view, params, dpi)
+                data = cache.get(key)
+        status = 'cached' if data is not None else 'rendered'
+        if data is None:
+            data = render_bytes(view, params, dpi)
+            if cache is not None:
+                with span('cache_put', view=view):
+                    cache.put(key, data)
+        with span('write', view=view):
+            out_file.write_bytes(data)
+            count('bytes_written', len(data))
+    return out_file, status
+
+
+def render_view(view, params, output_dir=OUTPUT_DIR, dpi=150, cache=None):
+    """Render a single view to its export file and return the path."""
+    return _render_to_file(view, params, output_dir, dpi, cache)[0]
+
+
+def export_view(view, params, output_dir=OUTPUT_DIR, formats=('png',), dpi=150):
+    """Build a view once and write it in each format; returns the paths written.
+
+    Scene views go through scene.export (hand-written SVG and DXF); the
+    clearance heatmap is a raster, so it is saved through matplotlib only
+    and has no DXF.
+    """
+    stem = Path(output_dir) / Path(VIEWS[view][1]).stem
+    if view in SCENES:
+        with span('export_view', view=view):
+            return export(SCENES[view](params), stem, formats, dpi)
+    fig, _ = VIEWS[view][0](params)
+    written = []
+    for fmt in formats:
+        if fmt != 'dxf':
+            path = stem.with_suffix(f'.{fmt}')
+            fig.savefig(path, format=fmt, dpi=dpi, bbox_inches='tight', facecolor='white')
+            written.append(path)
+    return written
+
+
+def render_all(params, output_dir=OUTPUT_DIR, views=None, jobs=None, dpi=150, cache=None,
+               pool=None):
+    """Render views on a process pool; returns (path, status) pairs in view order.
+
+    With a cache, views whose key matches what was last written to their
+    export file are skipped entirely (status 'unchanged'). A long-lived
+    executor can be passed as pool (watch mode keeps its workers warm).
+    """
+    views = list(views or DEFAULT_VIEWS)
+    results = {}
+    todo = []
+    for view in views:
+        out_file = Path(output_dir) / VIEWS[view][1]
+        if cache is not None and cache.is_current(out_file, cache_key(view, params, dpi)):
+            results[view] = (out_file, 'unchanged')
+        else:
+            todo.append(view)
+
+    jobs = min(jobs or os.cpu_count() or 1, len(todo))
+    if tracing.enabled():
+        jobs, pool = 1, None  # keep every span in this process's trace/profile
+    if pool is not None and len(todo) > 1:
+        futures = {v: pool.submit(_render_to_file, v, params, output_dir, dpi, cache)
+                   for v in todo}
+        for view, future in futures.items():
+            results[view] = future.result()
+    elif jobs <= 1 or pool is not None:
+        for view in todo:
+            results[view] = _render_to_file(view, params, output_dir, dpi, cache)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {v: pool.submit(_render_to_file, v, params, output_dir, dpi, cache)
+                       for v in todo}
+            for view, future in futures.items():
+                results[view] = future.result()
 
-    return fig, ax
+    if cache is not None and todo:
+        cache.record_outputs([(results[v][0], cache_key(v, params, dpi)) for v in todo])
+    return [results[v] for v in views]
 
 
-def main():
+def main(argv=None):
     """Generate all layout visualizations."""
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes (default: one per view, up to CPU count)')
+    parser.add_argument('--views', nargs='+', choices=list(VIEWS), default=None,
+                        help='views to render (default: %s)' % ' '.join(DEFAULT_VIEWS))
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=['png'],
+                        help='output formats, all from one build per view (default: png; '
+                             'other formats bypass the render cache)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='always re-render and rewrite every view')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_BYTES // 2**20,
+                        help='render cache budget in MB (default: %(default)s)')
+    parser.add_argument('--profile', metavar='PATH', default=None,
+                        help='write a Chrome trace (.json) or cProfile dump (.prof); '
+                             f'also enabled by ${tracing.ENV_VAR} (renders serially)')
+    args = parser.parse_args(argv)
+    tracing.enable_from_env(args.profile)
+    try:
+        _run(args)
+    finally:
+        tracing.finish()
+
+
+def _run(args):
+    """Render the requested views from data/parameters.json."""
     # Ensure output directory exists
     OUTPUT_DIR.mkdir(exist_ok=True)
 
@@ -396,26 +794,18 @@ def main():
     params = load_parameters()
     print(f"Loaded parameters: {params['room']['room_width_ft']}' x {params['room']['room_depth_ft']}'")
 
-    # Render zone layout
-    fig, ax = render_zones(params)
-    zone_file = OUTPUT_DIR / "layout_zones.png"
-    plt.savefig(zone_file, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"Saved: {zone_file}")
-
-    # Render station layout
-    fig, ax = render_stations(params)
-    station_file = OUTPUT_DIR / "layout_stations.png"
-    plt.savefig(station_file, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"Saved: {station_file}")
-
-    # Render flow diagram
-    fig, ax = render_flow(params)
-    flow_file = OUTPUT_DIR / "layout_flow.png"
-    plt.savefig(flow_file, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"Saved: {flow_file}")
+    if args.formats != ['png']:
+        for view in args.views or DEFAULT_VIEWS:
+            for path in export_view(view, params, OUTPUT_DIR, args.formats):
+                print(f"Saved: {path}")
+        print("Done!")
+        return
+
+    cache = None if args.no_cache else RenderCache(CACHE_DIR, args.cache_size * 2**20)
+    labels = {'rendered': 'Saved', 'cached': 'Saved (cached)', 'unchanged': 'Unchanged'}
+    for out_file, status in render_all(params, OUTPUT_DIR, views=args.views,
+                                       jobs=args.jobs, cache=cache):
+        print(f"{labels[status]}: {out_file}")
 
     print("Done!")
 
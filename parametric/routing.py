@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Material-flow router for Craft Room.
+Routes the one-way material flow (the constraints' "one-way material flow"
+rule, starting at the entry on the open edge) as walkable polylines: A* over
+a coarse OccupancyGrid, limited to cells with room for a person carrying
+stock (circulation.aisle_tertiary_min wide), then string-pulled into
+straight runs. Stations are reached at their front edge (see
+collisions.facings), zones at their most open floor.
+
+One-way: while a leg is routed, every earlier stage is blocked, so no leg
+doubles back through receiving or the breakdown table. A leg with no route
+under that rule is routed without it and flagged as backtracking.
+
+Legs are cached. move() shifts one station on the grid (the clearance field
+is refreshed only around it) and re-plans just the legs it can affect: legs
+that start or end at it, legs whose path it now blocks, and legs that the
+floor it frees could shorten.
+
+Example:
+    python routing.py [params.json]
+"""
+
+import argparse
+import heapq
+import math
+import sys
+
+import numpy as np
+
+from collisions import facings
+from constraints import (PARAMS_FILE, box_gap, compile_rules, load_parameters, placed_footprint,
+                         segment_hits_box)
+from model import as_layout
+from occupancy import OccupancyGrid
+
+ROUTE_RESOLUTION = 3.0      # inches per routing cell
+DEFAULT_WALK_WIDTH = 24     # used when circulation.aisle_tertiary_min is missing
+ENTRY = 'entry'
+
+# 8-connected moves (di, dj, cost in cells)
+MOVES = [(1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+         (1, 1, math.sqrt(2)), (1, -1, math.sqrt(2)), (-1, 1, math.sqrt(2)), (-1, -1, math.sqrt(2))]
+
+
+def flow_steps(params):
+    """Stage ids of the one-way material flow rule, or [] when there is none."""
+    rules, _ = compile_rules(params)
+    for rule in rules:
+        if rule['kind'] == 'flow_order':
+            return rule['steps']
+    return []
+
+
+def astar(walkable, start, goal):
+    """Cell path [(i, j), ...] from start to goal over walkable cells, or None.
+
+    8-connected without cutting corners past blocked cells; octile heuristic.
+    """
+    ny, nx = walkable.shape
+    # One blocked cell of padding so neighbours never leave the array
+    free = np.pad(walkable, 1, constant_values=False).ravel().tolist()
+    w = nx + 2
+    s = (start[0] + 1) * w + start[1] + 1
+    g = (goal[0] + 1) * w + goal[1] + 1
+    if not (free[s] and free[g]):
+        return None
+    gi, gj = divmod(g, w)
+    steps = [(di * w + dj, di * w, dj, cost) for di, dj, cost in MOVES]
+    diag = math.sqrt(2) - 2
+
+    def h(c):
+        di, dj = abs(c // w - gi), abs(c % w - gj)
+        return di + dj + diag * min(di, dj)
+
+    best = {s: 0.0}
+    came = {s: -1}
+    heap = [(h(s), s)]
+    while heap:
+        _, c = heapq.heappop(heap)
+        if c == g:
+            break
+        base = best[c]
+        for offset, row, col, cost in steps:
+            n = c + offset
+            if not free[n] or (row and col and not (free[c + row] and free[c + col])):
+                continue
+            cand = base + cost
+            if cand < best.get(n, math.inf):
+                best[n] = cand
+                came[n] = c
+                heapq.heappush(heap, (cand + h(n), n))
+    else:
+        return None
+
+    path = []
+    while g != -1:
+        path.append((g // w - 1, g % w - 1))
+        g = came[g]
+    return path[::-1]
+
+
+class FlowRouter:
+    """Routed legs between consecutive flow stages, cached per leg.
+
+    stages are ['entry'] + flow_steps(params), skipping steps this layout
+    has no zone or placed station for; leg k runs from stage k to stage
+    k + 1. Each leg is a dict with points (polyline, inches), length
+    (inches, NaN when unroutable) and status: 'ok', 'backtracks' (only
+    routable through an earlier stage) or 'blocked'.
+    """
+
+    def __init__(self, params, resolution=ROUTE_RESOLUTION):
+        layout = as_layout(params)
+        self.params = dict(layout.params)
+        self.params['station_positions'] = dict(self.params.get('station_positions', {}))
+        self.grid = OccupancyGrid(self.params, resolution)
+        circ = layout.circulation
+        self.radius = circ.get('aisle_tertiary_min', DEFAULT_WALK_WIDTH) / 2
+        self.entry = (layout.room.width / 2, 0.0)
+        self.zone_boxes = {zid: tuple(layout.zones.boxes[k]) for k, zid in enumerate(layout.zones.ids)}
+        self.stages = [ENTRY] + [s for s in flow_steps(self.params)
+                                 if s in self.zone_boxes or s in self.grid.obstacles]
+        self._facing = self._facings()
+        self._legs = [None] * max(len(self.stages) - 1, 0)
+
+    def _facings(self):
+        layout = as_layout(self.params)
+        return dict(zip(layout.stations.placed_ids, facings(layout)))
+
+    # --- geometry ---
+
+    def _box(self, stage):
+        """Footprint box of a station stage, zone box of a zone stage, None for the entry."""
+        if stage in self.zone_boxes:
+            return self.zone_boxes[stage]
+        return self.grid.obstacles.get(stage)
+
+    def _walkable(self, blocked_stages=()):
+        walkable = ~self.grid.blocked() & (self.grid.dist >= self.radius)
+        for stage in blocked_stages:
+            box = self._box(stage)
+            if box is not None:
+                i0, i1, j0, j1 = self.grid._cells(box)
+                walkable[i0:i1, j0:j1] = False
+        return walkable
+
+    def _center(self, i, j):
+        res = self.grid.res
+        return (self.grid.x0 + (j + 0.5) * res, self.grid.y0 + (i + 0.5) * res)
+
+    def _snap(self, walkable, x, y):
+        """Walkable cell nearest (x, y), or None when nothing is walkable."""
+        cells = np.argwhere(walkable)
+        if not len(cells):
+            return None
+        res = self.grid.res
+        d = np.hypot(self.grid.x0 + (cells[:, 1] + 0.5) * res - x,
+                     self.grid.y0 + (cells[:, 0] + 0.5) * res - y)
+        return tuple(cells[int(np.argmin(d))])
+
+    def _target(self, stage, walkable):
+        """Cell where a route reaches a stage: entry point, station front, or open zone floor."""
+        if stage == ENTRY:
+            return self._snap(walkable, *self.entry)
+        if stage in self.zone_boxes:
+            box = self.zone_boxes[stage]
+            i0, i1, j0, j1 = self.grid._cells(box)
+            dist = np.where(walkable[i0:i1, j0:j1], self.grid.dist[i0:i1, j0:j1], -1)
+            if dist.size and dist.max() >= 0:
+                i, j = np.unravel_index(int(np.argmax(dist)), dist.shape)
+                return i0 + i, j0 + j
+            return self._snap(walkable, (box[0] + box[2]) / 2, (box[1] + box[3]) / 2)
+        x0, y0, x1, y1 = self.grid.obstacles[stage]
+        reach = self.radius + self.grid.res
+        x, y = {'south': ((x0 + x1) / 2, y0 - reach), 'north': ((x0 + x1) / 2, y1 + reach),
+                'east': (x1 + reach, (y0 + y1) / 2), 'west': (x0 - reach, (y0 + y1) / 2)
+                }[self._facing.get(stage, 'south')]
+        return self._snap(walkable, x, y)
+
+    def _clear(self, walkable, a, b):
+        """True when the straight run between cell centres a and b stays on walkable cells."""
+        n = max(abs(b[0] - a[0]), abs(b[1] - a[1])) * 2 + 1
+        t = np.linspace(0, 1, n)
+        i = np.rint(a[0] + (b[0] - a[0]) * t).astype(int)
+        j = np.rint(a[1] + (b[1] - a[1]) * t).astype(int)
+        return bool(walkable[i, j].all())
+
+    def _pull(self, walkable, path):
+        """String-pull a cell path: keep only the turns line of sight needs."""
+        out = [path[0]]
+        anchor = 0
+        for k in range(2, len(path)):
+            if not self._clear(walkable, path[anchor], path[k]):
+                anchor = k - 1
+                out.append(path[anchor])
+        if len(path) > 1:
+            out.append(path[-1])
+        return out
+
+    # --- routing ---
+
+    def _route(self, k):
+        start, goal = self.stages[k], self.stages[k + 1]
+        for status, blocked in (('ok', self.stages[1:k]), ('backtracks', ())):
+            walkable = self._walkable(blocked)
+            a, b = self._target(start, walkable), self._target(goal, walkable)
+            if a is None or b is None:
+                continue
+            path = astar(walkable, a, b)
+            if path is None:
+                continue
+            points = np.array([self._center(i, j) for i, j in self._pull(walkable, path)])
+            length = float(np.hypot(*np.diff(points, axis=0).T).sum())
+            return {'from': start, 'to': goal, 'points': points, 'length': length,
+                    'status': status}
+        ends = [self._stage_point(start), self._stage_point(goal)]
+        return {'from': start, 'to': goal, 'points': np.array(ends), 'length': float('nan'),
+                'status': 'blocked'}
+
+    def _stage_point(self, stage):
+        if stage == ENTRY:
+            return self.entry
+        box = self._box(stage)
+        return ((box[0] + box[2]) / 2, (box[1] + box[3]) / 2)
+
+    def route(self):
+        """All legs, routing any that are not cached."""
+        for k, leg in enumerate(self._legs):
+            if leg is None:
+                self._legs[k] = self._route(k)
+        return list(self._legs)
+
+    def total(self):
+        """Total routed flow distance (inches); inf when a leg has no route."""
+        lengths = [leg['length'] for leg in self.route()]
+        return float(sum(lengths)) if not any(math.isnan(v) for v in lengths) else math.inf
+
+    def move(self, station_id, x, y, rotation=None):
+        """Move a station and re-plan the legs it affects; returns their indices."""
+        pos = dict(self.params['station_positions'].get(station_id, {}), x=x, y=y)
+        if rotation is not None:
+            pos['rotation'] = rotation
+        self.params['station_positions'][station_id] = pos
+        w, d = placed_footprint(self.params['stations'][station_id], pos)
+        new = (x, y, x + w, y + d)
+        old = self.grid.obstacles.get(station_id)
+        self.grid.move(station_id, new)
+        self._facing = self._facings()
+
+        stale = [k for k, leg in enumerate(self._legs)
+                 if leg is not None and self._affected(leg, station_id, old, new)]
+        for k in stale:
+            self._legs[k] = None
+        self.route()
+        return stale
+
+    def _affected(self, leg, station_id, old, new):
+        """Could moving station_id from footprint old (or None) to new change this leg?"""
+        if station_id in (leg['from'], leg['to']) or leg['status'] != 'ok':
+            return True
+        boxes = [np.array(b, dtype=float) for b in (old, new) if b is not None]
+        unit = np.array([-1, -1, 1, 1])
+        # A zone endpoint sits at the zone's most open floor, and clearance shifts
+        # up to the grid's cap around either footprint
+        near = [b + unit * (self.grid.cap + 1) * self.grid.res for b in boxes]
+        for stage in (leg['from'], leg['to']):
+            zone = self.zone_boxes.get(stage)
+            if zone is not None and any(box_gap(np.array(zone), b) == 0 for b in near):
+                return True
+        # Walkability only changes within a walking radius of either footprint
+        reach = unit * (self.radius + self.grid.res)
+        pts = leg['points']
+        if segment_hits_box(pts[:-1], pts[1:], boxes[-1] + reach).any():
+            return True    # the path now runs through (or too close to) the station
+        if old is None:
+            return False
+        # Freed floor can only shorten the leg if some detour through it is shorter
+        a, b = pts[0], pts[-1]
+        freed = boxes[0] + reach
+        return box_gap(np.r_[a, a], freed) + box_gap(np.r_[b, b], freed) < leg['length']
+
+
+def flow_distance(params):
+    """Total routed material-flow distance (inches) for a parameters dict."""
+    return FlowRouter(params).total()
+
+
+def _feet_inches(inches):
+    return f"{int(inches // 12)}'-{inches % 12:.0f}\""
+
+
+def main(argv=None):
+    """Print each flow leg's routed distance; exit 1 when a leg backtracks or is blocked."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('params', nargs='?', default=PARAMS_FILE, help='parameters file')
+    args = parser.parse_args(argv)
+    router = FlowRouter(load_parameters(args.params))
+    legs = router.route()
+    if not legs:
+        print('No one-way material flow rule in constraints')
+        return 0
+    print(f"{'leg':<38} {'distance':>10} {'turns':>5}  status")
+    for k, leg in enumerate(legs):
+        name = f"{k + 1}. {leg['from']} -> {leg['to']}"
+        dist = _feet_inches(leg['length']) if leg['status'] != 'blocked' else '-'
+        print(f"{name:<38} {dist:>10} {len(leg['points']) - 2:>5}  {leg['status']}")
+    total = router.total()
+    print(f"Total flow distance: {_feet_inches(total) if math.isfinite(total) else 'unroutable'}")
+    return 0 if all(leg['status'] == 'ok' for leg in legs) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+"""
+Backend-neutral scene graph for the Craft Room floor plans.
+A Scene is an ordered list of drawing items - box batches, polylines, arrows
+and labels - each on a named layer with matplotlib-style style keywords, in
+drawing inches. Build it once from the parameters (or a DXF), then write it
+to any number of outputs:
+
+    to_figure(scene)        matplotlib Figure (PNG, PDF, ...)
+    write_svg(scene, path)  hand-written SVG, no matplotlib
+    write_dxf(scene, path)  R12 DXF, one DXF layer per scene layer
+    export(scene, stem, ['png', 'svg', 'pdf', 'dxf'])
+
+room_frame() builds the grid, outline and dimensions shared by every plan;
+Background pre-draws them once so PNGs of many scenes on the same room only
+draw what differs.
+"""
+
+import io
+from collections import namedtuple
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+# xywh is an (n, 4) array of (x, y, width, depth) rows
+Boxes = namedtuple('Boxes', 'layer xywh style')
+Lines = namedtuple('Lines', 'layer segments style')
+Arrow = namedtuple('Arrow', 'layer tail head style')
+Label = namedtuple('Label', 'layer x y text style')
+
+# Default draw order per item type (matches matplotlib's patch/line/text zorders)
+ZORDER = {Boxes: 1, Lines: 2, Arrow: 3, Label: 3}
+
+# Fraction of the figure width the axes get (matplotlib's default subplot
+# params); sets the points-per-inch scale of vector output so text and line
+# widths keep the proportions of the PNG.
+AXES_WIDTH = 0.775
+# Same for the height; with the equal aspect the tighter of the two sets the
+# drawing scale of the PNG
+AXES_HEIGHT = 0.77
+
+FORMATS = ['png', 'svg', 'pdf', 'dxf']
+
+# Margin savefig(bbox_inches='tight') leaves around the drawing, in inches
+PAD_INCHES = 0.1
+
+
+class Scene:
+    """Ordered drawing items plus the frame (title, limits, figure size).
+
+    The first `background` items are the static room frame (see room_frame).
+    """
+
+    def __init__(self, title, xlim, ylim, figsize, title_size=14):
+        self.title = title
+        self.xlim = xlim
+        self.ylim = ylim
+        self.figsize = figsize
+        self.title_size = title_size
+        self.items = []
+        self.background = 0
+
+    def boxes(self, layer, xywh, **style):
+        """Many (x, y, w, h) boxes; colors/alpha/linestyles may be per box."""
+        self.items.append(Boxes(layer, np.asarray(xywh, dtype=float).reshape(-1, 4), style))
+
+    def box(self, layer, x, y, w, h, **style):
+        self.boxes(layer, [(x, y, w, h)], **style)
+
+    def lines(self, layer, segments, **style):
+        """Many polylines, each a sequence of (x, y) points."""
+        self.items.append(Lines(layer, [np.asarray(s, dtype=float) for s in segments], style))
+
+    def line(self, layer, xs, ys, **style):
+        """One polyline from x and y sequences (like ax.plot)."""
+        self.lines(layer, [list(zip(xs, ys))], **style)
+
+    def arrow(self, layer, tail, head, **style):
+        """Arrow from tail to head; arrowstyle '->' or '<->', rad bends it (arc3)."""
+        self.items.append(Arrow(layer, tuple(tail), tuple(head), style))
+
+    def text(self, layer, x, y, text, **style):
+        self.items.append(Label(layer, x, y, text, style))
+
+    @property
+    def layers(self):
+        return list(dict.fromkeys(item.layer for item in self.items))
+
+    def ordered(self):
+        """Items in draw order: by zorder, then insertion order."""
+        return sorted(self.items, key=lambda it: it.style.get('zorder', ZORDER[type(it)]))
+
+    @property
+    def points_per_inch(self):
+        return self.figsize[0] * 72 * AXES_WIDTH / (self.xlim[1] - self.xlim[0])
+
+    @property
+    def text_points_per_inch(self):
+        """Points per drawing inch in to_figure's equal-aspect axes (text is at
+        least this large against the geometry in every output)."""
+        return 72 * min(self.figsize[0] * AXES_WIDTH / (self.xlim[1] - self.xlim[0]),
+                        self.figsize[1] * AXES_HEIGHT / (self.ylim[1] - self.ylim[0]))
+
+
+def room_frame(title, width, depth, xlim, ylim, figsize, title_size=14, bump=None,
+               dims=None, tick_offset=12, dim_offset=25):
+    """Scene with the 4' grid, room outline (open south edge), optional bump-out
+    box (x0, y0, x1, y1) and dimension arrows labelled dims=(width text, depth text)."""
+    scene = Scene(title, xlim, ylim, figsize, title_size)
+    (x_lo, x_hi), (y_lo, y_hi) = xlim, ylim
+
+    # Grid (4' = 48") spanning the axis limits
+    xs, ys = range(0, int(width) + 1, 48), range(0, int(depth) + 1, 48)
+    scene.lines('GRID', [[(x, y_lo), (x, y_hi)] for x in xs] + [[(x_lo, y), (x_hi, y)] for y in ys],
+                color='#e8e8e8', linewidth=0.5, zorder=0)
+    for x in xs:
+        if 0 < x < width:
+            scene.text('GRID', x, -tick_offset, f"{x//12}'", ha='center', fontsize=7, color='#999')
+    for y in ys:
+        if 0 < y < depth:
+            scene.text('GRID', -tick_offset, y, f"{y//12}'", ha='right', va='center',
+                       fontsize=7, color='#999')
+
+    # Room outline: south edge open (dashed)
+    scene.line('OPEN_EDGE', [0, width], [0, 0], color='k', linestyle='--', linewidth=2.5)
+    scene.line('FOOTPRINT', [width, width, 0, 0], [0, depth, depth, 0], color='k', linewidth=3)
+
+    if bump is not None:
+        bx0, by0, bx1, by1 = bump
+        scene.line('BUMP_OUT', [bx0, bx1, bx1, bx0], [by0, by0, by1, by1], color='k', linewidth=3)
+        # Opening into main room (no wall)
+        scene.line('BUMP_OUT', [bx0, bx0], [by0, by1], color='k', linestyle='--', linewidth=1,
+                   alpha=0.3)
+
+    # Dimension annotations
+    if dims:
+        dim = dict(arrowstyle='<->', color='#666', linewidth=1.5)
+        scene.arrow('DIMENSIONS', (0, -dim_offset), (width, -dim_offset), **dim)
+        scene.text('DIMENSIONS', width / 2, -dim_offset - 10, dims[0], ha='center',
+                   fontsize=10, color='#444')
+        scene.arrow('DIMENSIONS', (-dim_offset, 0), (-dim_offset, depth), **dim)
+        scene.text('DIMENSIONS', -dim_offset - 5, depth / 2, dims[1], ha='center', va='center',
+                   fontsize=10, color='#444', rotation=90)
+    scene.background = len(scene.items)
+    return scene
+
+
+# --- matplotlib -------------------------------------------------------------
+
+def box_collection(boxes, colors=None, alpha=None, **style):
+    """One PolyCollection for many (x, y, w, h) boxes.
+
+    colors/alpha may be per box; they set both face and edge like a
+    Rectangle(facecolor=c, edgecolor=c, alpha=a) would.
+    """
+    from matplotlib.collections import PolyCollection
+    from matplotlib.colors import to_rgba_array
+
+    b = np.asarray(boxes, dtype=float).reshape(-1, 4)
+    x0, y0 = b[:, 0], b[:, 1]
+    x1, y1 = x0 + b[:, 2], y0 + b[:, 3]
+    verts = np.stack([np.c_[x0, y0], np.c_[x1, y0], np.c_[x1, y1], np.c_[x0, y1]], axis=1)
+    if colors is not None:
+        rgba = to_rgba_array(colors)
+        if alpha is not None:
+            rgba[:, 3] = alpha
+        style.setdefault('facecolors', rgba)
+        style.setdefault('edgecolors', rgba)
+    elif alpha is not None:
+        style['alpha'] = alpha
+    return PolyCollection(verts, **style)
+
+
+def _draw_boxes(ax, item):
+    style = dict(item.style)
+    if style.pop('round', False):
+        from matplotlib.patches import FancyBboxPatch
+        for x, y, w, h in item.xywh:
+            ax.add_patch(FancyBboxPatch((x, y), w, h, boxstyle='round,pad=0.02', **style))
+        return
+    for key in ('facecolor', 'edgecolor', 'linewidth', 'linestyle'):
+        if key in style:
+            style[key + 's'] = style.pop(key)
+    ax.add_collection(box_collection(item.xywh, **style))
+
+
+def _draw_lines(ax, item):
+    from matplotlib.collections import LineCollection
+    style = dict(item.style)
+    for key in ('color', 'linewidth', 'linestyle'):
+        if key in style:
+            style[key + 's'] = style.pop(key)
+    ax.add_collection(LineCollection(item.segments, **style))
+
+
+def _draw_arrow(ax, item):
+    style = dict(item.style)
+    props = {'arrowstyle': style.pop('arrowstyle', '->'), 'color': style.pop('color', 'k'),
+             'lw': style.pop('linewidth', 1.5)}
+    if 'linestyle' in style:
+        props['linestyle'] = style.pop('linestyle')
+    rad = style.pop('rad', 0)
+    if rad:
+        props['connectionstyle'] = f'arc3,rad={rad}'
+    ax.annotate('', xy=item.head, xytext=item.tail, arrowprops=props, **style)
+
+
+def _draw_label(ax, item):
+    ax.text(item.x, item.y, item.text, **item.style)
+
+
+_DRAW = {Boxes: _draw_boxes, Lines: _draw_lines, Arrow: _draw_arrow, Label: _draw_label}
+
+
+def _add_items(ax, items):
+    """Draw items on ax; returns the artists they added, in insertion order."""
+    before = set(ax.get_children())
+    for item in items:
+        _DRAW[type(item)](ax, item)
+    return [a for a in ax.get_children() if a not in before]
+
+
+def to_figure(scene, dpi=None):
+    """Draw the scene on a standalone matplotlib Figure; returns (fig, ax)."""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=scene.figsize, dpi=dpi)
+    ax = fig.add_subplot(1, 1, 1)
+    ax.set_facecolor('white')
+    for item in scene.items:
+        _DRAW[type(item)](ax, item)
+    ax.set_xlim(*scene.xlim)
+    ax.set_ylim(*scene.ylim)
+    ax.set_aspect('equal')
+    ax.set_xlabel('Inches', fontsize=10)
+    ax.set_ylabel('Inches', fontsize=10)
+    ax.set_title(scene.title, fontsize=scene.title_size, fontweight='bold', pad=15)
+    return fig, ax
+
+
+class Background:
+    """A scene's static room frame pre-drawn on an Agg canvas at one dpi.
+
+    Holds the pixels of the axes, ticks and the first scene.background items
+    (grid, outline, bump-out, dimensions, wall labels), untitled. png() puts
+    them back and draws only a scene's own items and title on top, so every
+    view of the same room skips redrawing the frame. Overlay items always
+    land on top of the frame pixels, whatever their zorder; frame artists
+    are never drawn twice (that would double antialiased text and dashes).
+    """
+
+    def __init__(self, scene, dpi=150):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        frame = Scene('', scene.xlim, scene.ylim, scene.figsize, scene.title_size)
+        self.count = scene.background
+        self.dpi = dpi
+        self.fig, self.ax = to_figure(frame, dpi=dpi)
+        self.fig.set_facecolor('white')
+        _add_items(self.ax, scene.items[:self.count])
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.canvas.draw()
+        self.pixels = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.extent = self.fig.get_tightbbox(self.canvas.get_renderer())
+
+    def png(self, scene):
+        """PNG bytes of scene (whose frame must be this one), cropped like bbox_inches='tight'."""
+        from matplotlib.image import imsave
+        from matplotlib.text import Text
+        from matplotlib.transforms import Bbox
+
+        canvas, ax = self.canvas, self.ax
+        renderer = canvas.get_renderer()
+        canvas.restore_region(self.pixels)
+        overlay = _add_items(ax, scene.items[self.count:])
+        ax.set_title(scene.title, fontsize=scene.title_size, fontweight='bold', pad=15)
+        try:
+            for artist in sorted(overlay, key=lambda a: a.get_zorder()):
+                ax.draw_artist(artist)
+            ax.draw_artist(ax.title)
+
+            # Tight crop: the frame plus anything text-like drawn beyond it
+            extents = [self.extent.transformed(self.fig.dpi_scale_trans)]
+            extents += [a.get_window_extent(renderer) for a in overlay + [ax.title]
+                        if isinstance(a, Text)]
+            box = Bbox.union(extents).padded(PAD_INCHES * self.dpi)
+            height, width = canvas.get_width_height()[::-1]
+            x0, y0 = max(round(box.x0), 0), max(round(box.y0), 0)
+            x1, y1 = min(x0 + int(box.width), width), min(y0 + int(box.height), height)
+            rgba = np.asarray(canvas.buffer_rgba())[height - y1:height - y0, x0:x1]
+            buf = io.BytesIO()
+            imsave(buf, rgba, format='png', dpi=self.dpi)
+            return buf.getvalue()
+        finally:
+            for artist in overlay:
+                artist.remove()
+            ax.set_title('')
+
+
+# --- SVG ----------------------------------------------------------------------
+
+SVG_MARGIN = 24      # points around the drawing
+SVG_TITLE = 36       # points above it for the title
+
+# Single-letter matplotlib colors used in the scenes
+_COLORS = {'k': '#000000', 'w': '#ffffff', 'r': '#ff0000', 'g': '#008000', 'b': '#0000ff'}
+
+_DASHES = {'--': (3.7, 1.6), 'dashed': (3.7, 1.6), ':': (1, 1.65), 'dotted': (1, 1.65),
+           '-.': (6.4, 1.6, 1, 1.6), 'dashdot': (6.4, 1.6, 1, 1.6)}
+
+_ANCHOR = {'left': 'start', 'center': 'middle', 'right': 'end'}
+_BASELINE = {'center': 'central', 'center_baseline': 'central', 'top': 'hanging',
+             'bottom': 'text-after-edge', 'baseline': 'alphabetic'}
+
+
+def _color(c):
+    return _COLORS.get(c, c)
+
+
+def _num(v):
+    return f'{v:.2f}'.rstrip('0').rstrip('.')
+
+
+def _stroke(color, width, linestyle, alpha):
+    attrs = f'stroke="{_color(color)}" stroke-width="{_num(width)}"'
+    dash = _DASHES.get(linestyle)
+    if dash:
+        # matplotlib scales dash patterns with the line width
+        attrs += f' stroke-dasharray="{",".join(_num(d * width) for d in dash)}"'
+    if alpha is not None and alpha < 1:
+        attrs += f' stroke-opacity="{_num(alpha)}"'
+    return attrs
+
+
+def _per_box(value, n):
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return list(value)
+    return [value] * n
+
+
+class _SvgCanvas:
+    """Maps drawing inches to SVG points (y up -> y down) and collects elements."""
+
+    def __init__(self, scene):
+        self.scene = scene
+        self.k = scene.points_per_inch
+        (self.x0, x1), (y0, self.y1) = scene.xlim, scene.ylim
+        self.width = (x1 - self.x0) * self.k + 2 * SVG_MARGIN
+        self.height = (self.y1 - y0) * self.k + 2 * SVG_MARGIN + SVG_TITLE
+        self.out = []
+
+    def xy(self, x, y):
+        return (SVG_MARGIN + (x - self.x0) * self.k,
+                SVG_MARGIN + SVG_TITLE + (self.y1 - y) * self.k)
+
+    def boxes(self, item):
+        s = item.style
+        n = len(item.xywh)
+        colors = _per_box(s.get('colors'), n)
+        alphas = _per_box(s.get('alpha'), n)
+        faces = _per_box(s.get('facecolor'), n)
+        edges = _per_box(s.get('edgecolor'), n)
+        styles = _per_box(s.get('linestyle', '-'), n)
+        lw = s.get('linewidth', 1)
+        rx = f' rx="{_num(0.02 * self.k * 10)}"' if s.get('round') else ''
+        for i, (x, y, w, h) in enumerate(item.xywh):
+            face, edge = (colors[i], colors[i]) if colors[i] is not None else (faces[i], edges[i])
+            px, py = self.xy(x, y + h)
+            fill = f'fill="{_color(face)}"' if face not in (None, 'none') else 'fill="none"'
+            if face not in (None, 'none') and alphas[i] is not None and alphas[i] < 1:
+                fill += f' fill-opacity="{_num(alphas[i])}"'
+            stroke = (_stroke(edge, lw, styles[i], alphas[i]) if edge not in (None, 'none')
+                      else 'stroke="none"')
+            self.out.append(f'<rect x="{_num(px)}" y="{_num(py)}" width="{_num(w * self.k)}" '
+                            f'height="{_num(h * self.k)}"{rx} {fill} {stroke} '
+                            f'clip-path="url(#axes)"/>')
+
+    def lines(self, item):
+        s = item.style
+        stroke = _stroke(s.get('color', 'k'), s.get('linewidth', 1.5), s.get('linestyle'),
+                         s.get('alpha'))
+        for seg in item.segments:
+            pts = ' '.join(f'{_num(px)},{_num(py)}' for px, py in (self.xy(x, y) for x, y in seg))
+            self.out.append(f'<polyline points="{pts}" fill="none" {stroke} '
+                            f'stroke-linecap="square" clip-path="url(#axes)"/>')
+
+    def arrow(self, item):
+        s = item.style
+        lw = s.get('linewidth', 1.5)
+        color = s.get('color', 'k')
+        (tx, ty), (hx, hy) = self.xy(*item.tail), self.xy(*item.head)
+        rad = s.get('rad', 0)
+        if rad:
+            # arc3 control point: midpoint offset by rad * (dy, -dx) in display space
+            # (which is y-up there; SVG is y-down, so the sign of dx flips)
+            cx, cy = (tx + hx) / 2 - rad * (hy - ty), (ty + hy) / 2 + rad * (hx - tx)
+            path = f'M{_num(tx)},{_num(ty)} Q{_num(cx)},{_num(cy)} {_num(hx)},{_num(hy)}'
+            ends = [((hx, hy), (cx, cy))]
+            start_dir = (cx, cy)
+        else:
+            path = f'M{_num(tx)},{_num(ty)} L{_num(hx)},{_num(hy)}'
+            ends = [((hx, hy), (tx, ty))]
+            start_dir = (hx, hy)
+        if s.get('arrowstyle', '->') == '<->':
+            ends.append(((tx, ty), start_dir))
+        stroke = _stroke(color, lw, s.get('linestyle'), s.get('alpha'))
+        self.out.append(f'<path d="{path}" fill="none" {stroke}/>')
+        solid = _stroke(color, lw, None, s.get('alpha'))
+        for (ex, ey), (fx, fy) in ends:
+            head = self._head(ex, ey, fx, fy, lw)
+            self.out.append(f'<polyline points="{head}" fill="none" {solid} '
+                            f'stroke-linejoin="miter"/>')
+
+    @staticmethod
+    def _head(ex, ey, fx, fy, lw):
+        """Open '->' head at (ex, ey) pointing away from (fx, fy)."""
+        dx, dy = ex - fx, ey - fy
+        norm = float(np.hypot(dx, dy)) or 1.0
+        ux, uy = dx / norm, dy / norm
+        length, half = 4 + 2 * lw, 2 + lw
+        bx, by = ex - ux * length, ey - uy * length
+        return ' '.join(f'{_num(x)},{_num(y)}' for x, y in
+                        ((bx - uy * half, by + ux * half), (ex, ey), (bx + uy * half, by - ux * half)))
+
+    def label(self, item):
+        s = item.style
+        px, py = self.xy(item.x, item.y)
+        size = s.get('fontsize', 10)
+        attrs = [f'font-size="{_num(size)}"',
+                 f'text-anchor="{_ANCHOR.get(s.get("ha", "left"), "start")}"',
+                 f'fill="{_color(s.get("color", "k"))}"']
+        if s.get('fontweight') == 'bold':
+            attrs.append('font-weight="bold"')
+        if s.get('style') == 'italic' or s.get('fontstyle') == 'italic':
+            attrs.append('font-style="italic"')
+        if s.get('alpha') is not None:
+            attrs.append(f'fill-opacity="{_num(s["alpha"])}"')
+        if s.get('rotation'):
+            attrs.append(f'transform="rotate({_num(-s["rotation"])} {_num(px)} {_num(py)})"')
+
+        lines = str(item.text).split('\n')
+        va = s.get('va', 'baseline')
+        step = 1.2 * size
+        if va in ('center', 'center_baseline'):
+            first = py - step * (len(lines) - 1) / 2
+        elif va == 'bottom':
+            first = py - step * (len(lines) - 1)
+        else:
+            first = py
+        baseline = _BASELINE.get(va, 'alphabetic')
+        spans = ''.join(f'<tspan x="{_num(px)}" y="{_num(first + i * step)}">{escape(t)}</tspan>'
+                        for i, t in enumerate(lines))
+        self.out.append(f'<text {" ".join(attrs)} dominant-baseline="{baseline}">{spans}</text>')
+
+
+def svg_string(scene):
+    """The scene as a standalone SVG document (points, y up in the drawing)."""
+    c = _SvgCanvas(scene)
+    draw = {Boxes: c.boxes, Lines: c.lines, Arrow: c.arrow, Label: c.label}
+    layer = None
+    for item in scene.ordered():
+        if item.layer != layer:
+            if layer is not None:
+                c.out.append('</g>')
+            layer = item.layer
+            c.out.append(f'<g class="{escape(layer)}">')
+        draw[type(item)](item)
+    if layer is not None:
+        c.out.append('</g>')
+
+    ax0, ay0 = c.xy(scene.xlim[0], scene.ylim[1])
+    ax1, ay1 = c.xy(scene.xlim[1], scene.ylim[0])
+    head = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{_num(c.width)}pt" '
+        f'height="{_num(c.height)}pt" viewBox="0 0 {_num(c.width)} {_num(c.height)}" '
+        f'font-family="DejaVu Sans, Bitstream Vera Sans, Arial, sans-serif">',
+        f'<defs><clipPath id="axes"><rect x="{_num(ax0)}" y="{_num(ay0)}" '
+        f'width="{_num(ax1 - ax0)}" height="{_num(ay1 - ay0)}"/></clipPath></defs>',
+        '<rect width="100%" height="100%" fill="#ffffff"/>',
+        f'<text x="{_num(c.width / 2)}" y="{_num(SVG_MARGIN + SVG_TITLE / 2)}" '
+        f'font-size="{scene.title_size}" font-weight="bold" text-anchor="middle">'
+        f'{escape(scene.title)}</text>',
+        f'<rect x="{_num(ax0)}" y="{_num(ay0)}" width="{_num(ax1 - ax0)}" '
+        f'height="{_num(ay1 - ay0)}" fill="none" stroke="#000000" stroke-width="0.8"/>',
+    ]
+    return '\n'.join(head + c.out + ['</svg>', ''])
+
+
+def write_svg(scene, path):
+    Path(path).write_text(svg_string(scene), encoding='utf-8')
+
+
+# --- DXF ----------------------------------------------------------------------
+
+def _dxf_layers(scene):
+    """Layer table: known layers keep their dxf_export colors, others white."""
+    from dxf_export import LAYERS
+    layers = {}
+    for item in scene.items:
+        if item.layer not in layers:
+            ls = item.style.get('linestyle')
+            dashed = isinstance(ls, str) and ls in _DASHES
+            layers[item.layer] = LAYERS.get(item.layer, (7, 'DASHED' if dashed else 'CONTINUOUS'))
+    return layers
+
+
+def write_dxf(scene, path):
+    """Write the scene as an R12 DXF in drawing inches; returns the entity count."""
+    from dxf_export import DxfWriter
+
+    k = scene.points_per_inch
+    with open(path, 'w', newline='\n') as f:
+        out = DxfWriter(f)
+        out.header(_dxf_layers(scene))
+        for item in scene.items:
+            if isinstance(item, Boxes):
+                for x, y, w, h in item.xywh:
+                    out.rect(item.layer, x, y, x + w, y + h)
+            elif isinstance(item, Lines):
+                for seg in item.segments:
+                    for (x0, y0), (x1, y1) in zip(seg[:-1], seg[1:]):
+                        out.line(item.layer, x0, y0, x1, y1)
+            elif isinstance(item, Arrow):
+                (x0, y0), (x1, y1) = item.tail, item.head
+                out.line(item.layer, x0, y0, x1, y1)
+                ends = [((x1, y1), (x0, y0))]
+                if item.style.get('arrowstyle', '->') == '<->':
+                    ends.append(((x0, y0), (x1, y1)))
+                for (ex, ey), (fx, fy) in ends:
+                    dx, dy = ex - fx, ey - fy
+                    norm = float(np.hypot(dx, dy)) or 1.0
+                    ux, uy = dx / norm * 4, dy / norm * 4
+                    out.line(item.layer, ex, ey, ex - ux - uy / 2, ey - uy + ux / 2)
+                    out.line(item.layer, ex, ey, ex - ux + uy / 2, ey - uy - ux / 2)
+            else:
+                s = item.style
+                height = s.get('fontsize', 10) / k * 0.7  # cap height ~0.7 em
+                lines = str(item.text).split('\n')
+                for i, text in enumerate(lines):
+                    x, y = item.x, item.y - i * height * 1.7
+                    if s.get('ha') == 'center' and not s.get('rotation'):
+                        x -= 0.45 * height * len(text)
+                    elif s.get('ha') == 'right' and not s.get('rotation'):
+                        x -= 0.9 * height * len(text)
+                    out.text(item.layer, x, y, text, height, s.get('rotation', 0))
+        out.footer()
+    return out.count
+
+
+def export(scene, stem, formats=('png',), dpi=150):
+    """Write the scene once per format as stem.<format>; returns the paths.
+
+    PNG/PDF share one matplotlib figure; SVG and DXF never touch matplotlib.
+    """
+    stem = Path(stem)
+    stem.parent.mkdir(parents=True, exist_ok=True)
+    fig = None
+    paths = []
+    for fmt in formats:
+        path = stem.with_suffix(f'.{fmt}')
+        if fmt == 'svg':
+            write_svg(scene, path)
+        elif fmt == 'dxf':
+            write_dxf(scene, path)
+        else:
+            if fig is None:
+                fig, _ = to_figure(scene)
+            fig.savefig(path, format=fmt, dpi=dpi, bbox_inches='tight', facecolor='white')
+        paths.append(path)
+    return paths
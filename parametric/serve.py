@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Local render service: PNG views over HTTP from a pool of warm workers.
+Each request names one view and either renders the base parameters file,
+a full parameters document, or a JSON merge patch (RFC 7386) applied to the
+base file. Results are keyed by cache_key (the view's input subsections plus
+renderer settings), served from an in-memory LRU, and identical requests that
+arrive while a render is in flight wait on that render instead of starting
+their own.
+
+    GET  /render/<view>[?dpi=N]      render the base parameters file
+    POST /render/<view>[?dpi=N]      body {"params": {...}} or {"patch": {...}}
+    GET  /views                      view names
+    GET  /stats                      cache and coalescing counters
+
+Responses carry ETag (the cache key) and X-Render: hit, coalesced or render;
+If-None-Match answers 304 without touching the cache. Bad parameters are 400.
+
+Example:
+    python serve.py --port 8765 -j 8
+    curl -s -X POST localhost:8765/render/stations \\
+         -d '{"patch": {"station_positions": {"cnc_bay": {"x": 40}}}}' > stations.png
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from render_layout import PARAMS_FILE, VIEWS, cache_key, load_parameters, render_bytes
+from sweep import refresh_derived
+
+HOST = '127.0.0.1'
+PORT = 8765
+DEFAULT_DPI = 150
+DPI_RANGE = (20, 600)
+MAX_BODY = 16 * 1024 * 1024
+DEFAULT_MEMORY = 256 * 1024 * 1024
+
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 413: 'Payload Too Large', 500: 'Internal Server Error',
+           503: 'Service Unavailable'}
+
+
+class HTTPError(Exception):
+    """A request the service answers with an error status and a one-line message."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _warm_worker(params, dpi):
+    """Pool initializer: draw once so fonts and the room background are hot."""
+    render_bytes('zones', params, dpi=dpi)
+
+
+def merge_patch(target, patch):
+    """RFC 7386 merge patch: objects merge recursively, null deletes a key."""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    out = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            out.pop(key, None)
+        else:
+            out[key] = merge_patch(out.get(key), value)
+    return out
+
+
+class MemoryLRU:
+    """Rendered bytes by key, bounded by total size (least recently used out first)."""
+
+    def __init__(self, max_bytes=DEFAULT_MEMORY):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+
+    def get(self, key):
+        data = self.entries.get(key)
+        if data is not None:
+            self.entries.move_to_end(key)
+        return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self.entries[key] = data
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class RenderService:
+    """Resolves requests to (view, params, dpi), then cache, in-flight render or pool."""
+
+    def __init__(self, params_file=PARAMS_FILE, jobs=None, max_bytes=DEFAULT_MEMORY,
+                 dpi=DEFAULT_DPI):
+        self.params_file = Path(params_file)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.dpi = dpi
+        self.cache = MemoryLRU(max_bytes)
+        self.inflight = {}
+        self.pool = None
+        self._base = (None, None)
+        self.stats = dict(requests=0, hits=0, coalesced=0, renders=0, errors=0,
+                          render_seconds=0.0)
+
+    def start(self):
+        """Spawn the worker pool, warmed on the base parameters."""
+        self.pool = ProcessPoolExecutor(max_workers=self.jobs, initializer=_warm_worker,
+                                        initargs=(self.base(), self.dpi))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    def base(self):
+        """Base parameters, reloaded when the file changes on disk."""
+        try:
+            st = os.stat(self.params_file)
+        except FileNotFoundError:
+            raise HTTPError(500, f"{self.params_file} not found")
+        stamp = (st.st_mtime_ns, st.st_size)
+        if self._base[0] != stamp:
+            try:
+                self._base = (stamp, load_parameters(self.params_file))
+            except (OSError, ValueError) as e:
+                raise HTTPError(500, f"{self.params_file.name}: {e}")
+        return self._base[1]
+
+    def resolve(self, body):
+        """Parameters for a request body: empty (base), {"params": ...} or {"patch": ...}."""
+        if not body.strip():
+            return self.base()
+        try:
+            doc = json.loads(body)
+        except ValueError as e:
+            raise HTTPError(400, f"body is not JSON: {e}")
+        if not isinstance(doc, dict) or len(doc.keys() & {'params', 'patch'}) != 1:
+            raise HTTPError(400, 'body must be an object with exactly one of "params", "patch"')
+        if 'params' in doc:
+            if not isinstance(doc['params'], dict):
+                raise HTTPError(400, '"params" must be an object')
+            return doc['params']
+        if not isinstance(doc['patch'], dict):
+            raise HTTPError(400, '"patch" must be an object')
+        params = merge_patch(copy.deepcopy(self.base()), doc['patch'])
+        try:
+            return refresh_derived(params)
+        except (KeyError, TypeError, ValueError) as e:
+            raise HTTPError(400, f"patched parameters incomplete: {e!r}")
+
+    async def render(self, view, params, dpi):
+        """(key, png bytes, how) for a view: 'hit', 'coalesced' or 'render'."""
+        key = cache_key(view, params, dpi)
+        data = self.cache.get(key)
+        if data is not None:
+            self.stats['hits'] += 1
+            return key, data, 'hit'
+        future = self.inflight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+            return key, await asyncio.shield(future), 'coalesced'
+
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        t0 = time.perf_counter()
+        try:
+            data = await asyncio.get_running_loop().run_in_executor(
+                self.pool, render_bytes, view, params, dpi)
+        except Exception as e:
+            error = self._render_error(view, e)
+            future.set_exception(error)
+            future.exception()  # retrieved here; coalesced waiters re-raise it
+            raise error from None
+        finally:
+            del self.inflight[key]
+            self.stats['render_seconds'] += time.perf_counter() - t0
+        self.stats['renders'] += 1
+        self.cache.put(key, data)
+        future.set_result(data)
+        return key, data, 'render'
+
+    def _render_error(self, view, e):
+        """HTTPError for a failed render; a dead worker pool is replaced."""
+        if isinstance(e, BrokenProcessPool):
+            self.close()
+            self.start()
+            return HTTPError(503, 'render worker died; pool restarted')
+        if isinstance(e, (KeyError, TypeError, ValueError)):
+            return HTTPError(400, f"{view}: bad parameters: {e}")
+        return HTTPError(500, f"{view}: {e!r}")
+
+    async def handle(self, method, target, headers, body):
+        """(status, content type, payload, extra headers) for one request."""
+        url = urlsplit(target)
+        parts = [p for p in url.path.split('/') if p]
+        if parts == ['views'] and method == 'GET':
+            return 200, 'application/json', json.dumps(list(VIEWS)).encode(), {}
+        if parts == ['stats'] and method == 'GET':
+            stats = dict(self.stats, entries=len(self.cache.entries), bytes=self.cache.size,
+                         inflight=len(self.inflight), workers=self.jobs)
+            return 200, 'application/json', json.dumps(stats).encode(), {}
+        if len(parts) != 2 or parts[0] != 'render':
+            raise HTTPError(404, f"no route for {url.path}")
+        if method not in ('GET', 'POST'):
+            raise HTTPError(405, f"{method} not allowed")
+        view = parts[1]
+        if view not in VIEWS:
+            raise HTTPError(404, f"unknown view {view!r} (try /views)")
+        try:
+            dpi = int(parse_qs(url.query).get('dpi', [self.dpi])[-1])
+        except ValueError:
+            raise HTTPError(400, 'dpi must be an integer')
+        if not DPI_RANGE[0] <= dpi <= DPI_RANGE[1]:
+            raise HTTPError(400, f"dpi must be within {DPI_RANGE[0]}-{DPI_RANGE[1]}")
+
+        self.stats['requests'] += 1
+        params = self.resolve(body if method == 'POST' else b'')
+        etag = None
+        if 'if-none-match' in headers:
+            etag = f'"{cache_key(view, params, dpi)}"'
+            if headers['if-none-match'] == etag:
+                return 304, None, b'', {'ETag': etag}
+        key, data, how = await self.render(view, params, dpi)
+        return 200, 'image/png', data, {'ETag': f'"{key}"', 'X-Render': how}
+
+    async def connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection (keep-alive) until it closes."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                try:
+                    method, target, version = line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = h.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                try:
+                    if length < 0:
+                        keep = False
+                        raise HTTPError(400, 'bad Content-Length')
+                    if length > MAX_BODY:
+                        keep = False
+                        raise HTTPError(413, f"body over {MAX_BODY} bytes")
+                    body = await reader.readexactly(length) if length else b''
+                    status, ctype, payload, extra = await self.handle(method, target, headers, body)
+                except HTTPError as e:
+                    self.stats['errors'] += 1
+                    status, ctype, payload, extra = e.status, 'text/plain', f"{e}\n".encode(), {}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    raise
+                except Exception as e:  # keep serving; the client gets the error
+                    self.stats['errors'] += 1
+                    status, ctype, payload, extra = 500, 'text/plain', f"{e!r}\n".encode(), {}
+
+                head = [f"HTTP/1.1 {status} {REASONS[status]}", f"Content-Length: {len(payload)}"]
+                if ctype:
+                    head.append(f"Content-Type: {ctype}")
+                head += [f"{k}: {v}" for k, v in extra.items()]
+                if not keep:
+                    head.append('Connection: close')
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + payload)
+                await writer.drain()
+                if not keep:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass  # client went away, or the server is shutting down
+        finally:
+            writer.close()
+
+    async def serve(self, host=HOST, port=PORT, ready=None):
+        """Listen until cancelled; ready (if given) is called with the bound port."""
+        server = await asyncio.start_server(self.connection, host, port)
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--params', type=Path, default=PARAMS_FILE,
+                        help='base parameters file (patches apply to it)')
+    parser.add_argument('--host', default=HOST, help='address to bind (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=PORT, help='port (default: %(default)s)')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='warm worker processes (default: CPU count)')
+    parser.add_argument('--dpi', type=int, default=DEFAULT_DPI,
+                        help='dpi when a request gives none (default: %(default)s)')
+    parser.add_argument('--memory', type=int, default=DEFAULT_MEMORY // 2**20,
+                        help='in-memory render cache budget in MB (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    service = RenderService(args.params, args.jobs, args.memory * 2**20, args.dpi)
+    service.start()
+    try:
+        asyncio.run(service.serve(args.host, args.port, ready=lambda port: print(
+            f"Serving {', '.join(VIEWS)} on http://{args.host}:{port} "
+            f"({service.jobs} worker(s))", flush=True)))
+    except KeyboardInterrupt:
+        print()
+    finally:
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Parameter sweep for Craft Room layouts.
+Expands a base parameters.json over one or more axes (cartesian product),
+validates every variant and renders the valid ones on a process pool.
+
+Example:
+    python sweep.py --axis room.room_width=300,360,420 \\
+                    --axis bump_out.enabled=true,false \\
+                    --axis circulation.main_aisle_width=36,42
+"""
+
+import argparse
+import copy
+import itertools
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import constraints
+from dxf_export import DXF_FILE, write_dxf
+from render_cache import CACHE_DIR, RenderCache
+from render_layout import PARAMS_FILE, OUTPUT_DIR, VIEWS, DEFAULT_VIEWS, load_parameters, render_view
+from routing import flow_distance
+
+SWEEP_DIR = OUTPUT_DIR / "sweep"
+
+
+def parse_axis(spec):
+    """Parse 'dotted.path=v1,v2,...' into (path, [values]); values are JSON literals."""
+    path, _, raw = spec.partition('=')
+    if not path or not raw:
+        raise argparse.ArgumentTypeError(f"axis must look like path=v1,v2: {spec!r}")
+    values = []
+    for item in raw.split(','):
+        try:
+            values.append(json.loads(item))
+        except ValueError:
+            values.append(item)
+    return path, values
+
+
+def set_path(params, path, value):
+    """Set a dotted-path key (e.g. 'bump_out.x_start') in a nested dict."""
+    keys = path.split('.')
+    node = params
+    for key in keys[:-1]:
+        if key not in node:
+            raise KeyError(f"unknown parameter path: {path}")
+        node = node[key]
+    if keys[-1] not in node:
+        raise KeyError(f"unknown parameter path: {path}")
+    node[keys[-1]] = value
+
+
+def unknown_paths(params, paths):
+    """The dotted paths set_path would reject (a key missing along the way or at the end)."""
+    missing = []
+    for path in paths:
+        node = params
+        for key in path.split('.'):
+            if not isinstance(node, dict) or key not in node:
+                missing.append(path)
+                break
+            node = node[key]
+    return missing
+
+
+# Fields refresh_derived recomputes: sweeping them directly would be overwritten
+DERIVED_PATHS = {
+    'room': ('room_width_ft', 'room_depth_ft', 'room_width_mm', 'room_depth_mm',
+             'main_area_sqft'),
+    'bump_out': ('x_end', 'y_start', 'y_end', 'width_ft', 'depth_ft', 'area_sqft',
+                 'total_room_sqft'),
+}
+BUMP_ZONE_KEYS = ('x_start', 'x_end', 'y_start', 'y_end', 'width', 'depth')
+
+
+def derived_paths(params, paths):
+    """The dotted paths refresh_derived overwrites, so a sweep over them changes nothing."""
+    derived = []
+    for path in paths:
+        keys = path.split('.')
+        if len(keys) == 2:
+            hit = keys[1] in DERIVED_PATHS.get(keys[0], ())
+        else:
+            hit = (len(keys) == 3 and keys[0] == 'zones' and keys[2] in BUMP_ZONE_KEYS
+                   and params['zones'].get(keys[1], {}).get('in_bump_out'))
+        if hit:
+            derived.append(path)
+    return derived
+
+
+def _feet(inches):
+    """Inches -> feet, as an int when whole (titles print these directly)."""
+    ft = inches / 12
+    return int(ft) if ft == int(ft) else round(ft, 2)
+
+
+def refresh_derived(params):
+    """Recompute fields derived from the primary inch dimensions."""
+    room = params['room']
+    room['room_width_ft'] = _feet(room['room_width'])
+    room['room_depth_ft'] = _feet(room['room_depth'])
+    room['room_width_mm'] = round(room['room_width'] * 25.4)
+    room['room_depth_mm'] = round(room['room_depth'] * 25.4)
+    room['main_area_sqft'] = round(room['room_width'] * room['room_depth'] / 144)
+
+    bump = params.get('bump_out', {})
+    if bump:
+        # Bump-out sits on the back wall; x_start/width drive the rest
+        bump['x_end'] = bump['x_start'] + bump['width']
+        bump['y_start'] = room['room_depth']
+        bump['y_end'] = bump['y_start'] + bump['depth']
+        bump['width_ft'] = _feet(bump['width'])
+        bump['depth_ft'] = _feet(bump['depth'])
+        bump['area_sqft'] = round(bump['width'] * bump['depth'] / 144)
+        extra = bump['area_sqft'] if bump.get('enabled') else 0
+        bump['total_room_sqft'] = room['main_area_sqft'] + extra
+
+        # Zones flagged as living in the bump-out follow it, and so do the
+        # stations placed in them
+        positions = params.get('station_positions', {})
+        stations = params.get('stations', {})
+        for zone_id, zone in params.get('zones', {}).items():
+            if zone.get('in_bump_out'):
+                dx, dy = bump['x_start'] - zone['x_start'], bump['y_start'] - zone['y_start']
+                for sid, pos in positions.items():
+                    if isinstance(pos, dict) and stations.get(sid, {}).get('zone') == zone_id:
+                        pos['x'] += dx
+                        pos['y'] += dy
+                zone['x_start'], zone['x_end'] = bump['x_start'], bump['x_end']
+                zone['y_start'], zone['y_end'] = bump['y_start'], bump['y_end']
+                zone['width'], zone['depth'] = bump['width'], bump['depth']
+    return params
+
+
+def check_geometry(params):
+    """Return a list of geometry errors (empty when the variant is usable)."""
+    errors = []
+    room = params['room']
+    room_w, room_d = room['room_width'], room['room_depth']
+    bump = params.get('bump_out', {})
+    bump_on = bool(bump.get('enabled'))
+
+    if room_w <= 0 or room_d <= 0:
+        errors.append(f"room must have positive size, got {room_w}x{room_d}")
+    if bump_on and not (0 <= bump['x_start'] < bump['x_end'] <= room_w):
+        errors.append(f"bump_out x {bump['x_start']}-{bump['x_end']} outside room width {room_w}")
+
+    for zone_id, zone in params.get('zones', {}).items():
+        x0, y0 = zone['x_start'], zone['y_start']
+        x1, y1 = x0 + zone['width'], y0 + zone['depth']
+        if zone.get('in_bump_out'):
+            if not bump_on:
+                continue  # zone disappears with the bump-out
+            ok = bump['x_start'] <= x0 and x1 <= bump['x_end'] and bump['y_start'] <= y0 and y1 <= bump['y_end']
+        else:
+            ok = 0 <= x0 and x1 <= room_w and 0 <= y0 and y1 <= room_d
+        if not ok:
+            errors.append(f"{zone_id} ({x0},{y0})-({x1},{y1}) outside room")
+
+    # Placed stations must sit inside the main room or an enabled bump-out
+    stations = params.get('stations', {})
+    for sid, pos in params.get('station_positions', {}).items():
+        if sid.startswith('_') or sid not in stations:
+            continue
+        w, d = constraints.placed_footprint(stations[sid], pos)
+        x0, y0 = pos['x'], pos['y']
+        x1, y1 = x0 + w, y0 + d
+        in_room = 0 <= x0 and x1 <= room_w and 0 <= y0 and y1 <= room_d
+        in_bump = bump_on and (bump['x_start'] <= x0 and x1 <= bump['x_end']
+                               and bump['y_start'] <= y0 and y1 <= bump['y_end'])
+        if not (in_room or in_bump):
+            errors.append(f"{sid} ({x0},{y0})-({x1},{y1}) outside room")
+
+    circ = params.get('circulation', {})
+    aisle_min = circ.get('aisle_primary_min')
+    if aisle_min and circ.get('main_aisle_width', aisle_min) < aisle_min:
+        errors.append(f"main_aisle_width {circ['main_aisle_width']} below aisle_primary_min {aisle_min}")
+    return errors
+
+
+def expand_variants(base, axes):
+    """Yield (variant_id, overrides, params) for the cartesian product of axes."""
+    paths = [path for path, _ in axes]
+    combos = itertools.product(*(values for _, values in axes))
+    for i, combo in enumerate(combos):
+        overrides = dict(zip(paths, combo))
+        params = copy.deepcopy(base)
+        for path, value in overrides.items():
+            set_path(params, path, value)
+        yield f"v{i:04d}", overrides, refresh_derived(params)
+
+
+def _run_variant(task):
+    """Worker: validate and render one variant, return its manifest entry."""
+    variant_id, overrides, params, out_root, views, cache, dxf = task
+    entry = {'id': variant_id, 'overrides': overrides, 'outputs': {}}
+    errors = check_geometry(params)
+    entry['errors'] = errors
+    entry['status'] = 'invalid' if errors else 'rendered'
+    # Constraint violations are reported, not fatal: reviewers compare them
+    entry['violations'] = [] if errors else [
+        {'constraint': v['constraint'], 'ids': v['ids']} for v in constraints.validate(params)[0]]
+    # Routed material-flow distance (inches) to rank variants; None when unroutable
+    distance = None if errors else flow_distance(params)
+    entry['flow_distance'] = round(distance, 1) if distance is not None and math.isfinite(distance) else None
+
+    out_root = Path(out_root)
+    out_dir = out_root / variant_id
+    out_dir.mkdir(parents=True, exist_ok=True)
+    params_file = out_dir / "parameters.json"
+    with open(params_file, 'w') as f:
+        json.dump(params, f, indent=2)
+    # Manifest paths are relative to the sweep directory
+    entry['parameters'] = str(params_file.relative_to(out_root))
+
+    if not errors:
+        for view in views:
+            out_file = render_view(view, params, out_dir, cache=cache)
+            entry['outputs'][view] = str(out_file.relative_to(out_root))
+        if dxf:
+            write_dxf(params, out_dir / DXF_FILE)
+            entry['outputs']['dxf'] = str((out_dir / DXF_FILE).relative_to(out_root))
+    return entry
+
+
+def run_sweep(base_file, axes, out_root=SWEEP_DIR, views=None, jobs=None, cache=None,
+              dxf=False):
+    """Render every variant and write manifest.json; returns the manifest dict.
+
+    With a RenderCache, variants that leave a view's inputs untouched reuse
+    its bytes instead of re-rendering. With dxf=True each valid variant also
+    gets an R12 layout.dxf; pass views=[] for DXF only.
+    """
+    base = load_parameters(base_file)
+    views = list(DEFAULT_VIEWS if views is None else views)
+    out_root = Path(out_root)
+    out_root.mkdir(parents=True, exist_ok=True)
+
+    tasks = [(vid, overrides, params, str(out_root), views, cache, dxf)
+             for vid, overrides, params in expand_variants(base, axes)]
+    jobs = min(jobs or os.cpu_count() or 1, len(tasks)) or 1
+    if jobs <= 1:
+        entries = [_run_variant(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunksize = max(1, len(tasks) // (jobs * 4))
+            entries = list(pool.map(_run_variant, tasks, chunksize=chunksize))
+
+    manifest = {
+        'base': str(base_file),
+        'axes': {path: values for path, values in axes},
+        'views': views,
+        'count': len(entries),
+        'rendered': sum(1 for e in entries if e['status'] == 'rendered'),
+        'variants': entries,
+    }
+    with open(out_root / "manifest.json", 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main(argv=None):
+    """Run a sweep from the command line."""
+    parser = argparse.ArgumentParser(description="Render a cartesian sweep of layout variants.")
+    parser.add_argument('--base', type=Path, default=PARAMS_FILE,
+                        help='base parameters file (default: data/parameters.json)')
+    parser.add_argument('--axis', dest='axes', type=parse_axis, action='append', required=True,
+                        help='axis to vary, e.g. room.room_width=300,360 (repeatable)')
+    parser.add_argument('--out', type=Path, default=SWEEP_DIR,
+                        help='output directory (default: exports/sweep)')
+    parser.add_argument('--views', nargs='*', choices=list(VIEWS), default=None,
+                        help='views to render (empty: none, e.g. with --dxf)')
+    parser.add_argument('-j', '--jobs', type=int, default=None)
+    parser.add_argument('--no-cache', action='store_true',
+                        help='render every variant view from scratch')
+    parser.add_argument('--dxf', action='store_true',
+                        help='also export each variant as R12 DXF (layout.dxf)')
+    args = parser.parse_args(argv)
+    try:
+        base = load_parameters(args.base)
+    except (OSError, ValueError) as e:
+        parser.error(f"--base {args.base}: {e}")
+    bad = unknown_paths(base, [path for path, _ in args.axes])
+    if bad:
+        parser.error(f"unknown parameter path(s) in {args.base.name}: {', '.join(bad)}")
+    derived = derived_paths(base, [path for path, _ in args.axes])
+    if derived:
+        parser.error(f"derived parameter path(s), recomputed from the others: {', '.join(derived)}"
+                     " (sweep bump_out.x_start/width/depth or room.room_width/room_depth instead)")
+
+    cache = None if args.no_cache else RenderCache(CACHE_DIR)
+    manifest = run_sweep(args.base, args.axes, args.out, views=args.views,
+                         jobs=args.jobs, cache=cache, dxf=args.dxf)
+    print(f"Variants: {manifest['count']} ({manifest['rendered']} rendered, "
+          f"{manifest['count'] - manifest['rendered']} invalid)")
+    print(f"Manifest: {Path(args.out) / 'manifest.json'}")
+
+
+if __name__ == '__main__':
+    main()
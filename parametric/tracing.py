@@ -0,0 +1,145 @@
+"""
+Opt-in tracing for the render pipeline: timed spans and counters.
+
+Off by default; span()/traced()/count() then cost one flag check. Enable by
+setting CRAFT_TRACE (or passing --profile) to an output path:
+    *.json            Chrome trace (open in chrome://tracing or Perfetto)
+    *.prof / *.pstats cProfile dump (python -m pstats, snakeviz, ...)
+
+Counters accumulate globally; each span's args record how much every counter
+grew while it was open (e.g. patches/texts added, bytes written).
+"""
+
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+ENV_VAR = 'CRAFT_TRACE'
+
+_enabled = False
+_path = None
+_profiler = None
+_t0 = 0
+_events = []
+_counters = {}
+
+
+def enabled():
+    return _enabled
+
+
+def enable(path):
+    """Start tracing; output format follows the file suffix (see module doc)."""
+    global _enabled, _path, _profiler, _t0
+    _path = str(path)
+    _t0 = time.perf_counter_ns()
+    _events.clear()
+    _counters.clear()
+    if _path.endswith(('.prof', '.pstats')):
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    _enabled = True
+
+
+def enable_from_env(path=None):
+    """Enable if path (e.g. a --profile value) or $CRAFT_TRACE is set; returns whether on."""
+    path = path or os.environ.get(ENV_VAR)
+    if path and not _enabled:
+        enable(path)
+    return _enabled
+
+
+def count(name, n=1):
+    """Add n to a counter (no-op when tracing is off)."""
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+class _Span:
+    __slots__ = ('name', 'args', 'start', 'before')
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.before = dict(_counters)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        args = dict(self.args)
+        for key, value in _counters.items():
+            grew = value - self.before.get(key, 0)
+            if grew:
+                args[key] = grew
+        _events.append({
+            'name': self.name, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+            'ts': (self.start - _t0) / 1000, 'dur': (end - self.start) / 1000, 'args': args,
+        })
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullSpan()
+
+
+def span(name, **args):
+    """Context manager timing a block as a named span (shared no-op when off)."""
+    if not _enabled or _profiler is not None:
+        return _NULL
+    return _Span(name, args)
+
+
+def traced(name=None):
+    """Decorator: run the function inside a span named after it."""
+    def wrap(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with span(label):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def finish():
+    """Stop tracing and write the trace/profile; returns the path or None."""
+    global _enabled, _profiler
+    if not _enabled:
+        return None
+    _enabled = False
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(_path)
+        _profiler = None
+        print(f"Profile written: {_path}", file=sys.stderr)
+        return _path
+
+    end = (time.perf_counter_ns() - _t0) / 1000
+    events = list(_events)
+    if _counters:
+        events.append({'name': 'counters', 'ph': 'C', 'pid': os.getpid(),
+                       'tid': threading.get_ident(), 'ts': end, 'args': dict(_counters)})
+    with open(_path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms',
+                   'otherData': {'counters': dict(_counters)}}, f)
+    print(f"Trace written: {_path} ({len(_events)} spans)", file=sys.stderr)
+    return _path
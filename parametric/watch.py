@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Watch mode: re-render layout views when their inputs change.
+Polls parameters.json and station_inventory.csv (debounced), diffs the new
+parameters against the last good ones and re-renders only views whose inputs
+(VIEW_INPUTS subsections or VIEW_FILES) changed. The interpreter, matplotlib
+and fonts stay loaded between edits, and a pool of pre-warmed workers renders
+several changed views in parallel.
+
+Example:
+    python watch.py --views zones stations flow clearance
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from render_cache import CACHE_DIR, RenderCache, get_path
+from render_layout import (DEFAULT_VIEWS, INVENTORY_FILE, OUTPUT_DIR, PARAMS_FILE, VIEW_FILES,
+                           VIEW_INPUTS, VIEWS, cache_key, load_parameters, render_all,
+                           render_bytes)
+
+POLL_INTERVAL = 0.1
+DEBOUNCE = 0.2
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _warm_worker(params):
+    """Pool initializer: import and draw once so fonts and caches are hot."""
+    render_bytes('flow', params, dpi=30)
+
+
+def changed_inputs(old, new, views):
+    """Dotted input paths (across the watched views) whose values differ."""
+    paths = sorted({p for v in views for p in VIEW_INPUTS[v]})
+    return [p for p in paths if get_path(old, p) != get_path(new, p)]
+
+
+class Watcher:
+    """Polls the watched files and re-renders affected views after a quiet period."""
+
+    def __init__(self, params_file=PARAMS_FILE, output_dir=OUTPUT_DIR, views=None,
+                 jobs=None, cache=None, debounce=DEBOUNCE, interval=POLL_INTERVAL):
+        self.params_file = Path(params_file)
+        self.output_dir = Path(output_dir)
+        self.views = list(views or DEFAULT_VIEWS)
+        self.cache = cache
+        self.debounce = debounce
+        self.interval = interval
+        extra = {Path(f) for v in self.views for f in VIEW_FILES.get(v, ())}
+        self.files = [self.params_file, Path(INVENTORY_FILE)] + sorted(extra - {Path(INVENTORY_FILE)})
+        self.jobs = min(jobs or os.cpu_count() or 1, len(self.views))
+        self.pool = None
+        self.params = None
+        self.keys = {}
+
+    def _snapshot(self):
+        return {f: _stat(f) for f in self.files}
+
+    def rebuild(self):
+        """Reload parameters and render views whose cache key changed."""
+        t0 = time.perf_counter()
+        try:
+            params = load_parameters(self.params_file)
+        except (OSError, ValueError) as e:
+            print(f"! {self.params_file.name}: {e} (keeping last good parameters)")
+            return []
+        keys = {v: cache_key(v, params) for v in self.views}
+        todo = [v for v in self.views if keys[v] != self.keys.get(v)]
+        if self.params is not None:
+            diff = changed_inputs(self.params, params, self.views)
+            print(f"~ changed: {', '.join(diff) if diff else 'no view inputs'}")
+        self.params = params
+        if not todo:
+            self.keys = keys
+            return []
+
+        if self.pool is None and self.jobs > 1:
+            self.pool = ProcessPoolExecutor(max_workers=self.jobs, initializer=_warm_worker,
+                                            initargs=(params,))
+        try:
+            results = render_all(params, self.output_dir, views=todo, cache=self.cache,
+                                 pool=self.pool)
+        except Exception as e:  # a bad edit must not end the session
+            print(f"! render failed: {e!r} (will retry on the next change)")
+            if isinstance(e, BrokenProcessPool):
+                self.pool.shutdown(cancel_futures=True)
+                self.pool = None
+            # Some of these may have been written; forget them all so the next
+            # change (even one back to the last good parameters) renders them
+            for view in todo:
+                self.keys.pop(view, None)
+            return []
+        self.keys = keys
+        elapsed = time.perf_counter() - t0
+        for out_file, status in results:
+            print(f"  {status:9s} {out_file.name}")
+        print(f"= {len(todo)} view(s) in {elapsed:.2f} s")
+        return results
+
+    def run(self, iterations=None):
+        """Poll forever (or for a number of polls); Ctrl-C to stop."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        watched = ', '.join(f.name for f in self.files)
+        print(f"Watching {watched} -> {', '.join(self.views)}")
+        self.rebuild()
+        last = self._snapshot()
+        pending = None
+        n = 0
+        try:
+            while iterations is None or n < iterations:
+                n += 1
+                time.sleep(self.interval)
+                snap = self._snapshot()
+                now = time.monotonic()
+                if snap != last:
+                    last, pending = snap, now  # restart the quiet period
+                elif pending is not None and now - pending >= self.debounce:
+                    pending = None
+                    self.rebuild()
+        except KeyboardInterrupt:
+            print()
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--params', type=Path, default=PARAMS_FILE, help='parameters file to watch')
+    parser.add_argument('--out', type=Path, default=OUTPUT_DIR, help='output directory')
+    parser.add_argument('--views', nargs='+', choices=list(VIEWS), default=None,
+                        help='views to keep up to date (default: %s)' % ' '.join(DEFAULT_VIEWS))
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='warm worker processes (default: one per view, up to CPU count)')
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE,
+                        help='seconds of quiet after a save before rendering (default: %(default)s)')
+    parser.add_argument('--no-cache', action='store_true', help='do not use the render cache')
+    args = parser.parse_args(argv)
+
+    cache = None if args.no_cache else RenderCache(CACHE_DIR)
+    Watcher(args.params, args.out, args.views, args.jobs, cache, args.debounce).run()
+
+
+if __name__ == '__main__':
+    main()
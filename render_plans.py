@@ -1,143 +1,166 @@
 #!/usr/bin/env python3
-"""Render craft room floor plans as PNG images - based on actual DXF geometry."""
-
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch, Rectangle, FancyArrowPatch
-import matplotlib.patheffects as pe
-
-# Room dimensions in inches (from DXF)
-ROOM_WIDTH = 360   # 30'
-ROOM_HEIGHT = 240  # 20'
-
-def setup_figure(title):
+"""Render craft room floor plans as PNG images - drawn from the R12 DXF geometry."""
+
+import sys
+from pathlib import Path
+
+from matplotlib.colors import to_rgba_array
+from matplotlib.patches import FancyBboxPatch, Rectangle
+
+from dxf_reader import LayerIndex, Rect
+
+SCRIPT_DIR = Path(__file__).parent
+
+# Shared room frame (grid, outline, dimensions) from the parametric scene graph
+sys.path.insert(0, str(SCRIPT_DIR / 'parametric'))
+from scene import box_collection, room_frame, to_figure  # noqa: E402
+
+LAYOUT_DXF = SCRIPT_DIR / 'craft_room_layout_r12.dxf'
+
+# Colors
+c_elec = '#2196F3'    # Blue - Electronics
+c_fab = '#FF5722'     # Deep Orange - Fabrication
+c_fume = '#F44336'    # Red - Fume
+c_storage = '#9E9E9E' # Gray - Storage
+c_table = '#FF9800'   # Orange - Assembly
+c_cab = '#795548'     # Brown - Cabinetry
+c_her = '#4CAF50'     # Green - Her Zone (proposed)
+
+# DXF rectangles to draw: (layer, keyword in its TEXT label, color, legend, short label).
+# An empty keyword matches every rectangle on the layer.
+FIXTURES = [
+    ('BENCH', 'ELECTRONICS', c_elec, 'Electronics', 'ELEC'),
+    ('BENCH', 'TOOL', c_fab, 'Fabrication', 'FAB'),
+    ('VENT', '', c_fume, 'Fume Zone', 'FUME'),
+    ('TABLE', '', c_table, 'Assembly', 'ASSEMBLY'),
+    ('STORAGE', '', c_storage, 'Storage', 'STORAGE'),
+    ('CABINETRY', '', c_cab, 'Cabinetry', 'CABINETRY'),
+]
+LAYERS = ['FOOTPRINT', 'OPEN_EDGE', 'ELECTRICAL'] + sorted({f[0] for f in FIXTURES})
+
+
+def _ft_in(inches):
+    return f'{inches:.0f}" ({int(inches) // 12}\'-{int(inches) % 12}")'
+
+
+def _xywh(rects):
+    """Rects as (x, y, w, h) rows for scene.box_collection."""
+    return [(r.x0, r.y0, r.x1 - r.x0, r.y1 - r.y0) for r in rects]
+
+
+def load_layout(path=LAYOUT_DXF):
+    """Index the layout DXF and resolve its rectangles into drawable fixtures.
+
+    Rectangles are clipped to the room and trimmed where they run into the
+    north-wall cabinetry; each clip is reported in 'clipped' for the plan note.
+    """
+    index = LayerIndex(path, LAYERS)
+    room = index.bounds('FOOTPRINT')
+    cabinets = index.rectangles('CABINETRY')
+
+    fixtures, clipped = [], []
+    for layer, keyword, color, legend, short in FIXTURES:
+        for r in index.rectangles(layer):
+            label = ' '.join(t.text for t in index.text_in(layer, r))
+            if keyword not in label:
+                continue
+            x0, y0 = max(r.x0, room.x0), max(r.y0, room.y0)
+            x1, y1 = min(r.x1, room.x1), min(r.y1, room.y1)
+            if layer != 'CABINETRY':
+                for c in cabinets:
+                    if x0 < c.x1 and c.x0 < x1 and y0 < c.y0 < y1:
+                        y1 = c.y0
+            fit = Rect(x0, y0, x1, y1)
+            if fit != r:
+                clipped.append((label or layer, r, fit))
+            fixtures.append({'rect': fit, 'label': label, 'layer': layer,
+                             'color': color, 'legend': legend, 'short': short})
+
+    outlets = [((r.x0 + r.x1) / 2, (r.y0 + r.y1) / 2)
+               for r in index.rectangles('ELECTRICAL')]
+    return {'room': room, 'fixtures': fixtures, 'clipped': clipped,
+            'outlets': outlets, 'vent_lines': index.open_lines('VENT')}
+
+
+def setup_figure(title, room):
     """Create figure with room outline matching DXF."""
-    fig, ax = plt.subplots(1, 1, figsize=(16, 11))
-
-    # White background
-    ax.set_facecolor('white')
-
-    # Grid (4' = 48")
-    for x in range(0, ROOM_WIDTH + 1, 48):
-        ax.axvline(x, color='#e8e8e8', linewidth=0.5, zorder=0)
-        if x > 0 and x < ROOM_WIDTH:
-            ax.text(x, -8, f"{x//12}'", ha='center', fontsize=7, color='#999')
-    for y in range(0, ROOM_HEIGHT + 1, 48):
-        ax.axhline(y, color='#e8e8e8', linewidth=0.5, zorder=0)
-        if y > 0 and y < ROOM_HEIGHT:
-            ax.text(-8, y, f"{y//12}'", ha='right', va='center', fontsize=7, color='#999')
-
-    # Room outline (from DXF FOOTPRINT layer)
-    ax.plot([0, ROOM_WIDTH], [0, 0], 'k--', linewidth=2.5)  # South - OPEN_EDGE (dashed)
-    ax.plot([ROOM_WIDTH, ROOM_WIDTH], [0, ROOM_HEIGHT], 'k-', linewidth=3)  # East
-    ax.plot([ROOM_WIDTH, 0], [ROOM_HEIGHT, ROOM_HEIGHT], 'k-', linewidth=3)  # North
-    ax.plot([0, 0], [ROOM_HEIGHT, 0], 'k-', linewidth=3)  # West
-
-    ax.set_xlim(-30, ROOM_WIDTH + 50)
-    ax.set_ylim(-40, ROOM_HEIGHT + 60)
-    ax.set_aspect('equal')
-    ax.set_xlabel('Inches', fontsize=10)
-    ax.set_ylabel('Inches', fontsize=10)
-    ax.set_title(title, fontsize=16, fontweight='bold', pad=15)
-
-    # Dimension annotations
-    ax.annotate('', xy=(ROOM_WIDTH, -20), xytext=(0, -20),
-                arrowprops=dict(arrowstyle='<->', color='#666', lw=1.5))
-    ax.text(ROOM_WIDTH/2, -28, '360" (30\'-0")', ha='center', fontsize=10, color='#444')
-
-    ax.annotate('', xy=(-20, ROOM_HEIGHT), xytext=(-20, 0),
-                arrowprops=dict(arrowstyle='<->', color='#666', lw=1.5))
-    ax.text(-25, ROOM_HEIGHT/2, '240" (20\'-0")', ha='center', va='center',
-            fontsize=10, color='#444', rotation=90)
+    ROOM_WIDTH, ROOM_HEIGHT = room.x1 - room.x0, room.y1 - room.y0
+    scene = room_frame(title, ROOM_WIDTH, ROOM_HEIGHT,
+                       xlim=(-30, ROOM_WIDTH + 50), ylim=(-40, ROOM_HEIGHT + 60),
+                       figsize=(16, 11), title_size=16,
+                       dims=(_ft_in(ROOM_WIDTH), _ft_in(ROOM_HEIGHT)), tick_offset=8, dim_offset=20)
 
     # Wall labels
-    ax.text(ROOM_WIDTH/2, 10, 'OPEN EDGE (interior access)',
-            ha='center', fontsize=9, color='#666', style='italic')
-    ax.text(ROOM_WIDTH/2, ROOM_HEIGHT + 12, 'BACK WALL (exterior - vent access)',
-            ha='center', fontsize=9, color='#666', style='italic')
-    ax.text(-5, ROOM_HEIGHT/2, 'W\nE\nS\nT', ha='center', va='center', fontsize=8, color='#999')
-    ax.text(ROOM_WIDTH + 8, ROOM_HEIGHT/2, 'E\nA\nS\nT', ha='center', va='center', fontsize=8, color='#999')
-
-    return fig, ax
-
-
-def render_zones():
-    """Render zone allocation diagram matching DXF geometry exactly."""
-    fig, ax = setup_figure('CRAFT ROOM - ZONE ALLOCATION (from DXF)')
-
-    # Colors
-    c_elec = '#2196F3'    # Blue - Electronics
-    c_fab = '#FF5722'     # Deep Orange - Fabrication
-    c_fume = '#F44336'    # Red - Fume
-    c_storage = '#9E9E9E' # Gray - Storage
-    c_table = '#FF9800'   # Orange - Assembly
-    c_cab = '#795548'     # Brown - Cabinetry
-    c_her = '#4CAF50'     # Green - Her Zone (proposed)
-
-    # === FROM DXF: CABINETRY layer ===
-    # Bounds: x: 0-360, y: 216-240 (24" deep strip along north wall)
-    rect = Rectangle((0, 216), 360, 24, facecolor=c_cab, alpha=0.3,
-                      edgecolor=c_cab, linewidth=2)
-    ax.add_patch(rect)
-    ax.text(180, 228, 'CABINETRY RUN (24" DEPTH)', ha='center', va='center',
-            fontsize=9, fontweight='bold', color='#5D4037')
-
-    # Electrical outlets (8 shown in DXF at y=226-230)
-    outlet_xs = [24, 72, 120, 168, 216, 264, 312]
-    for ox in outlet_xs:
-        ax.plot(ox, 228, 's', markersize=4, color='#FFC107', markeredgecolor='#333', markeredgewidth=0.5)
-    ax.text(340, 228, '⚡', fontsize=8, ha='center', va='center')
-
-    # === FROM DXF: BENCH layer - Electronics/Clean Bench ===
-    # Lines form box: (0,156) to (60,156) to (60,216) to (0,216) to (0,156)
-    # Note: DXF shows y going to 276 but that's outside room - using 216 (against cabinetry)
-    rect = Rectangle((0, 156), 60, 60, facecolor=c_elec, alpha=0.3,
-                      edgecolor=c_elec, linewidth=2)
-    ax.add_patch(rect)
-    ax.text(30, 195, 'ELECTRONICS', ha='center', va='center', fontsize=10, fontweight='bold')
-    ax.text(30, 182, 'CLEAN BENCH', ha='center', va='center', fontsize=8)
-    ax.text(30, 165, '60"×60" (25 sq ft)', ha='center', va='center', fontsize=7, color='#666', style='italic')
-
-    # === FROM DXF: BENCH layer - Tool/Dirty Bench ===
-    # Lines form box: (330,72) to (360,72) to (360,216) to (330,216) to (330,72)
-    rect = Rectangle((330, 72), 30, 144, facecolor=c_fab, alpha=0.3,
-                      edgecolor=c_fab, linewidth=2)
-    ax.add_patch(rect)
-    ax.text(345, 150, 'TOOL', ha='center', va='center', fontsize=9, fontweight='bold', rotation=90)
-    ax.text(345, 120, 'DIRTY', ha='center', va='center', fontsize=9, fontweight='bold', rotation=90)
-    ax.text(345, 90, 'BENCH', ha='center', va='center', fontsize=9, fontweight='bold', rotation=90)
-    ax.text(352, 144, '30"×144"', ha='center', va='center', fontsize=6, color='#666', rotation=90)
-
-    # === FROM DXF: TABLE layer - Center Assembly Table ===
-    # Lines form box: (132,96) to (228,96) to (228,144) to (132,144) to (132,96)
-    rect = Rectangle((132, 96), 96, 48, facecolor=c_table, alpha=0.3,
-                      edgecolor=c_table, linewidth=2)
-    ax.add_patch(rect)
-    ax.text(180, 125, 'CENTER ASSEMBLY TABLE', ha='center', va='center', fontsize=9, fontweight='bold')
-    ax.text(180, 108, '96"×48" (8\'×4\')', ha='center', va='center', fontsize=8, color='#666')
-
-    # === FROM DXF: STORAGE layer - Sheet Goods/Lumber Stage ===
-    # Lines form box: (0,0) to (96,0) to (96,60) to (0,60) to (0,0)
-    rect = Rectangle((0, 0), 96, 60, facecolor=c_storage, alpha=0.3,
-                      edgecolor=c_storage, linewidth=2)
-    ax.add_patch(rect)
-    ax.text(48, 38, 'SHEET GOODS', ha='center', va='center', fontsize=9, fontweight='bold')
-    ax.text(48, 24, 'LUMBER STAGE', ha='center', va='center', fontsize=8)
-    ax.text(48, 8, '96"×60" (40 sq ft)', ha='center', va='center', fontsize=7, color='#666', style='italic')
-
-    # === FROM DXF: VENT layer - Fume + Fiberglass Bench ===
-    # Lines form box: (270,156) to (360,156) to (360,186) to (270,186) to (270,156)
-    rect = Rectangle((270, 156), 90, 30, facecolor=c_fume, alpha=0.3,
-                      edgecolor=c_fume, linewidth=2)
-    ax.add_patch(rect)
-    ax.text(315, 175, 'FUME + FIBERGLASS BENCH', ha='center', va='center', fontsize=8, fontweight='bold')
-    ax.text(315, 162, '90"×30"', ha='center', va='center', fontsize=7, color='#666')
-
-    # Vent to outside indicator (from DXF: line at x=350-370, y=230)
-    ax.annotate('VENT TO\nOUTSIDE', xy=(360, 230), xytext=(370, 215),
-                fontsize=7, ha='left', color=c_fume,
-                arrowprops=dict(arrowstyle='->', color=c_fume, lw=1.5))
-    ax.plot([350, 370], [230, 230], color=c_fume, linewidth=3)
+    scene.text('NOTES', ROOM_WIDTH/2, 10, 'OPEN EDGE (interior access)',
+               ha='center', fontsize=9, color='#666', style='italic')
+    scene.text('NOTES', ROOM_WIDTH/2, ROOM_HEIGHT + 12, 'BACK WALL (exterior - vent access)',
+               ha='center', fontsize=9, color='#666', style='italic')
+    scene.text('NOTES', -5, ROOM_HEIGHT/2, 'W\nE\nS\nT', ha='center', va='center', fontsize=8, color='#999')
+    scene.text('NOTES', ROOM_WIDTH + 8, ROOM_HEIGHT/2, 'E\nA\nS\nT', ha='center', va='center', fontsize=8, color='#999')
+
+    return to_figure(scene)
+
+
+def _fixture_labels(ax, f):
+    """Name (from the DXF TEXT) and size of a fixture, centred in its rectangle."""
+    r = f['rect']
+    w, h = r.x1 - r.x0, r.y1 - r.y0
+    cx, cy = (r.x0 + r.x1) / 2, (r.y0 + r.y1) / 2
+    size = f'{w:.0f}"×{h:.0f}"'
+    if w * h >= 20 * 144:  # area only on the larger pieces
+        size += f' ({w * h / 144:.0f} sq ft)'
+    lines = [part.strip() for part in f['label'].split('/') if part.strip()] or [f['layer']]
+
+    if h > 2 * w:  # tall narrow bench: one rotated word per line down its length
+        lines = ' '.join(lines).split()
+        step = min(30, h / (len(lines) + 2))
+        for i, text in enumerate(lines):
+            ax.text(cx - w * 0.15, cy + step * (len(lines) / 2 - i), text, ha='center', va='center',
+                    fontsize=9, fontweight='bold', rotation=90)
+        ax.text(cx + w * 0.25, cy, size, ha='center', va='center', fontsize=6, color='#666', rotation=90)
+        return
+
+    step = min(13, h / (len(lines) + 2))
+    top = cy + step * len(lines) / 2
+    for i, text in enumerate(lines):
+        ax.text(cx, top - step * i, text, ha='center', va='center',
+                fontsize=9 if i == 0 else 8, fontweight='bold' if i == 0 else 'normal')
+    ax.text(cx, top - step * len(lines), size, ha='center', va='center',
+            fontsize=7, color='#666', style='italic')
+
+
+def render_zones(layout=None):
+    """Render zone allocation diagram drawn from the layout DXF."""
+    layout = layout or load_layout()
+    room = layout['room']
+    ROOM_WIDTH, ROOM_HEIGHT = room.x1, room.y1
+    fig, ax = setup_figure('CRAFT ROOM - ZONE ALLOCATION (from DXF)', room)
+
+    # === FROM DXF: rectangles on the BENCH, TABLE, STORAGE, VENT, CABINETRY layers ===
+    fixtures = layout['fixtures']
+    ax.add_collection(box_collection(_xywh(f['rect'] for f in fixtures),
+                                     colors=[f['color'] for f in fixtures], alpha=0.3, linewidths=2))
+    for f in fixtures:
+        r = f['rect']
+        if f['layer'] == 'CABINETRY':
+            ax.text((r.x0 + r.x1) / 2, (r.y0 + r.y1) / 2, f['label'], ha='center', va='center',
+                    fontsize=9, fontweight='bold', color='#5D4037')
+        else:
+            _fixture_labels(ax, f)
+
+    # === FROM DXF: ELECTRICAL layer - outlet symbols ===
+    if layout['outlets']:
+        ox, oy = zip(*layout['outlets'])
+        ax.plot(ox, oy, 's', linestyle='none', markersize=4, color='#FFC107',
+                markeredgecolor='#333', markeredgewidth=0.5)
+        ax.text(ROOM_WIDTH - 20, layout['outlets'][-1][1], '⚡', fontsize=8, ha='center', va='center')
+
+    # === FROM DXF: VENT layer - vent to outside (the line that is not a bench edge) ===
+    for ln in layout['vent_lines']:
+        ax.plot([ln.x0, ln.x1], [ln.y0, ln.y1], color=c_fume, linewidth=3)
+        ax.annotate('VENT TO\nOUTSIDE', xy=(ROOM_WIDTH, ln.y0), xytext=(ROOM_WIDTH + 10, ln.y0 - 15),
+                    fontsize=7, ha='left', color=c_fume,
+                    arrowprops=dict(arrowstyle='->', color=c_fume, lw=1.5))
 
     # === PROPOSED: Her Zone (not in original DXF) ===
     # Proposed bounds: x: 0-120, y: 60-156
@@ -151,65 +174,50 @@ def render_zones():
 
     # === Legend ===
     legend_y = ROOM_HEIGHT + 40
-    legend_items = [
-        ('Electronics (DXF)', c_elec, '-'),
-        ('Fabrication (DXF)', c_fab, '-'),
-        ('Fume Zone (DXF)', c_fume, '-'),
-        ('Assembly (DXF)', c_table, '-'),
-        ('Storage (DXF)', c_storage, '-'),
-        ('Cabinetry (DXF)', c_cab, '-'),
-        ('Her Zone (PROPOSED)', c_her, '--'),
-    ]
+    legend_items = [(legend + ' (DXF)', color, '-') for _, _, color, legend, _ in FIXTURES]
+    legend_items.append(('Her Zone (PROPOSED)', c_her, '--'))
+    ax.add_collection(box_collection(
+        [(10 + i * 52, legend_y, 14, 10) for i in range(len(legend_items))],
+        colors=[color for _, color, _ in legend_items], alpha=0.3, linewidths=1.5,
+        linestyles=[ls for _, _, ls in legend_items]))
     for i, (label, color, ls) in enumerate(legend_items):
-        x = 10 + i * 52
-        rect = Rectangle((x, legend_y), 14, 10, facecolor=color, alpha=0.3,
-                         edgecolor=color, linewidth=1.5, linestyle=ls)
-        ax.add_patch(rect)
-        ax.text(x + 7, legend_y - 6, label, ha='center', va='top', fontsize=6, rotation=45)
-
-    # Note about DXF geometry error
-    ax.text(5, ROOM_HEIGHT + 25,
-            'Note: DXF shows Electronics bench extending to y=276 (outside room). Shown here as y=156-216.',
-            fontsize=7, color='#999', style='italic')
-
-    plt.tight_layout()
-    plt.savefig('/Users/tjordan/code/git/craft_room/craft_room_zones.png',
+        ax.text(10 + i * 52 + 7, legend_y - 6, label, ha='center', va='top', fontsize=6, rotation=45)
+
+    # Note about DXF geometry that falls outside the room
+    for i, (label, raw, fit) in enumerate(layout['clipped']):
+        name = label.split('/')[0].strip().title()
+        ax.text(5, ROOM_HEIGHT + 25 - 8 * i,
+                f'Note: DXF shows {name} extending to y={raw.y1:g} (outside room). '
+                f'Shown here as y={fit.y0:g}-{fit.y1:g}.',
+                fontsize=7, color='#999', style='italic')
+
+    fig.tight_layout()
+    fig.savefig(SCRIPT_DIR / 'craft_room_zones.png',
                 dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
     print('Saved: craft_room_zones.png')
 
 
-def render_flow():
+def render_flow(layout=None):
     """Render traffic flow diagram based on DXF geometry."""
-    fig, ax = setup_figure('CRAFT ROOM - TRAFFIC FLOW (based on DXF zones)')
+    layout = layout or load_layout()
+    room = layout['room']
+    ROOM_WIDTH, ROOM_HEIGHT = room.x1, room.y1
+    fig, ax = setup_figure('CRAFT ROOM - TRAFFIC FLOW (based on DXF zones)', room)
 
-    # Ghost zones for reference
+    # Ghost zones for reference (from DXF) with subtle labels
     ghost = '#e0e0e0'
     alpha = 0.2
+    ax.add_collection(box_collection(_xywh(f['rect'] for f in layout['fixtures']),
+                                     facecolors=ghost, edgecolors='#ccc', alpha=alpha, linewidths=1))
+    for f in layout['fixtures']:
+        r = f['rect']
+        w, h = r.x1 - r.x0, r.y1 - r.y0
+        ax.text(r.x0 + w / 2, r.y0 + h / 2, f['short'], ha='center', va='center', fontsize=8,
+                color='#aaa', rotation=90 if h > 2 * w else 0)
 
-    # Cabinetry
-    ax.add_patch(Rectangle((0, 216), 360, 24, facecolor=ghost, alpha=alpha, edgecolor='#ccc', lw=1))
-    # Electronics bench
-    ax.add_patch(Rectangle((0, 156), 60, 60, facecolor=ghost, alpha=alpha, edgecolor='#ccc', lw=1))
-    # Dirty bench
-    ax.add_patch(Rectangle((330, 72), 30, 144, facecolor=ghost, alpha=alpha, edgecolor='#ccc', lw=1))
-    # Assembly table
-    ax.add_patch(Rectangle((132, 96), 96, 48, facecolor=ghost, alpha=alpha, edgecolor='#ccc', lw=1))
-    # Storage
-    ax.add_patch(Rectangle((0, 0), 96, 60, facecolor=ghost, alpha=alpha, edgecolor='#ccc', lw=1))
-    # Fume bench
-    ax.add_patch(Rectangle((270, 156), 90, 30, facecolor=ghost, alpha=alpha, edgecolor='#ccc', lw=1))
     # Her zone (proposed)
     ax.add_patch(Rectangle((0, 60), 120, 96, facecolor=ghost, alpha=0.1, edgecolor='#ccc', lw=1, ls='--'))
-
-    # Zone labels (subtle)
-    ax.text(30, 186, 'ELEC', ha='center', fontsize=8, color='#aaa')
-    ax.text(345, 144, 'FAB', ha='center', fontsize=8, color='#aaa', rotation=90)
-    ax.text(180, 120, 'ASSEMBLY', ha='center', fontsize=8, color='#aaa')
-    ax.text(48, 30, 'STORAGE', ha='center', fontsize=8, color='#aaa')
-    ax.text(315, 171, 'FUME', ha='center', fontsize=8, color='#aaa')
     ax.text(60, 108, 'HER', ha='center', fontsize=8, color='#aaa')
-    ax.text(180, 228, 'CABINETRY', ha='center', fontsize=8, color='#aaa')
 
     # === ENTRY ===
     entry = FancyBboxPatch((140, -15), 80, 18, boxstyle="round,pad=0.02",
@@ -224,19 +232,15 @@ def render_flow():
             fontsize=8, color='#1565C0', fontweight='bold')
 
     # === SECONDARY PATHS ===
-    # West corridor (between Her Zone and Assembly)
-    ax.add_patch(Rectangle((120, 36), 12, 180, facecolor='#4CAF50', alpha=0.15,
-                           edgecolor='#388E3C', linewidth=1.5, linestyle='--'))
+    secondary = [
+        Rect(120, 36, 132, 216),   # West corridor (between Her Zone and Assembly)
+        Rect(228, 36, 330, 96),    # East corridor (between Assembly and Fab)
+        Rect(228, 144, 270, 186),  # Path to fume zone
+    ]
+    ax.add_collection(box_collection(_xywh(secondary), facecolors=to_rgba_array('#4CAF50', 0.15),
+                                     edgecolors=to_rgba_array('#388E3C', 0.15), linewidths=1.5, linestyles='--'))
     ax.text(126, 126, 'W', ha='center', va='center', fontsize=8, color='#2E7D32', fontweight='bold')
 
-    # East corridor (between Assembly and Fab)
-    ax.add_patch(Rectangle((228, 36), 102, 60, facecolor='#4CAF50', alpha=0.15,
-                           edgecolor='#388E3C', linewidth=1.5, linestyle='--'))
-
-    # Path to fume zone
-    ax.add_patch(Rectangle((228, 144), 42, 42, facecolor='#4CAF50', alpha=0.15,
-                           edgecolor='#388E3C', linewidth=1.5, linestyle='--'))
-
     # === PERSON FLOW ARROWS ===
     arrow_kw = dict(arrowstyle='->', color='#1565C0', lw=2,
                     connectionstyle='arc3,rad=0.1')
@@ -323,14 +327,14 @@ def render_flow():
     ax.text(180, -35, 'Materials enter SW (storage) → Assembly → Fab → Fume → Exit NE',
             ha='center', fontsize=8, style='italic', color='#666')
 
-    plt.tight_layout()
-    plt.savefig('/Users/tjordan/code/git/craft_room/craft_room_flow.png',
+    fig.tight_layout()
+    fig.savefig(SCRIPT_DIR / 'craft_room_flow.png',
                 dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
     print('Saved: craft_room_flow.png')
 
 
 if __name__ == '__main__':
-    render_zones()
-    render_flow()
+    layout = load_layout()
+    render_zones(layout)
+    render_flow(layout)
     print('Done!')